@@ -12,65 +12,156 @@ try:
 except Exception as exc:  # pragma: no cover - ADK not installed in some envs
     raise ImportError("google-adk is required. Install with `pip install google-adk[web]`." ) from exc
 
+import os
+from functools import lru_cache
+
 from agents.orchestrator import SwiftOrchestratorAgent
+from schemas import DraftContent
+from sessions import SessionStore, TailorSession
 from tools.file_export_tool import render_markdown
 
 if load_dotenv:
     load_dotenv()
 
+# Parsed profile, analyzed postings and last result per chat session (see sessions.py).
+SESSIONS = SessionStore(
+    max_sessions=int(os.environ.get("SWIFT_MAX_SESSIONS", "256")),
+    ttl=float(os.environ.get("SWIFT_SESSION_TTL", "3600")),
+)
 
-def tailor_resume(resume_path: str, jd_text: str, offline: bool = False):
-    """Tailor a resume to a job description.
 
-    Args:
-        resume_path: path to the resume file (saved to temp by ADK File input).
-        jd_text: raw job posting text.
-        offline: if True, disables LLM calls and uses heuristic fallbacks.
-    """
+@lru_cache(maxsize=None)
+def get_orchestrator(offline: bool = False) -> SwiftOrchestratorAgent:
+    """Shared orchestrator per mode so model clients are built once, not per tool call."""
     orchestrator = SwiftOrchestratorAgent()
     if offline:
         orchestrator.jd_analyzer.use_llm = False
         orchestrator.matcher.use_llm = False
         orchestrator.writer.use_llm = False
         orchestrator.editor.use_llm = False
-    draft = orchestrator.run(resume_path, jd_text)
-    return {
+    return orchestrator
+
+
+def _mode(offline: bool) -> str:
+    return "offline" if offline else "online"
+
+
+def _session(tool_context, offline: bool = False) -> TailorSession:
+    """The chat session of a tool call in the given mode; calls without one get a throwaway session."""
+    session = getattr(tool_context, "session", None)
+    session_id = getattr(session, "id", None) or getattr(tool_context, "session_id", None)
+    if session_id is None:
+        return TailorSession("ephemeral", mode=_mode(offline))
+    return SESSIONS.get(session_id, mode=_mode(offline))
+
+
+def _result(draft: DraftContent, include_markdown: bool, stages_run: list[str]) -> dict:
+    result = {
         "tailored_resume": draft.tailored_resume,
         "tailored_cover": draft.tailored_cover,
-        "markdown": render_markdown(draft),
+        "stages_run": stages_run,
     }
+    if include_markdown:
+        result["markdown"] = render_markdown(draft)
+    return result
+
+
+def tailor_resume(
+    resume_path: str | None,
+    jd_text: str,
+    offline: bool = False,
+    include_markdown: bool = True,
+    session: TailorSession | None = None,
+):
+    """Tailor a resume to a job description.
+
+    Args:
+        resume_path: path to the resume file (saved to temp by ADK File input); None reuses
+            the resume already parsed in `session`.
+        jd_text: raw job posting text.
+        offline: if True, disables LLM calls and uses heuristic fallbacks.
+        include_markdown: if False, skips rendering the combined Markdown view.
+        session: chat session whose earlier stages are reused (see sessions.py); it must
+            belong to the same mode as `offline`.
+    """
+    session = session or TailorSession("ephemeral", mode=_mode(offline))
+    state = session.tailor(get_orchestrator(offline=offline), resume_path, jd_text)
+    return _result(state.final, include_markdown, state.stages_run)
 
 
 @adk.tool()
-def tailor_resume_tool(resume_file: adk.File, jd_text: str, offline: bool = False):
+def tailor_resume_tool(
+    resume_file: adk.File,
+    jd_text: str,
+    offline: bool = False,
+    include_markdown: bool = True,
+    tool_context=None,
+):
     """ADK tool wrapper for tailoring resumes.
 
     Upload resume (pdf/txt/md), provide JD text, and optionally force offline mode.
+    Set include_markdown=False when the combined Markdown view will not be shown.
     """
     resume_path = resume_file.save_to_temp()
-    return tailor_resume(resume_path, jd_text, offline=offline)
+    return tailor_resume(
+        resume_path, jd_text, offline=offline, include_markdown=include_markdown, session=_session(tool_context, offline)
+    )
 
 
 @adk.tool()
-def tailor_resume_text_tool(resume_text: str, jd_text: str, offline: bool = False):
-    """Tailor using pasted resume and JD text (chat-friendly)."""
-    # Save the resume text to a temp file for reuse by the parser
-    import tempfile
+def tailor_resume_text_tool(
+    resume_text: str,
+    jd_text: str,
+    offline: bool = False,
+    include_markdown: bool = True,
+    tool_context=None,
+):
+    """Tailor using pasted resume and JD text (chat-friendly).
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".txt", mode="w", encoding="utf-8") as tmp:
-        tmp.write(resume_text)
-        resume_path = tmp.name
-    return tailor_resume(resume_path, jd_text, offline=offline)
+    Pass an empty resume_text to reuse the resume already given in this chat, e.g. for
+    "now tailor for this other job".
+    """
+    session = _session(tool_context, offline)
+    resume_path = None
+    if resume_text.strip():
+        # Save the resume text to a temp file for reuse by the parser
+        import tempfile
+
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".txt", mode="w", encoding="utf-8") as tmp:
+            tmp.write(resume_text)
+            resume_path = tmp.name
+    try:
+        return tailor_resume(resume_path, jd_text, offline=offline, include_markdown=include_markdown, session=session)
+    except LookupError as exc:
+        return {"error": str(exc)}
+
+
+@adk.tool()
+def shorten_draft_tool(max_words: int = 0, offline: bool = False, include_markdown: bool = True, tool_context=None):
+    """Make the last tailored resume and cover letter of this chat shorter.
+
+    max_words: target length of both together; 0 shortens by about a quarter.
+    """
+    try:
+        state = _session(tool_context, offline).shorten(get_orchestrator(offline=offline), max_words=max_words or None)
+    except LookupError as exc:
+        return {"error": str(exc)}
+    return _result(state.final, include_markdown, state.stages_run)
 
 
-# Chat-style agent that can call either tool
+# Chat-style agent that can call any of the tools
 chat_agent = adk.Agent(
-    tools=[tailor_resume_tool, tailor_resume_text_tool],
-    instructions="You help tailor resumes to job descriptions. If the user uploads a file, use tailor_resume_tool. If they paste resume text, use tailor_resume_text_tool with their pasted resume and JD.",
+    tools=[tailor_resume_tool, tailor_resume_text_tool, shorten_draft_tool],
+    instructions=(
+        "You help tailor resumes to job descriptions. If the user uploads a file, use tailor_resume_tool. "
+        "If they paste resume text, use tailor_resume_text_tool with their pasted resume and JD. "
+        "When they ask for another job with the same resume, call tailor_resume_text_tool with an empty resume_text and the new JD. "
+        "When they ask to make the result shorter, use shorten_draft_tool."
+    ),
 )
 
 web_app = adk.web.App(
-    tools=[tailor_resume_tool, tailor_resume_text_tool],
+    tools=[tailor_resume_tool, tailor_resume_text_tool, shorten_draft_tool],
     agent=chat_agent,
     title="Resume Tailor",
     description="Tailors a resume and cover letter to a job posting using Gemini when available.",
@@ -1,6 +1,6 @@
 import json
 import re
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 
 def extract_json_block(text: str) -> Dict[str, Any]:
@@ -27,3 +27,28 @@ def extract_json_block(text: str) -> Dict[str, Any]:
         except json.JSONDecodeError:
             return {}
     return {}
+
+
+def extract_json_array(text: str) -> List[Any]:
+    """
+    Extract the first JSON array from an LLM response. Handles code fences and mixed prose.
+    Returns an empty list on failure to keep callers resilient.
+    """
+    if not text:
+        return []
+    fence_match = re.search(r"```(?:json)?\s*(\[.*?\])\s*```", text, re.DOTALL | re.IGNORECASE)
+    if fence_match:
+        try:
+            value = json.loads(fence_match.group(1))
+            if isinstance(value, list):
+                return value
+        except json.JSONDecodeError:
+            pass
+    bracket_match = re.search(r"(\[.*\])", text, re.DOTALL)
+    if bracket_match:
+        try:
+            value = json.loads(bracket_match.group(1))
+        except json.JSONDecodeError:
+            return []
+        return value if isinstance(value, list) else []
+    return []
@@ -0,0 +1,152 @@
+"""
+Deterministic fit scoring between the JD analysis and the matcher.
+
+Scores how well a candidate fits a posting from must-have coverage, seniority and title
+similarity, so postings that are clearly out of reach can skip the LLM stages.
+"""
+import re
+from functools import lru_cache
+
+from config import FitConfig
+from schemas import CandidateProfile, FitScore, JobRequirements
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#.]+")
+_YEARS_RE = re.compile(r"(\d{1,2})\s*\+?\s*(?:years|yrs)", re.IGNORECASE)
+_STOPWORDS = frozenset(
+    "a an and at experience for in of on or the to with years yrs strong knowledge proficiency skills".split()
+)
+# Seniority levels by title keyword; years of experience map onto the same scale.
+_LEVEL_WORDS = {
+    "intern": 0,
+    "internship": 0,
+    "junior": 1,
+    "jr": 1,
+    "associate": 1,
+    "graduate": 1,
+    "mid": 2,
+    "senior": 3,
+    "sr": 3,
+    "lead": 4,
+    "staff": 4,
+    "principal": 4,
+    "architect": 4,
+    "manager": 4,
+    "head": 5,
+    "director": 5,
+    "vp": 5,
+}
+_TITLE_NOISE = frozenset(_LEVEL_WORDS) | _STOPWORDS | {"i", "ii", "iii", "tbd"}
+
+
+class LowFitPosting(Exception):
+    """Raised by the orchestrator when a posting scores below FitConfig.min_score."""
+
+    def __init__(self, fit: FitScore, deferred: bool = False):
+        super().__init__(fit.reason)
+        self.fit = fit
+        self.deferred = deferred
+
+
+@lru_cache(maxsize=4096)
+def _tokens(text: str) -> frozenset[str]:
+    return frozenset(t.strip(".") for t in _TOKEN_RE.findall(text.lower()) if t.strip(".") not in _STOPWORDS)
+
+
+def _level_from_years(years: int) -> int:
+    if years >= 10:
+        return 4
+    if years >= 5:
+        return 3
+    if years >= 2:
+        return 2
+    return 1
+
+
+def _title_level(text: str) -> int | None:
+    levels = [_LEVEL_WORDS[t] for t in _tokens(text) if t in _LEVEL_WORDS]
+    return max(levels) if levels else None
+
+
+def _max_years(texts) -> int | None:
+    years = [int(m) for text in texts for m in _YEARS_RE.findall(text)]
+    return max(years) if years else None
+
+
+class FitScorerAgent:
+    """Cheap, LLM-free relevance score of a profile against analyzed requirements."""
+
+    def __init__(self, config: FitConfig | None = None):
+        self.config = config or FitConfig()
+
+    @staticmethod
+    def must_have_coverage(profile: CandidateProfile, jd: JobRequirements) -> tuple[float, list[str]]:
+        """Share of must-haves found in the profile; a requirement counts when most of its terms appear."""
+        if not jd.must_haves:
+            return 1.0, []
+        corpus = _tokens(" ".join([profile.summary, *profile.skills, *profile.experience, *(profile.extras or [])]))
+        missing = []
+        for requirement in jd.must_haves:
+            terms = _tokens(requirement)
+            if not terms:
+                continue
+            if len(terms & corpus) * 2 < len(terms):
+                missing.append(requirement)
+        counted = [req for req in jd.must_haves if _tokens(req)]
+        if not counted:
+            return 1.0, []
+        return 1 - len(missing) / len(counted), missing
+
+    @staticmethod
+    def seniority(profile: CandidateProfile, jd: JobRequirements) -> float:
+        """1.0 when levels line up (or are unknown), lower when under- or heavily over-qualified."""
+        wanted = _title_level(jd.title)
+        years_wanted = _max_years(jd.must_haves + jd.nice_to_haves)
+        if years_wanted is not None:
+            wanted = max(wanted or 0, _level_from_years(years_wanted))
+        levels = [lvl for lvl in (_title_level(e) for e in profile.experience) if lvl is not None]
+        years_have = _max_years([profile.summary, *profile.experience])
+        if years_have is not None:
+            levels.append(_level_from_years(years_have))
+        have = max(levels) if levels else None
+        if wanted is None or have is None:
+            return 1.0
+        gap = wanted - have
+        if gap <= 0:
+            return 1.0 if gap >= -1 else 0.5
+        return 0.5 if gap == 1 else 0.0
+
+    @staticmethod
+    def title_similarity(profile: CandidateProfile, jd: JobRequirements) -> float:
+        """Best share of the posting's title words found in any experience line or the summary."""
+        wanted = _tokens(jd.title) - _TITLE_NOISE
+        if not wanted:
+            return 1.0
+        candidates = [*profile.experience, profile.summary]
+        return max((len(wanted & _tokens(text)) / len(wanted) for text in candidates), default=0.0)
+
+    def run(self, profile: CandidateProfile, jd: JobRequirements) -> FitScore:
+        cfg = self.config
+        coverage, missing = self.must_have_coverage(profile, jd)
+        seniority = self.seniority(profile, jd)
+        title = self.title_similarity(profile, jd)
+        total = cfg.coverage_weight + cfg.seniority_weight + cfg.title_weight or 1.0
+        score = (cfg.coverage_weight * coverage + cfg.seniority_weight * seniority + cfg.title_weight * title) / total
+
+        reasons = []
+        if missing:
+            reasons.append(f"missing {len(missing)}/{len(jd.must_haves)} must-haves ({', '.join(missing[:3])})")
+        if seniority < 1.0:
+            reasons.append("seniority mismatch")
+        if title < 0.5:
+            reasons.append("unrelated title")
+        return FitScore(
+            score=round(score, 3),
+            must_have_coverage=round(coverage, 3),
+            seniority=seniority,
+            title_similarity=round(title, 3),
+            missing=missing,
+            reason=f"fit {score:.2f}: " + ("; ".join(reasons) or "good match"),
+        )
+
+    def passes(self, fit: FitScore) -> bool:
+        return self.config.min_score is None or fit.score >= self.config.min_score
@@ -1,25 +1,100 @@
-try:
-    from google import genai
-except Exception:  # pragma: no cover - optional dependency for offline tests
-    genai = None
+import hashlib
+from typing import Iterable
 
-from agents.common import extract_json_block
-from agents.llm_utils import LLMClientWrapper
+from agents.common import extract_json_array, extract_json_block
+from agents.llm_utils import LazyLLMMixin, LLMClientWrapper, mark_fallback, run_cascade
 from config import ModelConfig
 from schemas import JobRequirements
+from tools.jd_dedupe import JDDedupeIndex
 
 
-class JDAnalyzerAgent:
-    def __init__(self, config: ModelConfig | None = None, llm_client=None, use_llm: bool = True):
+_SCHEMA = (
+    "{\"title\": str, \"company\": str, \"must_haves\": [str], \"nice_to_haves\": [str], "
+    "\"responsibilities\": [str], \"location\": str|null}"
+)
+
+
+def _estimate_tokens(text: str) -> int:
+    # Rough heuristic (~4 characters per token) used only for batch packing.
+    return len(text) // 4 + 1
+
+
+class JDAnalyzerAgent(LazyLLMMixin):
+    llm_stage = "jd"
+    llm_model_attr = "jd_model"
+    batch_prompt_tokens = 6000
+    max_batch_size = 8
+
+    def __init__(
+        self,
+        config: ModelConfig | None = None,
+        llm_client=None,
+        use_llm: bool = True,
+        fast_llm_client=None,
+        dedupe_index: JDDedupeIndex | None = None,
+    ):
         config = config or ModelConfig()
         self.use_llm = use_llm
-        self.llm = None
-        if llm_client is not None:
-            self.llm = LLMClientWrapper(llm_client, max_retries=config.max_retries)
-        elif self.use_llm and genai is not None and hasattr(genai, "GenerativeModel"):
-            self.llm = LLMClientWrapper(genai.GenerativeModel(config.jd_model), max_retries=config.max_retries)
+        self._setup_llms(config, llm_client=llm_client, fast_llm_client=fast_llm_client)
+        # Near-duplicate postings (reposts, light edits) reuse a stored analysis instead of an LLM call.
+        self.dedupe_index = dedupe_index
+
+    @staticmethod
+    def _to_requirements(payload: dict) -> JobRequirements | None:
+        if not payload:
+            return None
+
+        def _list(key: str):
+            value = payload.get(key, [])
+            return value if isinstance(value, list) else [str(value)]
+
+        try:
+            return JobRequirements(
+                title=str(payload.get("title", "TBD")),
+                company=str(payload.get("company", "TBD")),
+                must_haves=_list("must_haves"),
+                nice_to_haves=_list("nice_to_haves"),
+                responsibilities=_list("responsibilities"),
+                location=payload.get("location"),
+            )
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _acceptable(jd: JobRequirements | None) -> bool:
+        # Only the fields every posting has; the lists may legitimately be empty.
+        return jd is not None and all(value.strip() not in ("", "TBD") for value in (jd.title, jd.company))
+
+    def _find_duplicate(self, jd_text: str) -> tuple[JobRequirements | None, tuple[int, ...] | None]:
+        if self.dedupe_index is None:
+            return None, None
+        signature = self.dedupe_index.signature(jd_text)
+        match = self.dedupe_index.find(jd_text, signature=signature)
+        return (match.value.model_copy(deep=True) if match else None), signature
+
+    def _remember(self, jd_text: str, jd: JobRequirements, signature: tuple[int, ...] | None = None) -> None:
+        if self.dedupe_index is not None:
+            key = hashlib.sha1(jd_text.encode("utf-8")).hexdigest()
+            self.dedupe_index.add(key, jd_text, jd, signature=signature)
+
+    def seed(self, postings: Iterable[tuple[str, JobRequirements]]) -> int:
+        """Add postings analyzed earlier (e.g. read back from a ResultStore) to the dedupe index."""
+        if self.dedupe_index is None:
+            return 0
+        count = 0
+        for jd_text, jd in postings:
+            self._remember(jd_text, jd)
+            count += 1
+        return count
+
+    def _analyze(self, llm: LLMClientWrapper, prompt: str, deadline: float | None) -> JobRequirements | None:
+        try:
+            result = llm.generate_text(prompt, deadline=deadline)
+        except Exception:
+            result = ""
+        return self._to_requirements(extract_json_block(result))
 
-    def run(self, jd_text: str) -> JobRequirements:
+    def run(self, jd_text: str, deadline: float | None = None) -> JobRequirements:
         if not jd_text:
             return JobRequirements(
                 title="TBD",
@@ -30,7 +105,7 @@ class JDAnalyzerAgent:
                 location=None,
             )
 
-        if self.llm is None or not self.use_llm:
+        if not self.use_llm or self.llm is None:
             lines = [ln.strip() for ln in jd_text.splitlines() if ln.strip()]
             title = lines[0] if lines else "TBD"
             company = "TBD"
@@ -51,28 +126,106 @@ class JDAnalyzerAgent:
                 location=None,
             )
 
+        duplicate, signature = self._find_duplicate(jd_text)
+        if duplicate is not None:
+            return duplicate
+
         prompt = (
             "Extract structured requirements from this job posting. "
             "Respond ONLY with JSON inside a code fence. Schema:\n"
-            "{\"title\": str, \"company\": str, \"must_haves\": [str], \"nice_to_haves\": [str], \"responsibilities\": [str], \"location\": str|null}\n\n"
+            f"{_SCHEMA}\n\n"
             f"Job posting:\n{jd_text}\n"
         )
-        try:
-            result = self.llm.generate_text(prompt)
-        except Exception:
-            result = ""
+        jd = run_cascade(
+            lambda llm: self._analyze(llm, prompt, deadline),
+            self._acceptable,
+            self.fast_llm,
+            self.llm,
+            self.cascade_stats,
+        )
+        if not self._acceptable(jd):
+            mark_fallback(self.llm_stage)
+        else:
+            self._remember(jd_text, jd, signature)
+        if jd is None:
+            return JobRequirements(
+                title="TBD",
+                company="TBD",
+                must_haves=[],
+                nice_to_haves=[],
+                responsibilities=[],
+                location=None,
+            )
+        return jd
 
-        payload = extract_json_block(result)
+    def _pack(self, jd_texts: list[str], max_prompt_tokens: int) -> list[list[int]]:
+        """Greedily group posting indices so each group's prompt stays within the token budget."""
+        batches: list[list[int]] = []
+        current: list[int] = []
+        used = 0
+        for idx, text in enumerate(jd_texts):
+            cost = _estimate_tokens(text) + 16
+            if current and (used + cost > max_prompt_tokens or len(current) >= self.max_batch_size):
+                batches.append(current)
+                current, used = [], 0
+            current.append(idx)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
 
-        def _list(key: str):
-            value = payload.get(key, [])
-            return value if isinstance(value, list) else [str(value)]
+    def run_batch(
+        self,
+        jd_texts: list[str],
+        max_prompt_tokens: int | None = None,
+        deadline: float | None = None,
+    ) -> list[JobRequirements]:
+        """
+        Analyze several postings with one LLM call per packed group.
+        Each returned element is validated on its own; postings whose element is missing or
+        invalid are re-analyzed individually via run().
+        """
+        if not self.use_llm or self.llm is None:
+            return [self.run(text) for text in jd_texts]
 
-        return JobRequirements(
-            title=str(payload.get("title", "TBD")),
-            company=str(payload.get("company", "TBD")),
-            must_haves=_list("must_haves"),
-            nice_to_haves=_list("nice_to_haves"),
-            responsibilities=_list("responsibilities"),
-            location=payload.get("location"),
-        )
+        results: list[JobRequirements | None] = [None] * len(jd_texts)
+        pending = []
+        for idx, text in enumerate(jd_texts):
+            if not text:
+                results[idx] = self.run(text)
+                continue
+            results[idx] = self._find_duplicate(text)[0]
+            if results[idx] is None:
+                pending.append(idx)
+
+        budget = max_prompt_tokens or self.batch_prompt_tokens
+        for batch in self._pack([jd_texts[idx] for idx in pending], budget):
+            indices = [pending[pos] for pos in batch]
+            if len(indices) == 1:
+                continue
+            postings = "\n\n".join(f"### Posting {idx}\n{jd_texts[idx]}" for idx in indices)
+            prompt = (
+                "Extract structured requirements from each job posting below. "
+                "Respond ONLY with a JSON array inside a code fence, one object per posting, "
+                "each with an integer \"index\" matching the posting number. Object schema:\n"
+                f"{{\"index\": int, {_SCHEMA[1:]}\n\n"
+                f"{postings}\n"
+            )
+            try:
+                text = self.llm.generate_text(prompt, deadline=deadline)
+            except Exception:
+                text = ""
+            for item in extract_json_array(text):
+                # `type(...) is int` rejects 0.0/True, which compare equal to posting numbers.
+                if not isinstance(item, dict) or type(item.get("index")) is not int or item["index"] not in indices:
+                    continue
+                idx = int(item["index"])
+                jd = self._to_requirements(item)
+                if results[idx] is None and self._acceptable(jd):
+                    results[idx] = jd
+                    self._remember(jd_texts[idx], jd)
+
+        for idx, jd in enumerate(results):
+            if jd is None:
+                results[idx] = self.run(jd_texts[idx], deadline=deadline)
+        return results
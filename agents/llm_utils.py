@@ -1,36 +1,462 @@
+import contextvars
+import inspect
+import queue
+import threading
 import time
-from typing import Any, Callable, Optional
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import closing, contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+from profiling import record, timed
+from scheduler import active_scheduler, current_tenant
+
+_EXECUTOR: ThreadPoolExecutor | None = None
+_EXECUTOR_LOCK = threading.Lock()
+
+_GENAI: Any = None
+_GENAI_LOADED = False
+_MODEL_FACTORY: Callable[[str], Any] | None = None
+# Stages that fell back to a heuristic inside the current track_fallbacks() block.
+_FALLBACKS: contextvars.ContextVar[list[str] | None] = contextvars.ContextVar("swift_fallbacks", default=None)
+
+
+def load_genai() -> Any:
+    """
+    Import the Gemini SDK on first use and cache it.
+    Returns None when the SDK is not installed so callers can fall back to heuristics.
+    """
+    global _GENAI, _GENAI_LOADED
+    if not _GENAI_LOADED:
+        try:
+            from google import genai
+        except Exception:  # pragma: no cover - optional dependency for offline tests
+            genai = None
+        _GENAI, _GENAI_LOADED = genai, True
+    return _GENAI
+
+
+def set_model_factory(factory: Callable[[str], Any] | None) -> None:
+    """
+    Build model clients with `factory(model_name)` instead of the Gemini SDK (None restores
+    the SDK), e.g. to point every agent at the stand-in server of bench/loadtest.py.
+    Applies to clients built afterwards; agents build theirs on first use.
+    """
+    global _MODEL_FACTORY
+    _MODEL_FACTORY = factory
+
+
+def create_model(model_name: str) -> Any:
+    """Construct a Gemini model client, or None when the SDK is unavailable."""
+    if _MODEL_FACTORY is not None:
+        return _MODEL_FACTORY(model_name)
+    genai = load_genai()
+    if genai is None or not hasattr(genai, "GenerativeModel"):
+        return None
+    return genai.GenerativeModel(model_name)
+
+
+def ping_model(client: Any, timeout: float = 10.0) -> bool:
+    """
+    Make one cheap real request (a token count, else a one-word generation) so the client's
+    connection and TLS session exist before the first user request. Returns False on failure.
+    """
+    probe = getattr(client, "count_tokens", None) or client.generate_content
+    future = _executor().submit(probe, "ping")
+    try:
+        future.result(timeout=timeout)
+    except Exception:
+        return False
+    return True
+
+
+def _when_done(futures: list[Future], callback: Callable[[], None]) -> None:
+    """Call `callback` once every future in `futures` has completed (at once when there are none)."""
+    if not futures:
+        callback()
+        return
+    pending = [len(futures)]
+    lock = threading.Lock()
+
+    def _done(_future: Future) -> None:
+        with lock:
+            pending[0] -= 1
+            last = pending[0] == 0
+        if last:
+            callback()
+
+    for future in futures:
+        future.add_done_callback(_done)
+
+
+def _executor() -> ThreadPoolExecutor:
+    """Shared pool used to run LLM calls that need a timeout or a hedge."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=32, thread_name_prefix="swift-llm")
+        return _EXECUTOR
 
 
 class LLMClientWrapper:
     """
     Wraps an LLM client and provides a retrying generate_content method.
     Expects the client to have generate_content(prompt) -> obj with .text
+
+    When a timeout or deadline applies, calls run on a shared worker pool so the caller
+    can give up on a hung request. With hedging enabled, a duplicate request is fired once
+    the first one outlives the observed p95 latency and whichever returns first wins.
     """
 
+    hedge_quantile = 0.95
+    hedge_min_samples = 20
+
     def __init__(
         self,
         client: Any,
         max_retries: int = 2,
         backoff_seconds: float = 1.0,
         on_error: Optional[Callable[[Exception, int], None]] = None,
+        timeout: float | None = None,
+        hedge_after: float | None = None,
     ):
         self.client = client
         self.max_retries = max_retries
         self.backoff_seconds = backoff_seconds
         self.on_error = on_error
+        self.timeout = timeout
+        self.hedge_after = hedge_after
+        self._latencies: deque[float] = deque(maxlen=200)
+        self._latency_lock = threading.Lock()
+
+    @classmethod
+    def for_stage(cls, client: Any, config: Any, stage: str) -> "LLMClientWrapper":
+        """Build a wrapper using the retry, timeout and hedging settings of a ModelConfig stage."""
+        return cls(
+            client,
+            max_retries=config.max_retries,
+            timeout=config.stage_timeout(stage),
+            hedge_after=config.hedge_after_seconds if config.hedge_requests else None,
+        )
 
-    def generate_text(self, prompt: str) -> str:
+    def generate_text(self, prompt: str, deadline: float | None = None) -> str:
+        """
+        Generate text, retrying with exponential backoff.
+        `deadline` is an absolute time.monotonic() value; the stage timeout and the deadline
+        together bound the total time spent across all attempts. When a FairScheduler is
+        installed, each attempt first waits for a slot of the current tenant (see scheduler).
+        """
+        if self.timeout is not None:
+            stage_deadline = time.monotonic() + self.timeout
+            deadline = stage_deadline if deadline is None else min(deadline, stage_deadline)
         last_err: Exception | None = None
         for attempt in range(self.max_retries + 1):
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise TimeoutError("LLM deadline exceeded") from last_err
             try:
-                return self.client.generate_content(prompt).text
+                with timed("llm"):
+                    return self._scheduled_call(prompt, remaining, deadline)
             except Exception as err:
                 last_err = err
                 if self.on_error:
                     self.on_error(err, attempt)
                 if attempt < self.max_retries:
-                    time.sleep(self.backoff_seconds * (2 ** attempt))
+                    delay = self.backoff_seconds * (2 ** attempt)
+                    if deadline is not None and time.monotonic() + delay >= deadline:
+                        break
+                    time.sleep(delay)
         if last_err:
             raise last_err
         return ""
+
+    @property
+    def supports_streaming(self) -> bool:
+        """Whether the client accepts generate_content(prompt, stream=True)."""
+        try:
+            params = inspect.signature(self.client.generate_content).parameters
+        except (AttributeError, TypeError, ValueError):
+            return False
+        return "stream" in params or any(p.kind is p.VAR_KEYWORD for p in params.values())
+
+    def stream_text(self, prompt: str, deadline: float | None = None) -> Iterator[str]:
+        """
+        Yield the reply in chunks as the model produces them. Closing the generator abandons
+        the request, so callers can stop a reply that is already known to be unusable.
+        A request that fails before its first chunk is retried with the same backoff and
+        deadline as generate_text; once text has been yielded, errors propagate. Streams are
+        not hedged. A client without streaming support yields its whole reply once (via
+        generate_text).
+        """
+        if not self.supports_streaming:
+            yield self.generate_text(prompt, deadline=deadline)
+            return
+        if self.timeout is not None:
+            stage_deadline = time.monotonic() + self.timeout
+            deadline = stage_deadline if deadline is None else min(deadline, stage_deadline)
+        last_err: Exception | None = None
+        for attempt in range(self.max_retries + 1):
+            if deadline is not None and deadline - time.monotonic() <= 0:
+                raise TimeoutError("LLM deadline exceeded") from last_err
+            yielded = False
+            try:
+                with closing(self._stream_once(prompt, deadline)) as stream:
+                    for chunk in stream:
+                        yielded = True
+                        yield chunk
+                return
+            except Exception as err:
+                if yielded:
+                    raise
+                last_err = err
+                if self.on_error:
+                    self.on_error(err, attempt)
+                if attempt < self.max_retries:
+                    delay = self.backoff_seconds * (2 ** attempt)
+                    if deadline is not None and time.monotonic() + delay >= deadline:
+                        break
+                    time.sleep(delay)
+        raise last_err
+
+    def _stream_once(self, prompt: str, deadline: float | None) -> Iterator[str]:
+        started = time.perf_counter()
+        scheduler = active_scheduler()
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        if scheduler is not None:
+            tenant, priority = current_tenant()
+            scheduler.acquire(tenant, priority, timeout=remaining)
+        chunks: queue.Queue = queue.Queue()
+        cancelled = threading.Event()
+
+        def _produce():
+            try:
+                for chunk in self.client.generate_content(prompt, stream=True):
+                    if cancelled.is_set():
+                        return
+                    chunks.put(("chunk", getattr(chunk, "text", "") or ""))
+                chunks.put(("done", None))
+            except Exception as err:
+                chunks.put(("error", err))
+
+        producer = _executor().submit(contextvars.copy_context().run, _produce)
+        if scheduler is not None:
+            # The slot stays held until the producer stops, not just until the caller stops reading.
+            _when_done([producer], lambda: scheduler.release(tenant))
+        try:
+            while True:
+                timeout = None if deadline is None else deadline - time.monotonic()
+                try:
+                    if timeout is not None and timeout <= 0:
+                        raise queue.Empty
+                    kind, value = chunks.get(timeout=timeout)
+                except queue.Empty:
+                    raise TimeoutError("LLM stream deadline exceeded") from None
+                if kind == "done":
+                    return
+                if kind == "error":
+                    raise value
+                if value:
+                    yield value
+        finally:
+            cancelled.set()
+            # Includes the caller's per-chunk work, which is small next to the model's latency.
+            record("llm", time.perf_counter() - started)
+
+    def _scheduled_call(self, prompt: str, remaining: float | None, deadline: float | None) -> str:
+        scheduler = active_scheduler()
+        if scheduler is None:
+            return self._call(prompt, remaining)
+        tenant, priority = current_tenant()
+        scheduler.acquire(tenant, priority, timeout=remaining)
+        # Time spent queued for a slot counts against the same budget. The slot is held until
+        # every request the call started has finished, even after the call gave up on them.
+        budget = None if deadline is None else max(0.0, deadline - time.monotonic())
+        return self._call(prompt, budget, settled=lambda: scheduler.release(tenant))
+
+    def _invoke(self, prompt: str) -> str:
+        return self.client.generate_content(prompt).text
+
+    def _hedge_delay(self) -> float | None:
+        if self.hedge_after is None:
+            return None
+        with self._latency_lock:
+            samples = sorted(self._latencies)
+        if len(samples) < self.hedge_min_samples:
+            return self.hedge_after
+        return samples[int(self.hedge_quantile * (len(samples) - 1))]
+
+    def _call(self, prompt: str, budget: float | None, settled: Callable[[], None] | None = None) -> str:
+        """
+        One attempt, bounded by `budget` and hedged when enabled. `settled` is called once every
+        request it started has finished, which can be after a timed-out call has returned.
+        """
+        hedge_delay = self._hedge_delay()
+        if budget is None and hedge_delay is None:
+            try:
+                return self._invoke(prompt)
+            finally:
+                if settled is not None:
+                    settled()
+
+        pool = _executor()
+        started = time.monotonic()
+        submitted = [pool.submit(self._invoke, prompt)]
+        try:
+            return self._await(pool, prompt, submitted, started, budget, hedge_delay)
+        finally:
+            if settled is not None:
+                _when_done(submitted, settled)
+
+    def _await(
+        self,
+        pool: ThreadPoolExecutor,
+        prompt: str,
+        submitted: list[Future],
+        started: float,
+        budget: float | None,
+        hedge_delay: float | None,
+    ) -> str:
+        pending = set(submitted)
+        hedged = hedge_delay is None
+        error: BaseException | None = None
+        while pending:
+            elapsed = time.monotonic() - started
+            waits = []
+            if budget is not None:
+                waits.append(budget - elapsed)
+            if not hedged:
+                waits.append(hedge_delay - elapsed)
+            timeout = max(0.0, min(waits)) if waits else None
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    with self._latency_lock:
+                        self._latencies.append(time.monotonic() - started)
+                    return future.result()
+                error = future.exception()
+            if done:
+                continue
+            elapsed = time.monotonic() - started
+            if budget is not None and elapsed >= budget:
+                raise TimeoutError(f"LLM call exceeded {budget:.1f}s")
+            if not hedged and elapsed >= hedge_delay:
+                submitted.append(pool.submit(self._invoke, prompt))
+                pending.add(submitted[-1])
+                hedged = True
+        raise error
+
+
+class CascadeStats:
+    """Counts how often a cascading stage had to escalate from the fast to the strong model."""
+
+    def __init__(self):
+        self.calls = 0
+        self.escalations = 0
+        self._lock = threading.Lock()
+
+    def record(self, escalated: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            if escalated:
+                self.escalations += 1
+
+    @property
+    def escalation_rate(self) -> float:
+        return self.escalations / self.calls if self.calls else 0.0
+
+
+def run_cascade(
+    call: Callable[[LLMClientWrapper], Any],
+    accept: Callable[[Any], bool],
+    fast: LLMClientWrapper | None,
+    strong: LLMClientWrapper,
+    stats: CascadeStats,
+) -> Any:
+    """
+    Run `call` on the fast model and keep the result if `accept` approves it; otherwise
+    escalate to the strong model and return its result unchecked.
+    Without a fast model this is a plain call on the strong one.
+    """
+    if fast is None:
+        return call(strong)
+    result = call(fast)
+    if accept(result):
+        stats.record(escalated=False)
+        return result
+    stats.record(escalated=True)
+    return call(strong)
+
+
+@contextmanager
+def track_fallbacks() -> Iterator[list[str]]:
+    """
+    Collect the stages that fell back to a heuristic (see mark_fallback) while the block runs.
+    Threads started with a copy of the caller's context report into the same list.
+    """
+    marks: list[str] = []
+    token = _FALLBACKS.set(marks)
+    try:
+        yield marks
+    finally:
+        _FALLBACKS.reset(token)
+
+
+def mark_fallback(stage: str) -> None:
+    """Report that `stage` returned a heuristic result because its LLM call failed or was rejected."""
+    marks = _FALLBACKS.get()
+    if marks is not None:
+        marks.append(stage)
+
+
+class LazyLLMMixin:
+    """
+    Builds an agent's LLM wrappers on first access instead of in __init__, so constructing
+    an agent never imports the Gemini SDK and offline runs never pay for it.
+    Agents set `llm_stage` / `llm_model_attr` and call `_setup_llms` from __init__.
+    """
+
+    llm_stage = ""
+    llm_model_attr = ""
+    use_llm = True
+    # Bump in an agent when its prompt changes so results stored for the old prompt are recomputed.
+    prompt_version = 1
+
+    def _setup_llms(self, config: Any, llm_client: Any = None, fast_llm_client: Any = None, cascade: bool = True):
+        self._llm_config = config
+        self._llm_client = llm_client
+        self._fast_llm_client = fast_llm_client
+        self._llm_cascade = cascade
+        self._llms: tuple[LLMClientWrapper | None, LLMClientWrapper | None] | None = None
+        self._llm_lock = threading.Lock()
+        self.cascade_stats = CascadeStats()
+
+    def _resolve_llms(self) -> tuple[LLMClientWrapper | None, LLMClientWrapper | None]:
+        if self._llms is not None:
+            return self._llms
+        if self._llm_client is None and not self.use_llm:
+            return None, None
+        with self._llm_lock:
+            if self._llms is None:
+                config, stage = self._llm_config, self.llm_stage
+                llm = fast = None
+                if self._llm_client is not None:
+                    llm = LLMClientWrapper.for_stage(self._llm_client, config, stage)
+                else:
+                    model = create_model(getattr(config, self.llm_model_attr))
+                    if model is not None:
+                        llm = LLMClientWrapper.for_stage(model, config, stage)
+                if self._llm_cascade and config.cascade and llm is not None:
+                    if self._fast_llm_client is not None:
+                        fast = LLMClientWrapper.for_stage(self._fast_llm_client, config, stage)
+                    elif self._llm_client is None:
+                        fast = LLMClientWrapper.for_stage(create_model(config.fast_model), config, stage)
+                self._llms = (llm, fast)
+        return self._llms
+
+    @property
+    def llm(self) -> LLMClientWrapper | None:
+        return self._resolve_llms()[0]
+
+    @property
+    def fast_llm(self) -> LLMClientWrapper | None:
+        return self._resolve_llms()[1]
@@ -1,11 +1,121 @@
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field, replace
+from difflib import SequenceMatcher
+from pathlib import Path
+
+from pydantic import BaseModel
+
 from agents.resume_parser import ResumeParserAgent
 from agents.jd_analyzer import JDAnalyzerAgent
+from agents.fit_scorer import FitScorerAgent, LowFitPosting
+from agents.llm_utils import ping_model, track_fallbacks
 from agents.resume_jd_matcher import ResumeJDMatcherAgent
 from agents.swift_writer import SwiftWriterAgent
 from agents.swift_editor import SwiftEditorAgent
-from config import ModelConfig
-from logger import get_logger, redact
-from schemas import DraftContent
+from config import FitConfig, ModelConfig
+from logger import get_logger, log_context, redact
+from profiling import timed
+from schemas import CandidateProfile, DraftContent, FitScore, JobRequirements, StrategyPlan, ValidationResult
+from store import ResultStore, input_hash
+from tools.jd_dedupe import JDDedupeIndex
+
+
+# Which edited fields invalidate which downstream stage during SwiftOrchestratorAgent.rerun.
+MATCHER_PROFILE_FIELDS = {"summary", "skills", "experience", "education", "extras"}
+MATCHER_JD_FIELDS = {"must_haves", "nice_to_haves", "responsibilities"}
+EDITOR_JD_FIELDS = {"must_haves"}
+# Identity fields that are patched into existing drafts by whole-word replacement instead of regenerating.
+PATCHABLE_PROFILE_FIELDS = {"name", "contact"}
+PATCHABLE_JD_FIELDS = {"title", "company", "location"}
+
+
+@dataclass
+class RunState:
+    """Artifacts of one orchestrator run, kept so later edits can be re-tailored incrementally."""
+
+    jd_text: str
+    profile: CandidateProfile
+    jd: JobRequirements
+    strategy: StrategyPlan
+    draft: DraftContent
+    final: DraftContent
+    validation: ValidationResult | None = None
+    fit: FitScore | None = None
+    stages_run: list[str] = field(default_factory=list)
+
+
+def changed_fields(old: BaseModel, new: BaseModel) -> set[str]:
+    return {name for name in type(new).model_fields if getattr(old, name) != getattr(new, name)}
+
+
+def _identity_patches(old: BaseModel, new: BaseModel, fields: set[str]) -> list[tuple[str, str]]:
+    patches = []
+    for name in sorted(fields):
+        before, after = getattr(old, name), getattr(new, name)
+        if before and before != after:
+            patches.append((before, after or ""))
+    return patches
+
+
+def _items(value) -> list[str]:
+    if not value:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+def _item_changes(old: BaseModel, new: BaseModel, fields: set[str]) -> tuple[list[tuple[str, str, str]], list[str]]:
+    """
+    Item-level diff of list (or text) fields: (field, old item, new item) for each item edited
+    in place, and a description of each item added or removed.
+    """
+    edits, other = [], []
+    for name in sorted(fields):
+        before, after = _items(getattr(old, name)), _items(getattr(new, name))
+        for tag, i1, i2, j1, j2 in SequenceMatcher(a=before, b=after, autojunk=False).get_opcodes():
+            if tag == "equal":
+                continue
+            if tag == "replace" and i2 - i1 == j2 - j1:
+                edits.extend((name, a, b) for a, b in zip(before[i1:i2], after[j1:j2]))
+                continue
+            other.extend(f"{name}: removed {item!r}" for item in before[i1:i2])
+            other.extend(f"{name}: added {item!r}" for item in after[j1:j2])
+    return edits, other
+
+
+def _whole_word(text: str) -> re.Pattern:
+    return re.compile(r"(?<!\w)" + re.escape(text) + r"(?!\w)")
+
+
+def _occurs(draft: DraftContent, text: str) -> bool:
+    pattern = _whole_word(text)
+    return bool(pattern.search(draft.tailored_resume) or pattern.search(draft.tailored_cover or ""))
+
+
+def _patch_text(text: str, patches: list[tuple[str, str]]) -> str:
+    for before, after in patches:
+        # Whole words only: renaming "Al" must not touch "Algorithms".
+        text = _whole_word(before).sub(lambda _: after, text)
+    return text
+
+
+def _patch_draft(draft: DraftContent, patches: list[tuple[str, str]]) -> DraftContent:
+    if not patches:
+        return draft
+    cover = _patch_text(draft.tailored_cover, patches) if draft.tailored_cover else draft.tailored_cover
+    return DraftContent(tailored_resume=_patch_text(draft.tailored_resume, patches), tailored_cover=cover)
+
+
+def _patch_strategy(strategy: StrategyPlan, patches: list[tuple[str, str]]) -> StrategyPlan:
+    if not patches:
+        return strategy
+    return StrategyPlan(
+        gaps=[_patch_text(item, patches) for item in strategy.gaps],
+        positioning=[_patch_text(item, patches) for item in strategy.positioning],
+        rewriting_focus=[_patch_text(item, patches) for item in strategy.rewriting_focus],
+    )
 
 
 class SwiftOrchestratorAgent:
@@ -21,41 +131,416 @@ class SwiftOrchestratorAgent:
         max_editor_loops: int = 2,
         config: ModelConfig | None = None,
         pii_redact: bool = True,
+        store: ResultStore | None = None,
+        fit_scorer: FitScorerAgent | None = None,
+        fit_config: FitConfig | None = None,
     ):
         config = config or ModelConfig()
+        self.config = config
         self.resume_parser = resume_parser or ResumeParserAgent()
         self.jd_analyzer = jd_analyzer or JDAnalyzerAgent(config=config)
         self.matcher = matcher or ResumeJDMatcherAgent(config=config)
         self.writer = writer or SwiftWriterAgent(config=config)
         self.editor = editor or SwiftEditorAgent(config=config)
+        self.fit_scorer = fit_scorer or FitScorerAgent(config=fit_config)
         self.max_editor_loops = max_editor_loops
         self.logger = get_logger()
         self.pii_redact = pii_redact
+        self.store = store
+        # The default analyzer shares one dedupe index across this orchestrator's runs, so a
+        # repost reuses an earlier analysis; with a store it is seeded from the stored postings.
+        if jd_analyzer is None:
+            self.jd_analyzer.dedupe_index = JDDedupeIndex()
+        self._dedupe_seeded = store is None
+        self._seed_lock = threading.Lock()
 
-    def run(self, resume_path: str, jd_text: str) -> DraftContent:
-        self.logger.info("Start orchestration")
-        profile = self.resume_parser.run(resume_path)
-        self.logger.info("Parsed resume for %s", redact(profile.name, self.pii_redact))
+    def _seed_dedupe(self) -> None:
+        """Load the store's analyzed postings into the JD analyzer's dedupe index, once."""
+        index = self.jd_analyzer.dedupe_index
+        if self._dedupe_seeded or index is None or not self.jd_analyzer.use_llm:
+            return
+        with self._seed_lock:
+            if self._dedupe_seeded:
+                return
+            fingerprint = self._fingerprint(self.jd_analyzer)
+            # Only analyses made by the current setup; offline or older-prompt results are skipped.
+            seeded = self.jd_analyzer.seed(
+                (text, jd)
+                for key, text, jd in self.store.postings(JobRequirements, limit=index.max_entries)
+                if key == input_hash("jd", text, fingerprint)
+            )
+            self._dedupe_seeded = True
+            self.logger.info("Seeded JD dedupe index with %s stored postings", seeded)
 
-        jd = self.jd_analyzer.run(jd_text)
-        self.logger.info("Analyzed JD: %s @ %s", jd.title, jd.company)
+    def warm(self, connect: bool = False, timeout: float = 10.0) -> list[str]:
+        """
+        Build every online agent's model clients ahead of the first request.
+        Building a client opens no connection; with `connect`, each distinct client also makes
+        one cheap real request (see ping_model) so the first user request skips connect/TLS.
+        Returns the names of the stages whose clients are ready (and, with `connect`, reachable).
+        """
+        stages = {
+            "resume_parser": self.resume_parser,
+            "jd": self.jd_analyzer,
+            "matcher": self.matcher,
+            "writer": self.writer,
+            "editor": self.editor,
+        }
+        warmed = []
+        pinged: dict[int, bool] = {}
+        for name, agent in stages.items():
+            if not getattr(agent, "use_llm", False) or getattr(agent, "llm", None) is None:
+                continue
+            clients = [agent.llm, getattr(agent, "fast_llm", None)]
+            if connect:
+                reachable = True
+                for client in filter(None, clients):
+                    # Wrappers share the underlying model client; ping each one once.
+                    raw = getattr(client, "client", client)
+                    if id(raw) not in pinged:
+                        pinged[id(raw)] = ping_model(raw, timeout=timeout)
+                    reachable = reachable and pinged[id(raw)]
+                if not reachable:
+                    self.logger.warning("Could not reach the %s model while warming", name)
+                    continue
+            warmed.append(name)
+        self._seed_dedupe()
+        return warmed
 
-        strategy = self.matcher.run(profile, jd)
-        self.logger.info("Strategy gaps: %s", ", ".join(strategy.gaps) if strategy.gaps else "none")
+    def escalation_rates(self) -> dict[str, float]:
+        """Share of cascading calls per stage that had to escalate to the strong model."""
+        stages = {"jd": self.jd_analyzer, "matcher": self.matcher, "editor": self.editor}
+        return {
+            name: agent.cascade_stats.escalation_rate
+            for name, agent in stages.items()
+            if getattr(agent, "cascade_stats", None) is not None
+        }
 
-        draft = self.writer.run(profile, jd, strategy)
-        self.logger.info("Writer produced draft")
+    def _deadline(self) -> float | None:
+        if self.config.request_timeout is None:
+            return None
+        return time.monotonic() + self.config.request_timeout
 
-        required_keywords = jd.must_haves
+    def _fingerprint(self, agent) -> tuple:
+        """Identifies how an agent produces its output, so stored results from other setups are not reused."""
+        uses_llm = bool(getattr(agent, "use_llm", False)) and getattr(agent, "llm", None) is not None
+        model = getattr(self.config, getattr(agent, "llm_model_attr", ""), None) if uses_llm else None
+        return (type(agent).__name__, getattr(agent, "prompt_version", 1), uses_llm, model, getattr(agent, "mode", None))
+
+    def _stage(self, stage: str, model_cls, compute, key_parts, keys: dict, run_id: str, on_stored=None):
+        """
+        Run a stage, or reuse its stored result when a store is configured and the inputs are unchanged.
+        `on_stored(key)` runs whenever the result is (or already was) in the store.
+        """
+        with log_context(stage=stage), timed(stage):
+            if self.store is None:
+                return compute()
+            key = input_hash(stage, *key_parts())
+            keys[stage] = key
+            stored = self.store.get(stage, key, model_cls)
+            if stored is not None:
+                self.logger.info("Reusing stored %s result", stage)
+                if on_stored is not None:
+                    on_stored(key)
+                return stored
+            with track_fallbacks() as fallbacks:
+                result = compute()
+            if fallbacks:
+                # A heuristic stand-in must not be served to later runs in place of a real result.
+                self.logger.warning("Not storing %s result: %s fell back to its heuristic", stage, fallbacks[0])
+            else:
+                self.store.put(stage, key, result, run_id=run_id)
+                if on_stored is not None:
+                    on_stored(key)
+            return result
+
+    def _edit(
+        self,
+        draft: DraftContent,
+        required_keywords: list[str],
+        deadline: float | None,
+    ) -> tuple[DraftContent, ValidationResult | None]:
         last_validation = None
         for attempt in range(max(1, self.max_editor_loops)):
-            draft, validation = self.editor.run(draft, required_keywords=required_keywords)
+            draft, validation = self.editor.run(draft, required_keywords=required_keywords, deadline=deadline)
             last_validation = validation
             if validation.passes:
                 self.logger.info("Validation passed on attempt %s", attempt + 1)
-                return draft
+                return draft, validation
             self.logger.warning("Validation failed (attempt %s): %s", attempt + 1, "; ".join(validation.reasons))
+            if deadline is not None and time.monotonic() >= deadline:
+                self.logger.warning("Request deadline reached; skipping further editor passes")
+                break
         if last_validation and last_validation.reasons:
             note = "\n\nValidation notes: " + "; ".join(last_validation.reasons)
             draft = DraftContent(tailored_resume=draft.tailored_resume + note, tailored_cover=draft.tailored_cover)
+        return draft, last_validation
+
+    def _final(
+        self,
+        draft: DraftContent,
+        required_keywords: list[str],
+        deadline: float | None,
+        run_id: str,
+    ) -> tuple[DraftContent, ValidationResult | None]:
+        """Editor loop, reusing the stored final draft and validation for an unchanged draft."""
+        with log_context(stage="final"), timed("final"):
+            if self.store is None:
+                return self._edit(draft, required_keywords, deadline)
+            key = input_hash("final", draft, required_keywords, self.max_editor_loops, self._fingerprint(self.editor))
+            final = self.store.get("final", key, DraftContent)
+            validation = self.store.get("validation", key, ValidationResult)
+            if final is not None and validation is not None:
+                self.logger.info("Reusing stored final result")
+                return final, validation
+            with track_fallbacks() as fallbacks:
+                final, validation = self._edit(draft, required_keywords, deadline)
+            if fallbacks:
+                self.logger.warning("Not storing final result: %s fell back to its heuristic", fallbacks[0])
+                return final, validation
+            self.store.put("final", key, final, run_id=run_id)
+            if validation is not None:
+                self.store.put("validation", key, validation, run_id=run_id)
+            return final, validation
+
+    def _profile(self, resume_path: str, keys: dict, run_id: str) -> CandidateProfile:
+        profile = self._stage(
+            "profile",
+            CandidateProfile,
+            lambda: self.resume_parser.run(resume_path),
+            lambda: (Path(resume_path).suffix.lower(), Path(resume_path).read_bytes(), self._fingerprint(self.resume_parser)),
+            keys,
+            run_id,
+        )
+        self.logger.info("Parsed resume for %s", redact(profile.name, self.pii_redact))
+        return profile
+
+    def _requirements(self, jd_text: str, deadline: float | None, keys: dict, run_id: str) -> JobRequirements:
+        self._seed_dedupe()
+        keep_posting = None
+        if self.jd_analyzer.dedupe_index is not None:
+            # Only postings whose analysis made it into the store seed later dedupe indexes.
+            def keep_posting(key: str) -> None:
+                self.store.put_posting(key, jd_text)
+
+        jd = self._stage(
+            "jd",
+            JobRequirements,
+            lambda: self.jd_analyzer.run(jd_text, deadline=deadline),
+            lambda: (jd_text, self._fingerprint(self.jd_analyzer)),
+            keys,
+            run_id,
+            on_stored=keep_posting,
+        )
+        self.logger.info("Analyzed JD: %s @ %s", jd.title, jd.company)
+        return jd
+
+    def _fit(self, profile: CandidateProfile, jd: JobRequirements, enforce: bool) -> FitScore:
+        """Score fit before any matcher/writer/editor LLM calls; low-fit postings stop here."""
+        with log_context(stage="fit"), timed("fit"):
+            fit = self.fit_scorer.run(profile, jd)
+            self.logger.info("Fit score %.2f (%s)", fit.score, fit.reason)
+            if enforce and not self.fit_scorer.passes(fit):
+                deferred = self.fit_scorer.config.action == "defer"
+                self.logger.info("%s low-fit posting: %s", "Deferring" if deferred else "Rejecting", fit.reason)
+                raise LowFitPosting(fit, deferred=deferred)
+            return fit
+
+    def _strategy(self, profile, jd, deadline: float | None, keys: dict, run_id: str) -> StrategyPlan:
+        strategy = self._stage(
+            "strategy",
+            StrategyPlan,
+            lambda: self.matcher.run(profile, jd, deadline=deadline),
+            lambda: (profile, jd, self._fingerprint(self.matcher)),
+            keys,
+            run_id,
+        )
+        self.logger.info("Strategy gaps: %s", ", ".join(strategy.gaps) if strategy.gaps else "none")
+        return strategy
+
+    def _draft(self, profile, jd, strategy, deadline: float | None, keys: dict, run_id: str) -> DraftContent:
+        draft = self._stage(
+            "draft",
+            DraftContent,
+            lambda: self.writer.run(profile, jd, strategy, deadline=deadline),
+            lambda: (profile, jd, strategy, self._fingerprint(self.writer)),
+            keys,
+            run_id,
+        )
+        self.logger.info("Writer produced draft")
         return draft
+
+    def _revision(self, previous: DraftContent, profile, jd, strategy, changes: list[str], deadline, keys, run_id):
+        draft = self._stage(
+            "draft",
+            DraftContent,
+            lambda: self.writer.revise(previous, profile, jd, strategy, changes, deadline=deadline),
+            lambda: (previous, profile, jd, strategy, self._fingerprint(self.writer)),
+            keys,
+            run_id,
+        )
+        self.logger.info("Writer revised draft for %s change(s)", len(changes))
+        return draft
+
+    def _record(self, run_id: str, keys: dict, jd: JobRequirements, validation, started: float) -> None:
+        if self.store is None:
+            return
+        self.store.record_run(
+            run_id,
+            resume_hash=keys["profile"],
+            jd_hash=keys["jd"],
+            title=jd.title,
+            company=jd.company,
+            passes=validation.passes if validation else None,
+            duration=time.monotonic() - started,
+        )
+
+    def run(self, resume_path: str, jd_text: str) -> DraftContent:
+        return self.run_state(resume_path, jd_text).final
+
+    def parse_profile(self, resume_path: str) -> CandidateProfile:
+        """Parse a resume once so it can be reused across many postings (see run_state)."""
+        return self._profile(resume_path, {}, uuid.uuid4().hex)
+
+    def run_state(
+        self,
+        resume_path: str | None,
+        jd_text: str,
+        profile: CandidateProfile | None = None,
+        enforce_fit: bool = True,
+        jd: JobRequirements | None = None,
+    ) -> RunState:
+        """
+        Full pipeline run that also returns every intermediate artifact (see rerun).
+        Pass an already parsed `profile` to skip resume parsing, e.g. when tailoring in bulk,
+        and/or the `jd` previously analyzed from the same `jd_text` to skip JD analysis.
+        Raises LowFitPosting when the posting scores below FitConfig.min_score, unless
+        `enforce_fit` is False (e.g. when tailoring previously deferred postings).
+        """
+        run_id = uuid.uuid4().hex
+        with log_context(run_id=run_id):
+            self.logger.info("Start orchestration")
+            started = time.monotonic()
+            deadline = self._deadline()
+            keys: dict[str, str] = {}
+            stages_run = ["fit", "strategy", "draft", "final"]
+
+            if profile is None:
+                profile = self._profile(resume_path, keys, run_id)
+                stages_run.insert(0, "profile")
+            elif self.store is not None:
+                keys["profile"] = input_hash("profile", profile)
+            if jd is None:
+                jd = self._requirements(jd_text, deadline, keys, run_id)
+                stages_run.insert(stages_run.index("fit"), "jd")
+            elif self.store is not None:
+                keys["jd"] = input_hash("jd", jd_text, self._fingerprint(self.jd_analyzer))
+            fit = self._fit(profile, jd, enforce_fit)
+            strategy = self._strategy(profile, jd, deadline, keys, run_id)
+            draft = self._draft(profile, jd, strategy, deadline, keys, run_id)
+            final, validation = self._final(draft, jd.must_haves, deadline, run_id)
+            self._record(run_id, keys, jd, validation, started)
+            return RunState(
+                jd_text=jd_text,
+                profile=profile,
+                jd=jd,
+                strategy=strategy,
+                draft=draft,
+                final=final,
+                validation=validation,
+                fit=fit,
+                stages_run=stages_run,
+            )
+
+    def rerun(self, resume_path: str, jd_text: str, previous: RunState) -> RunState:
+        """
+        Diff-aware re-run after the resume or posting was edited.
+        Compares the new profile/requirements with the previous run field by field and item by
+        item. Changed identity fields (name, contact, title, company, location) and items that
+        were only reworded are patched into the previous drafts as whole words. Added or removed
+        items re-run the matcher if they affect it, then the writer revises the previous draft
+        for just those changes instead of writing a new one.
+        """
+        run_id = uuid.uuid4().hex
+        with log_context(run_id=run_id):
+            self.logger.info("Start incremental orchestration")
+            started = time.monotonic()
+            deadline = self._deadline()
+            keys: dict[str, str] = {}
+            stages_run = ["profile"]
+
+            profile = self._profile(resume_path, keys, run_id)
+            if jd_text == previous.jd_text:
+                jd = previous.jd
+                if self.store is not None:
+                    keys["jd"] = input_hash("jd", jd_text, self._fingerprint(self.jd_analyzer))
+            else:
+                jd = self._requirements(jd_text, deadline, keys, run_id)
+                stages_run.append("jd")
+
+            fit = self._fit(profile, jd, enforce=False)
+            profile_changes = changed_fields(previous.profile, profile)
+            jd_changes = changed_fields(previous.jd, jd)
+            self.logger.info(
+                "Changed fields: profile=%s jd=%s",
+                ", ".join(sorted(profile_changes)) or "none",
+                ", ".join(sorted(jd_changes)) or "none",
+            )
+
+            patches = _identity_patches(previous.profile, profile, PATCHABLE_PROFILE_FIELDS)
+            patches += _identity_patches(previous.jd, jd, PATCHABLE_JD_FIELDS)
+            edits, other = _item_changes(previous.profile, profile, profile_changes - PATCHABLE_PROFILE_FIELDS)
+            jd_edits, jd_other = _item_changes(previous.jd, jd, jd_changes - PATCHABLE_JD_FIELDS)
+            edits, other = edits + jd_edits, other + jd_other
+            reworded = [(before, after) for _, before, after in edits]
+            if not other and all(before and after and _occurs(previous.draft, before) for _, before, after in edits):
+                # Only reworded items the draft quotes verbatim: patch them in, no matcher or writer call.
+                patches += reworded
+                strategy = _patch_strategy(previous.strategy, patches)
+                draft = _patch_draft(previous.draft, patches)
+            else:
+                strategy = previous.strategy
+                if profile_changes & MATCHER_PROFILE_FIELDS or jd_changes & MATCHER_JD_FIELDS:
+                    strategy = self._strategy(profile, jd, deadline, keys, run_id)
+                    stages_run.append("strategy")
+                changes = [f"{name}: {before!r} -> {after!r}" for name, before, after in edits] + other
+                changes += [f"{before!r} -> {after!r}" for before, after in patches]
+                draft = self._revision(previous.draft, profile, jd, strategy, changes, deadline, keys, run_id)
+                stages_run.append("draft")
+
+            # The editor may have reworded an item the draft quoted; then the final needs a fresh pass.
+            stale_final = any(not _occurs(previous.final, before) for before, _ in reworded)
+            if "draft" in stages_run or jd_changes & EDITOR_JD_FIELDS or stale_final:
+                final, validation = self._final(draft, jd.must_haves, deadline, run_id)
+                stages_run.append("final")
+            else:
+                final, validation = _patch_draft(previous.final, patches), previous.validation
+
+            self.logger.info("Incremental run re-ran: %s", ", ".join(stages_run))
+            self._record(run_id, keys, jd, validation, started)
+            return RunState(
+                jd_text=jd_text,
+                profile=profile,
+                jd=jd,
+                strategy=strategy,
+                draft=draft,
+                final=final,
+                validation=validation,
+                fit=fit,
+                stages_run=stages_run,
+            )
+
+    def shorten(self, previous: RunState, ratio: float = 0.75, max_words: int | None = None) -> RunState:
+        """
+        Follow-up edit of a finished run: tighten its final draft to `max_words` (default
+        `ratio` of its current length) with an editor pass only; earlier stages are reused.
+        """
+        run_id = uuid.uuid4().hex
+        with log_context(run_id=run_id, stage="final"), timed("final"):
+            current = len(previous.final.tailored_resume.split()) + len((previous.final.tailored_cover or "").split())
+            max_words = max_words or max(1, int(current * ratio))
+            self.logger.info("Shortening draft from %s to %s words", current, max_words)
+            final, validation = self.editor.shorten(
+                previous.final, max_words, required_keywords=previous.jd.must_haves, deadline=self._deadline()
+            )
+        return replace(previous, final=final, validation=validation, stages_run=["final"])
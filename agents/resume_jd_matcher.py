@@ -1,56 +1,76 @@
-try:
-    from google import genai
-except Exception:  # pragma: no cover - optional dependency for offline tests
-    genai = None
-
 from agents.common import extract_json_block
-from agents.llm_utils import LLMClientWrapper
+from agents.llm_utils import LazyLLMMixin, LLMClientWrapper, mark_fallback, run_cascade
 from config import ModelConfig
 from schemas import CandidateProfile, JobRequirements, StrategyPlan
 
 
-class ResumeJDMatcherAgent:
-    def __init__(self, config: ModelConfig | None = None, llm_client=None, use_llm: bool = True):
+class ResumeJDMatcherAgent(LazyLLMMixin):
+    llm_stage = "matcher"
+    llm_model_attr = "matcher_model"
+
+    def __init__(
+        self,
+        config: ModelConfig | None = None,
+        llm_client=None,
+        use_llm: bool = True,
+        fast_llm_client=None,
+    ):
         config = config or ModelConfig()
         self.use_llm = use_llm
-        self.llm = None
-        if llm_client is not None:
-            self.llm = LLMClientWrapper(llm_client, max_retries=config.max_retries)
-        elif self.use_llm and genai is not None and hasattr(genai, "GenerativeModel"):
-            self.llm = LLMClientWrapper(genai.GenerativeModel(config.matcher_model), max_retries=config.max_retries)
-
-    def run(self, profile: CandidateProfile, jd: JobRequirements) -> StrategyPlan:
-        if self.llm is None or not self.use_llm:
-            gaps = [req for req in jd.must_haves if req not in profile.skills]
-            positioning = [f"Highlight {skill}" for skill in profile.skills[:3]]
-            focus = gaps[:3] if gaps else jd.responsibilities[:3]
-            return StrategyPlan(gaps=gaps, positioning=positioning, rewriting_focus=focus)
+        self._setup_llms(config, llm_client=llm_client, fast_llm_client=fast_llm_client)
 
-        prompt = (
-            "Given candidate profile (JSON) and job requirements (JSON), identify gaps, "
-            "craft positioning, and list rewriting focus points. Respond ONLY with JSON in a code fence. Schema:\n"
-            "{\"gaps\": [str], \"positioning\": [str], \"rewriting_focus\": [str]}\n\n"
-            f"Profile: {profile.model_dump_json()}\nJD: {jd.model_dump_json()}"
-        )
+    @staticmethod
+    def _fallback(profile: CandidateProfile, jd: JobRequirements) -> StrategyPlan:
+        gaps = [req for req in jd.must_haves if req not in profile.skills]
+        positioning = [f"Highlight {skill}" for skill in profile.skills[:3]]
+        focus = gaps[:3] if gaps else jd.responsibilities[:3]
+        return StrategyPlan(gaps=gaps, positioning=positioning, rewriting_focus=focus)
+
+    @staticmethod
+    def _acceptable(strategy: StrategyPlan | None) -> bool:
+        return strategy is not None and bool(strategy.positioning) and bool(strategy.rewriting_focus)
+
+    def _match(self, llm: LLMClientWrapper, prompt: str, deadline: float | None) -> StrategyPlan | None:
         try:
-            text = self.llm.generate_text(prompt)
+            text = llm.generate_text(prompt, deadline=deadline)
         except Exception:
             text = ""
 
         payload = extract_json_block(text)
+        if not payload:
+            return None
 
         def _list(key: str):
             value = payload.get(key, [])
             return value if isinstance(value, list) else [str(value)]
 
-        if not payload:
-            gaps = [req for req in jd.must_haves if req not in profile.skills]
-            positioning = [f"Highlight {skill}" for skill in profile.skills[:3]]
-            focus = gaps[:3] if gaps else jd.responsibilities[:3]
-            return StrategyPlan(gaps=gaps, positioning=positioning, rewriting_focus=focus)
-
-        return StrategyPlan(
-            gaps=_list("gaps"),
-            positioning=_list("positioning"),
-            rewriting_focus=_list("rewriting_focus"),
+        try:
+            return StrategyPlan(
+                gaps=_list("gaps"),
+                positioning=_list("positioning"),
+                rewriting_focus=_list("rewriting_focus"),
+            )
+        except ValueError:
+            return None
+
+    def run(self, profile: CandidateProfile, jd: JobRequirements, deadline: float | None = None) -> StrategyPlan:
+        if not self.use_llm or self.llm is None:
+            return self._fallback(profile, jd)
+
+        prompt = (
+            "Given candidate profile (JSON) and job requirements (JSON), identify gaps, "
+            "craft positioning, and list rewriting focus points. Respond ONLY with JSON in a code fence. Schema:\n"
+            "{\"gaps\": [str], \"positioning\": [str], \"rewriting_focus\": [str]}\n\n"
+            f"Profile: {profile.model_dump_json()}\nJD: {jd.model_dump_json()}"
+        )
+        strategy = run_cascade(
+            lambda llm: self._match(llm, prompt, deadline),
+            self._acceptable,
+            self.fast_llm,
+            self.llm,
+            self.cascade_stats,
         )
+        if strategy is None:
+            mark_fallback(self.llm_stage)
+            return self._fallback(profile, jd)
+        return strategy
@@ -1,10 +1,4 @@
-from typing import Optional
-
-try:
-    from google import genai
-except Exception:  # pragma: no cover - optional dependency for offline tests
-    genai = None
-
+from agents.llm_utils import create_model
 from schemas import CandidateProfile
 from tools.resume_parsing_util import parse_resume
 
@@ -12,9 +6,15 @@ from tools.resume_parsing_util import parse_resume
 class ResumeParserAgent:
     def __init__(self, model: str = "gemini-1.5-pro", llm_client=None, use_llm: bool = True):
         self.use_llm = use_llm
-        self.llm = llm_client if llm_client is not None else None
-        if self.llm is None and self.use_llm and genai is not None and hasattr(genai, "GenerativeModel"):
-            self.llm = genai.GenerativeModel(model)
+        self.model = model
+        self._llm = llm_client
+
+    @property
+    def llm(self):
+        # Built on first access so parsing never imports the Gemini SDK unless it is used.
+        if self._llm is None and self.use_llm:
+            self._llm = create_model(self.model)
+        return self._llm
 
     def run(self, resume_path: str) -> CandidateProfile:
         parsed = parse_resume(resume_path)
@@ -0,0 +1,119 @@
+"""
+Local retrieval of the profile bullets most relevant to a posting.
+
+Each experience/skill bullet is embedded as a hashed-feature vector (word unigrams plus
+character trigrams, signed feature hashing, L2-normalized) — CPU-only, no model download.
+Vectors live in an in-memory index built once per distinct profile; NumPy is used for the
+matrix math when installed, with a pure-Python fallback that returns the same ranking.
+"""
+import math
+import re
+import zlib
+from functools import lru_cache
+
+from schemas import CandidateProfile, JobRequirements
+
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+_SPLIT_RE = re.compile(r"\n|;\s")
+_STOPWORDS = frozenset("a an and at for in of on or the to with by as is are be we you our".split())
+DEFAULT_DIM = 512
+
+
+@lru_cache(maxsize=1)
+def _load_numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _features(text: str) -> list[str]:
+    words = [w for w in _WORD_RE.findall(text.lower()) if w not in _STOPWORDS]
+    grams = [f"#{w[i : i + 3]}" for w in words if len(w) > 3 for i in range(len(w) - 2)]
+    return [f"w:{w}" for w in words] + grams
+
+
+@lru_cache(maxsize=8192)
+def hashed_vector(text: str, dim: int = DEFAULT_DIM) -> tuple[tuple[int, float], ...]:
+    """Sparse (index, weight) pairs of the normalized hashed-feature embedding of `text`."""
+    vector: dict[int, float] = {}
+    for feature in _features(text):
+        h = zlib.crc32(feature.encode("utf-8"))
+        index = h % dim
+        # Whole words weigh more than the character trigrams that back off on spelling variants.
+        weight = 1.0 if feature.startswith("w:") else 0.5
+        vector[index] = vector.get(index, 0.0) + (weight if (h >> 16) & 1 else -weight)
+    norm = math.sqrt(sum(v * v for v in vector.values()))
+    if not norm:
+        return ()
+    return tuple(sorted((i, v / norm) for i, v in vector.items() if v))
+
+
+def profile_bullets(profile: CandidateProfile) -> list[str]:
+    """Experience entries split into individual bullets, followed by skills and extras."""
+    bullets: list[str] = []
+    for entry in [*profile.experience, *profile.skills, *(profile.extras or [])]:
+        for part in _SPLIT_RE.split(entry):
+            part = part.strip(" -*•\t")
+            if part and part not in bullets:
+                bullets.append(part)
+    return bullets
+
+
+class BulletIndex:
+    """Cosine-similarity index over a fixed list of bullets."""
+
+    def __init__(self, bullets: list[str], dim: int = DEFAULT_DIM):
+        self.bullets = bullets
+        self.dim = dim
+        self._sparse = [dict(hashed_vector(b, dim)) for b in bullets]
+        np = _load_numpy()
+        self._matrix = None
+        if np is not None and bullets:
+            self._matrix = np.zeros((len(bullets), dim), dtype=np.float32)
+            for row, vector in enumerate(self._sparse):
+                for index, weight in vector.items():
+                    self._matrix[row, index] = weight
+
+    def __len__(self) -> int:
+        return len(self.bullets)
+
+    def scores(self, query: str) -> list[float]:
+        vector = hashed_vector(query, self.dim)
+        if not vector or not self.bullets:
+            return [0.0] * len(self.bullets)
+        if self._matrix is not None:
+            np = _load_numpy()
+            indices = [i for i, _ in vector]
+            weights = np.array([w for _, w in vector], dtype=self._matrix.dtype)
+            return (self._matrix[:, indices] @ weights).tolist()
+        return [sum(w * row.get(i, 0.0) for i, w in vector) for row in self._sparse]
+
+    def search(self, query: str, k: int = 3, min_score: float = 0.05) -> list[tuple[str, float]]:
+        """Top-k bullets for `query`, best first, ignoring those below `min_score`."""
+        ranked = sorted(enumerate(self.scores(query)), key=lambda item: (-item[1], item[0]))
+        return [(self.bullets[i], score) for i, score in ranked[:k] if score >= min_score]
+
+
+@lru_cache(maxsize=128)
+def _index_for(profile_json: str, dim: int) -> BulletIndex:
+    return BulletIndex(profile_bullets(CandidateProfile.model_validate_json(profile_json)), dim)
+
+
+def index_for_profile(profile: CandidateProfile, dim: int = DEFAULT_DIM) -> BulletIndex:
+    """Bullet index for a profile, built once per distinct profile content."""
+    return _index_for(profile.model_dump_json(), dim)
+
+
+def relevant_bullets(profile: CandidateProfile, jd: JobRequirements, k: int = 3) -> list[str]:
+    """
+    Union of the top-k bullets for every must-have and responsibility, in the order the
+    profile lists them. Returns every bullet when the posting has no requirements to query.
+    """
+    index = index_for_profile(profile)
+    queries = [q for q in [*jd.must_haves, *jd.responsibilities] if q.strip()]
+    if not queries:
+        return list(index.bullets)
+    chosen = {bullet for query in queries for bullet, _ in index.search(query, k)}
+    return [bullet for bullet in index.bullets if bullet in chosen]
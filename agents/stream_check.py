@@ -0,0 +1,98 @@
+"""
+Incremental checks on a streamed writer reply.
+
+DraftStreamCheck is fed chunks as they arrive and reports the first reason the draft can
+no longer pass (too long, broken [RESUME]/[COVER] structure, a table), so the writer can
+cancel the generation and re-prompt instead of paying for the full reply. The same check,
+fed a whole reply at once, validates unstreamed replies and the parts of the parallel writer.
+"""
+import re
+
+_MARKER_RE = re.compile(r"\[/?(?:resume|cover)\]", re.IGNORECASE)
+_TABLE_ROW_RE = re.compile(r"^\s*\|.*\|\s*$")
+_TABLE_RULE_RE = re.compile(r"^\s*\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)+\|?\s*$")
+
+DRAFT_PARTS = ("resume", "cover")
+_PART_NAMES = {"resume": "resume", "cover": "cover letter"}
+
+# Corrective instruction added to the re-prompt for each abort reason (see guidance()).
+GUIDANCE = {
+    "too_long": "Your previous draft ran past {max_words} words. Keep {sections} under {max_words} words.",
+    "missing_marker": "Your previous reply did not start with the {opening} marker. Begin with {opening} and follow the marker format exactly.",
+    "bad_structure": "Your previous reply broke the marker structure. Output {layout}.",
+    "table": "Your previous draft used a table. Do not use tables; use short bullet points.",
+}
+
+
+def guidance(reason: str, max_words: int, parts: tuple[str, ...] = DRAFT_PARTS) -> str:
+    """GUIDANCE[reason] worded for a reply made of `parts`."""
+    names = [_PART_NAMES[part] for part in parts]
+    return GUIDANCE[reason].format(
+        max_words=max_words,
+        sections=f"{' and '.join(names)} together" if len(names) > 1 else f"the {names[0]}",
+        opening=f"[{parts[0].upper()}]",
+        layout=" followed by ".join(f"[{part.upper()}]...[/{part.upper()}]" for part in parts)
+        + (", each exactly once" if len(parts) > 1 else " exactly once"),
+    )
+
+
+class DraftStreamCheck:
+    """
+    Tracks a streamed [RESUME]...[/RESUME][COVER]...[/COVER] reply, or a reply holding only
+    some of those `parts` (e.g. the cover letter of the parallel writer). `feed` returns an
+    abort reason (a GUIDANCE key) as soon as the draft cannot pass, otherwise None.
+    """
+
+    # Characters of content allowed before a missing opening marker counts as a failure.
+    marker_grace = 200
+
+    def __init__(self, max_words: int, parts: tuple[str, ...] = DRAFT_PARTS):
+        self.max_words = max_words
+        self.parts = parts
+        # The closing marker of the last part may be left off.
+        self._expected = [marker for part in parts for marker in (f"[{part}]", f"[/{part}]")]
+        self.text = ""
+        self.words = 0
+        self.reason: str | None = None
+        self._scanned = 0  # offset up to which words, markers and lines have been checked
+        self._markers: list[str] = []
+
+    def feed(self, chunk: str) -> str | None:
+        self.text += chunk
+        if self.reason is not None:
+            return self.reason
+        # Only inspect up to the last line break: trailing words and markers may still be partial.
+        end = self.text.rfind("\n") + 1
+        if end > self._scanned:
+            self._scan(self.text[self._scanned : end])
+            self._scanned = end
+        if self.reason is None and not self._markers and len(self.text.strip()) > self.marker_grace:
+            if self._expected[0] not in self.text.lower():
+                self.reason = "missing_marker"
+        return self.reason
+
+    def finish(self) -> str | None:
+        """Check the unterminated tail and the final structure once the stream ends."""
+        if self.reason is None and self._scanned < len(self.text):
+            self._scan(self.text[self._scanned :])
+            self._scanned = len(self.text)
+        required = self._expected[:-1]
+        if self.reason is None and self._markers[: len(required)] != required:
+            self.reason = "missing_marker" if not self._markers else "bad_structure"
+        return self.reason
+
+    def _scan(self, block: str) -> None:
+        for line in block.splitlines():
+            markers = [m.lower() for m in _MARKER_RE.findall(line)]
+            for marker in markers:
+                self._markers.append(marker)
+                if self._markers != self._expected[: len(self._markers)]:
+                    self.reason = "bad_structure"
+                    return
+            if _TABLE_RULE_RE.match(line) or (_TABLE_ROW_RE.match(line) and line.count("|") >= 3):
+                self.reason = "table"
+                return
+            self.words += len(_MARKER_RE.sub(" ", line).split())
+            if self.words > self.max_words:
+                self.reason = "too_long"
+                return
@@ -1,24 +1,75 @@
 import json
 
-try:
-    from google import genai
-except Exception:  # pragma: no cover - optional dependency for offline tests
-    genai = None
-
-from agents.llm_utils import LLMClientWrapper
+from agents.llm_utils import LazyLLMMixin, LLMClientWrapper, mark_fallback, run_cascade
 from config import ModelConfig, ValidationConfig
 from schemas import DraftContent, ValidationResult
 
 
-class SwiftEditorAgent:
-    def __init__(self, config: ModelConfig | None = None, llm_client=None, use_llm: bool = True):
+def _is_heading(line: str) -> bool:
+    stripped = line.strip()
+    return stripped.startswith("#") or (stripped.endswith(":") and len(stripped.split()) <= 4)
+
+
+def _trim_lines(text: str, budget: int, keywords: list[str] | None = None, closing: int = 0) -> str:
+    """
+    Drop whole lines, least important first, until `text` fits in `budget` words.
+
+    The first line (name or salutation) and the last `closing` lines (a letter's sign-off),
+    headings and lines naming one of `keywords` go last; among equals, later lines go first.
+    Headings left with no lines under them are dropped as well.
+    """
+    lines = text.splitlines()
+    sizes = [len(line.split()) for line in lines]
+    total = sum(sizes)
+    if total <= budget:
+        return text
+    wanted = [k.lower() for k in keywords or []]
+
+    def importance(i: int) -> tuple[int, int]:
+        line = lines[i]
+        score = 4 if i == 0 or i >= len(lines) - closing else 0
+        if _is_heading(line):
+            score += 2
+        if any(k in line.lower() for k in wanted):
+            score += 3
+        return score, -i
+
+    dropped = set()
+    for i in sorted(range(len(lines)), key=importance):
+        if total <= budget:
+            break
+        if sizes[i]:
+            dropped.add(i)
+            total -= sizes[i]
+    kept = [line for i, line in enumerate(lines) if i not in dropped]
+    # A heading followed by another heading (or nothing) lost its section.
+    content = [i for i, line in enumerate(kept) if line.strip()]
+    orphans = {
+        i for n, i in enumerate(content)
+        if _is_heading(kept[i]) and (n + 1 == len(content) or _is_heading(kept[content[n + 1]]))
+    }
+    out: list[str] = []
+    for i, line in enumerate(kept):
+        if i in orphans or (not line.strip() and (not out or not out[-1].strip())):
+            continue
+        out.append(line)
+    return "\n".join(out).strip()
+
+
+class SwiftEditorAgent(LazyLLMMixin):
+    llm_stage = "editor"
+    llm_model_attr = "editor_model"
+
+    def __init__(
+        self,
+        config: ModelConfig | None = None,
+        llm_client=None,
+        use_llm: bool = True,
+        fast_llm_client=None,
+    ):
         config = config or ModelConfig()
         self.use_llm = use_llm
-        self.llm = None
-        if llm_client is not None:
-            self.llm = LLMClientWrapper(llm_client, max_retries=config.max_retries)
-        elif self.use_llm and genai is not None and hasattr(genai, "GenerativeModel"):
-            self.llm = LLMClientWrapper(genai.GenerativeModel(config.editor_model), max_retries=config.max_retries)
+        self._setup_llms(config, llm_client=llm_client, fast_llm_client=fast_llm_client)
         self.validation_config = ValidationConfig()
 
     def _validate(self, draft: DraftContent, required_keywords: list[str] | None = None, max_words: int | None = None) -> ValidationResult:
@@ -53,8 +104,9 @@ class SwiftEditorAgent:
         draft: DraftContent,
         required_keywords: list[str] | None = None,
         max_words: int | None = None,
+        deadline: float | None = None,
     ) -> tuple[DraftContent, ValidationResult]:
-        if self.llm is None or not self.use_llm:
+        if not self.use_llm or self.llm is None:
             return draft, self._validate(draft, required_keywords, max_words)
 
         max_words = max_words or self.validation_config.max_words
@@ -73,10 +125,36 @@ Respond with two fenced blocks:
 {{"passes": bool, "reasons": [str], "suggestions": [str]}}
 ```
 """
+
+        def _accept(result: tuple[DraftContent, ValidationResult | None] | None) -> bool:
+            if result is None or result[1] is None:
+                return False
+            return self._validate(result[0], required_keywords, max_words).passes
+
+        result = run_cascade(
+            lambda llm: self._edit(llm, prompt, draft, deadline),
+            _accept,
+            self.fast_llm,
+            self.llm,
+            self.cascade_stats,
+        )
+        if result is None:
+            mark_fallback(self.llm_stage)
+            return draft, self._validate(draft, required_keywords, max_words)
+        revised, validation = result
+        return revised, validation or self._validate(revised, required_keywords, max_words)
+
+    def _edit(
+        self,
+        llm: LLMClientWrapper,
+        prompt: str,
+        draft: DraftContent,
+        deadline: float | None,
+    ) -> tuple[DraftContent, ValidationResult | None] | None:
         try:
-            text = self.llm.generate_text(prompt)
+            text = llm.generate_text(prompt, deadline=deadline)
         except Exception:
-            return draft, self._validate(draft, required_keywords, max_words)
+            return None
 
         resume_block_start = text.lower().find("```resume")
         if resume_block_start != -1:
@@ -97,6 +175,32 @@ Respond with two fenced blocks:
                     validation = ValidationResult(**payload)
                 except Exception:
                     validation = None
-
-        validation = validation or self._validate(draft, required_keywords, max_words)
         return draft, validation
+
+    def shorten(
+        self,
+        draft: DraftContent,
+        max_words: int,
+        required_keywords: list[str] | None = None,
+        deadline: float | None = None,
+    ) -> tuple[DraftContent, ValidationResult]:
+        """
+        Tighten a draft to `max_words`: an edit pass under that limit when the LLM is available,
+        then a line-level trim of whatever is still over (least important lines first), split
+        between resume and cover letter in proportion to their length.
+        """
+        revised, validation = self.run(draft, required_keywords, max_words=max_words, deadline=deadline)
+        resume_words = len(revised.tailored_resume.split())
+        cover_words = len((revised.tailored_cover or "").split())
+        if resume_words + cover_words <= max_words:
+            return revised, validation
+        resume_budget = max_words * resume_words // (resume_words + cover_words)
+        trimmed = DraftContent(
+            tailored_resume=_trim_lines(revised.tailored_resume, resume_budget, required_keywords),
+            tailored_cover=(
+                _trim_lines(revised.tailored_cover, max_words - resume_budget, required_keywords, closing=2)
+                if revised.tailored_cover
+                else None
+            ),
+        )
+        return trimmed, self._validate(trimmed, required_keywords, max_words)
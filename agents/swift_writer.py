@@ -1,22 +1,97 @@
-try:
-    from google import genai
-except Exception:  # pragma: no cover - optional dependency for offline tests
-    genai = None
+import contextvars
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 
-from agents.llm_utils import LLMClientWrapper
-from config import ModelConfig
+from agents.llm_utils import LazyLLMMixin, mark_fallback
+from agents.retrieval import relevant_bullets
+from agents.stream_check import DRAFT_PARTS, DraftStreamCheck, guidance
+from config import ModelConfig, ValidationConfig
 from schemas import CandidateProfile, JobRequirements, StrategyPlan, DraftContent
 
+_PARTS_EXECUTOR: ThreadPoolExecutor | None = None
+_PARTS_LOCK = threading.Lock()
 
-class SwiftWriterAgent:
-    def __init__(self, config: ModelConfig | None = None, llm_client=None, use_llm: bool = True):
+_STYLE = """- Keep to bullet-friendly formatting (no tables), short sentences, quantified impact where possible.
+- Include keywords from the job where relevant."""
+_PART_TASKS = {
+    "resume": "Write only the tailored resume in markdown (under {max_words} words).",
+    "cover": "Write only the tailored cover letter in markdown (under {max_words} words).",
+}
+# Share of the draft's word budget each part gets in parallel mode (300 of the default 1500 for the cover).
+_PART_SHARE = {"resume": 0.8, "cover": 0.2}
+
+
+def _parts_executor() -> ThreadPoolExecutor:
+    """Pool for the concurrent resume/cover calls of the parallel writer mode."""
+    global _PARTS_EXECUTOR
+    with _PARTS_LOCK:
+        if _PARTS_EXECUTOR is None:
+            _PARTS_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="swift-writer")
+        return _PARTS_EXECUTOR
+
+
+def _extract_part(text: str, part: str) -> str | None:
+    """Text inside [PART]...[/PART] (the closing marker may be missing); None without the markers."""
+    lower = text.lower()
+    start = lower.find(f"[{part}]")
+    if start == -1:
+        return None
+    start += len(part) + 2
+    end = lower.find(f"[/{part}]", start)
+    return text[start : end if end != -1 else len(text)].strip() or None
+
+
+class _StreamCut(Exception):
+    """A streamed reply broke off after part of it had arrived."""
+
+
+def _parse_draft(text: str) -> DraftContent | None:
+    """Resume and cover letter from a [RESUME]/[COVER] reply; None when the markers are missing."""
+    lower = text.lower()
+    resume_start = lower.find("[resume]")
+    resume_end = lower.find("[/resume]")
+    cover_start = lower.find("[cover]")
+    cover_end = lower.find("[/cover]")
+    if resume_start == -1 or resume_end == -1 or cover_start == -1:
+        return None
+    resume_text = text[resume_start + len("[resume]") : resume_end].strip()
+    cover_text = None
+    if cover_end != -1:
+        cover_text = text[cover_start + len("[cover]") : cover_end].strip()
+    return DraftContent(tailored_resume=resume_text, tailored_cover=cover_text or None)
+
+
+class SwiftWriterAgent(LazyLLMMixin):
+    llm_stage = "writer"
+    llm_model_attr = "writer_model"
+    prompt_version = 2
+    # Extra attempts for a resume or cover part that failed its check in parallel mode.
+    part_retries = 1
+    # Corrective re-prompts after a streamed draft fails its incremental checks.
+    stream_retries = 1
+
+    def __init__(
+        self,
+        config: ModelConfig | None = None,
+        llm_client=None,
+        use_llm: bool = True,
+        parallel: bool | None = None,
+    ):
         config = config or ModelConfig()
         self.use_llm = use_llm
-        self.llm = None
-        if llm_client is not None:
-            self.llm = LLMClientWrapper(llm_client, max_retries=config.max_retries)
-        elif self.use_llm and genai is not None and hasattr(genai, "GenerativeModel"):
-            self.llm = LLMClientWrapper(genai.GenerativeModel(config.writer_model), max_retries=config.max_retries)
+        self.retrieval_top_k = config.retrieval_top_k
+        self.parallel = config.parallel_writer if parallel is None else parallel
+        self.stream_validation = config.stream_validation
+        self._setup_llms(config, llm_client=llm_client, cascade=False)
+        self.validation_config = ValidationConfig()
+
+    @property
+    def mode(self) -> str:
+        """Generation mode, part of the orchestrator's stored-result fingerprint."""
+        return "parallel" if self.parallel else "single"
 
     def _fallback_generate(self, profile: CandidateProfile, jd: JobRequirements, strategy: StrategyPlan) -> DraftContent:
         resume_lines = [
@@ -41,14 +116,156 @@ class SwiftWriterAgent:
             tailored_cover="\n".join(cover_lines),
         )
 
-    def run(self, profile: CandidateProfile, jd: JobRequirements, strategy: StrategyPlan) -> DraftContent:
-        if self.llm is None or not self.use_llm:
+    def _candidate_context(self, profile: CandidateProfile, jd: JobRequirements) -> str:
+        """Profile JSON for the prompt, narrowed to the bullets retrieved for this posting."""
+        if self.retrieval_top_k is None:
+            return profile.model_dump_json()
+        relevant = relevant_bullets(profile, jd, k=self.retrieval_top_k)
+        skills = set(profile.skills)
+        context = {
+            "name": profile.name,
+            "contact": profile.contact,
+            "summary": profile.summary,
+            "skills": [b for b in relevant if b in skills],
+            "relevant_experience": [b for b in relevant if b not in skills],
+            "education": profile.education,
+        }
+        return json.dumps(context, ensure_ascii=False, separators=(",", ":"))
+
+    def _context(self, profile: CandidateProfile, jd: JobRequirements, strategy: StrategyPlan) -> str:
+        return f"""Context:
+Candidate: {self._candidate_context(profile, jd)}
+Job: {jd.model_dump_json()}
+Strategy: {strategy.model_dump_json()}
+"""
+
+    def _generate_part(self, part: str, context: str, deadline: float | None) -> str | None:
+        """
+        One section on its own call, checked like a full draft against its share of the word
+        budget and retried alone, with guidance, when the reply fails. None once retries run out.
+        """
+        max_words = int(self.validation_config.max_words * _PART_SHARE[part])
+        prompt = f"""You are a resume+cover specialist. Write concise, ATS-friendly output.
+Instructions:
+- {_PART_TASKS[part].format(max_words=max_words)}
+{_STYLE}
+- Wrap the output in [{part.upper()}] and [/{part.upper()}] markers.
+
+{context}"""
+        parts = (part,)
+        attempt_prompt = prompt
+        for _ in range(1 + self.part_retries):
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            try:
+                text, reason = self._checked_reply(attempt_prompt, deadline, max_words, parts)
+            except Exception:
+                continue
+            if reason is not None:
+                attempt_prompt = f"{prompt}\nCorrection: {guidance(reason, max_words, parts)}\n"
+                continue
+            section = _extract_part(text, part)
+            if section:
+                return section
+        return None
+
+    def _checked_reply(
+        self, prompt: str, deadline: float | None, max_words: int, parts: tuple[str, ...]
+    ) -> tuple[str, str | None]:
+        """
+        A reply and the first check it failed (None if it passed). With stream validation the
+        reply is streamed and cut short at the failure; otherwise the whole reply is checked.
+        """
+        if self.stream_validation:
+            try:
+                return self._stream_attempt(prompt, deadline, abort=True, max_words=max_words, parts=parts)
+            except _StreamCut:
+                pass
+        check = DraftStreamCheck(max_words, parts)
+        check.feed(self.llm.generate_text(prompt, deadline=deadline))
+        return check.text, check.finish()
+
+    def _run_parallel(
+        self,
+        profile: CandidateProfile,
+        jd: JobRequirements,
+        strategy: StrategyPlan,
+        deadline: float | None,
+    ) -> DraftContent:
+        context = self._context(profile, jd, strategy)
+        pool = _parts_executor()
+        # Each call keeps the caller's context (e.g. the scheduler tenant).
+        futures = {
+            part: pool.submit(contextvars.copy_context().run, self._generate_part, part, context, deadline)
+            for part in ("resume", "cover")
+        }
+        resume, cover = futures["resume"].result(), futures["cover"].result()
+        if resume is None or cover is None:
+            # Both parts come from the same source: no template cover next to an LLM resume.
+            mark_fallback(self.llm_stage)
             return self._fallback_generate(profile, jd, strategy)
+        return DraftContent(tailored_resume=resume, tailored_cover=cover)
+
+    def _stream_attempt(
+        self,
+        prompt: str,
+        deadline: float | None,
+        abort: bool,
+        max_words: int | None = None,
+        parts: tuple[str, ...] = DRAFT_PARTS,
+    ) -> tuple[str, str | None]:
+        """
+        Stream one reply through DraftStreamCheck; with `abort`, stop at the first failed check.
+        Raises _StreamCut when the stream breaks after some text arrived.
+        """
+        check = DraftStreamCheck(max_words or self.validation_config.max_words, parts)
+        try:
+            with closing(self.llm.stream_text(prompt, deadline=deadline)) as stream:
+                for chunk in stream:
+                    if check.feed(chunk) is not None and abort:
+                        return check.text, check.reason
+        except Exception as err:
+            if check.text:
+                raise _StreamCut() from err
+            raise
+        return check.text, check.finish()
+
+    def _generate_checked(self, prompt: str, deadline: float | None) -> str:
+        """
+        Generate with incremental validation: a reply that can no longer pass is cancelled
+        and re-prompted with guidance for what went wrong. The last attempt runs to the end.
+        A stream that breaks mid-reply is replaced by an unstreamed call.
+        """
+        max_words = self.validation_config.max_words
+        attempt_prompt = prompt
+        for attempt in range(self.stream_retries + 1):
+            last = attempt == self.stream_retries
+            try:
+                text, reason = self._stream_attempt(attempt_prompt, deadline, abort=not last)
+            except _StreamCut:
+                # Failures before the first chunk were already retried by stream_text; a reply
+                # cut off later is redone with a plain call, which has retries and hedging.
+                return self.llm.generate_text(attempt_prompt, deadline=deadline)
+            if reason is None or last:
+                return text
+            attempt_prompt = f"{prompt}\nCorrection: {guidance(reason, max_words)}\n"
+        return text
+
+    def run(
+        self,
+        profile: CandidateProfile,
+        jd: JobRequirements,
+        strategy: StrategyPlan,
+        deadline: float | None = None,
+    ) -> DraftContent:
+        if not self.use_llm or self.llm is None:
+            return self._fallback_generate(profile, jd, strategy)
+        if self.parallel:
+            return self._run_parallel(profile, jd, strategy, deadline)
 
         prompt = f"""You are a resume+cover specialist. Write concise, ATS-friendly output.
 Instructions:
-- Keep to bullet-friendly formatting (no tables), short sentences, quantified impact where possible.
-- Include keywords from the job where relevant.
+{_STYLE}
 - Output exactly two sections with markers:
 [RESUME]
 <resume markdown>
@@ -57,25 +274,64 @@ Instructions:
 <cover letter markdown>
 [/COVER]
 
-Context:
-Candidate: {profile.model_dump_json()}
-Job: {jd.model_dump_json()}
-Strategy: {strategy.model_dump_json()}
-"""
+{self._context(profile, jd, strategy)}"""
         try:
-            text = self.llm.generate_text(prompt)
+            if self.stream_validation:
+                text = self._generate_checked(prompt, deadline)
+            else:
+                text = self.llm.generate_text(prompt, deadline=deadline)
         except Exception:
+            mark_fallback(self.llm_stage)
             return self._fallback_generate(profile, jd, strategy)
 
-        lower = text.lower()
-        resume_start = lower.find("[resume]")
-        resume_end = lower.find("[/resume]")
-        cover_start = lower.find("[cover]")
-        cover_end = lower.find("[/cover]")
-        if resume_start == -1 or resume_end == -1 or cover_start == -1:
+        draft = _parse_draft(text)
+        if draft is None:
+            mark_fallback(self.llm_stage)
             return self._fallback_generate(profile, jd, strategy)
-        resume_text = text[resume_start + len("[resume]") : resume_end].strip()
-        cover_text = None
-        if cover_end != -1:
-            cover_text = text[cover_start + len("[cover]") : cover_end].strip()
-        return DraftContent(tailored_resume=resume_text, tailored_cover=cover_text or None)
+        return draft
+
+    def revise(
+        self,
+        draft: DraftContent,
+        profile: CandidateProfile,
+        jd: JobRequirements,
+        strategy: StrategyPlan,
+        changes: list[str],
+        deadline: float | None = None,
+    ) -> DraftContent:
+        """
+        Targeted edit of an earlier draft after the resume or posting changed: the prompt carries
+        the draft and the list of changes instead of the whole context, and asks for every other
+        line to be kept. A failed or malformed reply falls back to a full run().
+        """
+        if not self.use_llm or self.llm is None:
+            return self.run(profile, jd, strategy, deadline=deadline)
+        listed = "\n".join(f"- {change}" for change in changes) or "- (none)"
+        prompt = f"""You are a resume+cover specialist. Update the draft below for the listed changes only.
+Instructions:
+- Rewrite only the lines the changes affect; keep every other line exactly as written.
+{_STYLE}
+- Output exactly two sections with markers:
+[RESUME]
+<resume markdown>
+[/RESUME]
+[COVER]
+<cover letter markdown>
+[/COVER]
+
+Changes:
+{listed}
+Strategy: {strategy.model_dump_json()}
+
+Draft:
+[RESUME]
+{draft.tailored_resume}
+[/RESUME]
+[COVER]
+{draft.tailored_cover or ""}
+[/COVER]"""
+        try:
+            revised = _parse_draft(self.llm.generate_text(prompt, deadline=deadline))
+        except Exception:
+            revised = None
+        return revised or self.run(profile, jd, strategy, deadline=deadline)
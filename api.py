@@ -1,11 +1,15 @@
 """
 Minimal FastAPI app for uploading resume/JD and returning tailored content.
 Requires fastapi and uvicorn to be installed.
+For production, serve.py pre-forks workers that call warmup() before taking traffic.
 """
+import os
+from functools import lru_cache
 from typing import Optional
 
 try:
-    from fastapi import FastAPI, UploadFile, Form
+    from fastapi import FastAPI, UploadFile, Form, Header, HTTPException
+    from fastapi.concurrency import run_in_threadpool
 except Exception as exc:  # pragma: no cover - optional dependency
     raise ImportError("FastAPI not installed. Install with `pip install fastapi uvicorn`.") from exc
 
@@ -15,19 +19,64 @@ except ImportError:
     load_dotenv = None
 
 from agents.orchestrator import SwiftOrchestratorAgent
+from logger import configure_logging
+from profiling import collect_timings
+from scheduler import INTERACTIVE, PRIORITIES, FairScheduler, install, tenant_context
+from store import ResultStore
 
 app = FastAPI(title="Resume Tailor API")
 
 if load_dotenv:
     load_dotenv()
 
+# Services log JSON lines for the log pipeline; the CLI keeps the plain-text default.
+configure_logging(fmt=os.environ.get("SWIFT_LOG_FORMAT") or "json")
+
+# LLM calls from all requests share these slots fairly across tenants (see scheduler.py).
+install(
+    FairScheduler(
+        capacity=int(os.environ.get("SWIFT_LLM_CONCURRENCY", "8")),
+        per_tenant_limit=int(os.environ.get("SWIFT_TENANT_CONCURRENCY", "4")),
+    )
+)
+
+
+@lru_cache(maxsize=None)
+def get_orchestrator(offline: bool = False) -> SwiftOrchestratorAgent:
+    """Shared orchestrator per mode so model clients are built once per worker, not per request."""
+    store_path = os.environ.get("SWIFT_RESULT_STORE")
+    orchestrator = SwiftOrchestratorAgent(store=ResultStore(store_path) if store_path else None)
+    if offline:
+        orchestrator.jd_analyzer.use_llm = False
+        orchestrator.matcher.use_llm = False
+        orchestrator.writer.use_llm = False
+        orchestrator.editor.use_llm = False
+    return orchestrator
+
+
+def warmup(connect: bool = False) -> list[str]:
+    """
+    Build both orchestrators and their model clients; returns the warmed LLM stages.
+    With `connect`, each model also gets one cheap real call so its connection is open.
+    """
+    get_orchestrator(offline=True)
+    return get_orchestrator(offline=False).warm(connect=connect)
+
 
 @app.post("/tailor")
 async def tailor_resume(
     resume_file: UploadFile,
     jd_file: UploadFile,
     offline: Optional[bool] = Form(False),
+    x_tenant_id: Optional[str] = Header(None),
+    x_priority: Optional[str] = Header(None),
+    x_profile: Optional[str] = Header(None),
 ):
+    # A single /tailor call is interactive unless labelled otherwise; per-tenant caps and
+    # deficit round robin keep a tenant that labels everything interactive from crowding out others.
+    priority = x_priority or INTERACTIVE
+    if priority not in PRIORITIES:
+        raise HTTPException(status_code=400, detail=f"X-Priority must be one of: {', '.join(PRIORITIES)}")
     resume_bytes = await resume_file.read()
     jd_bytes = await jd_file.read()
     resume_path = f"/tmp/{resume_file.filename}"
@@ -40,15 +89,24 @@ async def tailor_resume(
     with open(jd_path, "r", encoding="utf-8", errors="ignore") as fh:
         jd_text = fh.read()
 
-    orchestrator = SwiftOrchestratorAgent()
-    if offline:
-        orchestrator.jd_analyzer.use_llm = False
-        orchestrator.matcher.use_llm = False
-        orchestrator.writer.use_llm = False
-        orchestrator.editor.use_llm = False
+    orchestrator = get_orchestrator(offline=bool(offline))
+
+    profile = (x_profile or "").lower() in ("1", "true", "yes")
+
+    def _run():
+        with tenant_context(x_tenant_id or "anonymous", priority):
+            if not profile:
+                return orchestrator.run(resume_path, jd_text), None
+            with collect_timings() as timings:
+                draft = orchestrator.run(resume_path, jd_text)
+            return draft, timings.as_dict()
 
-    draft = orchestrator.run(resume_path, jd_text)
-    return {
+    # Run off the event loop so one slow request does not stall every other connection.
+    draft, timings = await run_in_threadpool(_run)
+    response = {
         "tailored_resume": draft.tailored_resume,
         "tailored_cover": draft.tailored_cover,
     }
+    if timings is not None:
+        response["timings"] = timings
+    return response
@@ -0,0 +1,92 @@
+"""
+Import-time report for short-lived entry points (wraps `python -X importtime`).
+
+Usage:
+    python bench/importtime.py --module cli --top 15 --budget-ms 1500
+
+Prints the slowest imports by cumulative time and exits non-zero when the total
+import time of the module exceeds the budget.
+"""
+import argparse
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BUDGET_MS = 1500.0
+# Dependencies that must not be imported just to start the CLI offline.
+HEAVY_MODULES = ("google.genai", "google.adk", "fpdf", "docx", "PyPDF2")
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> list[ImportTiming]:
+    timings: list[ImportTiming] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+            stripped = name.rstrip()
+            module = stripped.lstrip()
+            depth = (len(stripped) - len(module) - 1) // 2
+            timings.append(ImportTiming(module, int(self_us), int(cumulative_us), depth))
+        except ValueError:
+            continue
+    return timings
+
+
+def measure(module: str = "cli") -> list[ImportTiming]:
+    """Import `module` in a fresh interpreter rooted at the repo and collect its import timings."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(proc.stderr)
+
+
+def total_ms(timings: list[ImportTiming], module: str) -> float:
+    for timing in timings:
+        if timing.module == module and timing.depth == 0:
+            return timing.cumulative_us / 1000
+    return sum(t.self_us for t in timings) / 1000
+
+
+def report(timings: list[ImportTiming], module: str, top: int = 15) -> str:
+    lines = [f"Import time for {module}: {total_ms(timings, module):.1f} ms", ""]
+    lines.append(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for timing in sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[:top]:
+        lines.append(f"{timing.cumulative_us / 1000:>14.1f} {timing.self_us / 1000:>9.1f}  {timing.module}")
+    heavy = sorted({t.module for t in timings if t.module.startswith(HEAVY_MODULES)})
+    if heavy:
+        lines.append("")
+        lines.append("Heavy optional dependencies imported eagerly: " + ", ".join(heavy))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import time of an entry point.")
+    parser.add_argument("--module", default="cli", help="Module to import (default: cli).")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to show.")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Fail above this total.")
+    args = parser.parse_args()
+
+    timings = measure(args.module)
+    print(report(timings, args.module, top=args.top))
+    elapsed = total_ms(timings, args.module)
+    if elapsed > args.budget_ms:
+        sys.exit(f"Import budget exceeded: {elapsed:.1f} ms > {args.budget_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,593 @@
+"""
+Load test for the /tailor endpoint of api.py, fully offline.
+
+A local stand-in for Gemini (FakeGeminiServer) answers every agent's prompt with a canned
+reply after a lognormal latency, failing a share of calls with 429/5xx. The app is pointed
+at it through llm_utils.set_model_factory and driven with synthetic resume/JD uploads:
+
+- open loop: Poisson arrivals at each target rate (`--rps 2,4,8`); latency is measured from
+  the scheduled send time, so queueing in the client is not hidden
+- closed loop: a fixed number of concurrent users (`--concurrency 1,4,16`)
+
+Each step reports throughput, latency percentiles and error rate; the saturation point is
+the first step where throughput stops tracking the offered load (open loop), stops growing
+(closed loop), or errors / p99 exceed their limits.
+
+Usage:
+    python bench/loadtest.py --mode open --rps 2,4,8,16 --duration 10 --latency-ms 400
+    python bench/loadtest.py --mode closed --concurrency 1,4,16 --target uvicorn
+
+The app runs in-process by default (requests go straight to the ASGI app); `--target uvicorn`
+serves it from a uvicorn subprocess and `--target http://host:port` uses a running server,
+which must already be configured to use a stand-in model.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Awaitable, Callable
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# Canned replies per agent, picked by a phrase of its prompt; the first match wins.
+_REPLIES = (
+    (
+        "Extract structured requirements",
+        '```json\n{"title": "ML Engineer", "company": "Acme", "must_haves": ["Python", "NLP"], '
+        '"nice_to_haves": ["Docker"], "responsibilities": ["Build models"], "location": null}\n```',
+    ),
+    (
+        "identify gaps",
+        '```json\n{"gaps": ["Docker"], "positioning": ["Applied NLP engineer"], '
+        '"rewriting_focus": ["Quantify model impact"]}\n```',
+    ),
+    ("Write only the tailored resume", "[RESUME]\n- Built NLP models in Python\n[/RESUME]"),
+    ("Write only the tailored cover letter", "[COVER]\nDear Acme team,\nI build NLP systems.\n[/COVER]"),
+    (
+        "resume+cover specialist",
+        "[RESUME]\n- Built NLP models in Python\n[/RESUME]\n[COVER]\nDear Acme team,\nI build NLP systems.\n[/COVER]",
+    ),
+    (
+        "Review and improve the draft",
+        "```resume\n- Built NLP models in Python\n\nDear Acme team,\nI build NLP systems.\n```\n"
+        '```validation\n{"passes": true, "reasons": [], "suggestions": []}\n```',
+    ),
+)
+
+_FIRST_NAMES = ["Jane", "Arjun", "Mei", "Carlos", "Amara", "Lukas", "Sofia", "Kenji"]
+_LAST_NAMES = ["Doe", "Patel", "Chen", "Garcia", "Okafor", "Schmidt", "Rossi", "Tanaka"]
+_SKILLS = ["Python", "NLP", "PyTorch", "SQL", "Docker", "Kubernetes", "AWS", "Spark", "Go", "React"]
+_TITLES = ["ML Engineer", "Data Scientist", "Backend Engineer", "Platform Engineer", "Data Engineer"]
+_COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli"]
+
+
+@dataclass
+class LatencyModel:
+    """Lognormal latency around `median_ms` (sigma 0 = fixed) and a share of failed calls."""
+
+    median_ms: float = 300.0
+    sigma: float = 0.5
+    error_rate: float = 0.0
+    error_codes: tuple[int, ...] = (429, 503)
+
+    def sample(self, rng: random.Random) -> tuple[float, int]:
+        delay = self.median_ms / 1000 * (math.exp(rng.gauss(0, self.sigma)) if self.sigma else 1.0)
+        status = rng.choice(self.error_codes) if rng.random() < self.error_rate else 200
+        return delay, status
+
+
+class FakeGeminiServer:
+    """
+    Local HTTP stand-in for the Gemini REST API: POST /v1beta/models/<model>:generateContent,
+    and :streamGenerateContent?alt=sse, which sends the reply line by line as server-sent
+    events (the first after half the sampled latency, the rest spread over the other half).
+    Runs on a background thread; use as a context manager or call start()/stop().
+    """
+
+    def __init__(self, latency: LatencyModel | None = None, host: str = "127.0.0.1", port: int = 0, seed: int = 0):
+        self.latency = latency or LatencyModel()
+        self.calls = 0
+        self.errors = 0
+        self.streamed = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                prompt = "".join(p.get("text", "") for c in body.get("contents", []) for p in c.get("parts", []))
+                with server._lock:
+                    delay, status = server.latency.sample(server._rng)
+                    server.calls += 1
+                    server.errors += status != 200
+                text = next((reply for phrase, reply in _REPLIES if phrase in prompt), "ok")
+                if status == 200 and ":streamGenerateContent" in self.path:
+                    with server._lock:
+                        server.streamed += 1
+                    self._stream(text, delay)
+                    return
+                time.sleep(delay)
+                if status != 200:
+                    payload = {"error": {"code": status, "message": "injected failure"}}
+                else:
+                    payload = _candidate(text)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, text: str, delay: float):
+                lines = text.splitlines(keepends=True) or [text]
+                time.sleep(delay / 2)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for i, line in enumerate(lines):
+                    if i:
+                        time.sleep(delay / 2 / max(1, len(lines) - 1))
+                    self.wfile.write(f"data: {json.dumps(_candidate(line))}\r\n\r\n".encode())
+                    self.wfile.flush()
+
+            def log_message(self, format, *args):
+                pass
+
+        return _Handler
+
+    def start(self) -> "FakeGeminiServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-gemini", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeGeminiServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def _candidate(text: str) -> dict:
+    return {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}}]}
+
+
+class _Response:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class HTTPModel:
+    """
+    Minimal model client for FakeGeminiServer, with the generate_content interface of the SDK.
+    `stream=True` returns an iterator of chunks, so the writer takes the same streamed path
+    as with Gemini.
+    """
+
+    def __init__(self, base_url: str, model_name: str, timeout: float = 60.0):
+        self.base = f"{base_url}/v1beta/models/{model_name}"
+        self.timeout = timeout
+
+    def _request(self, method: str, prompt: str) -> urllib.request.Request:
+        body = json.dumps({"contents": [{"role": "user", "parts": [{"text": prompt}]}]}).encode()
+        return urllib.request.Request(f"{self.base}:{method}", data=body, headers={"Content-Type": "application/json"})
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        if stream:
+            return self._stream(prompt)
+        with urllib.request.urlopen(self._request("generateContent", prompt), timeout=self.timeout) as response:
+            payload = json.loads(response.read())
+        return _Response(payload["candidates"][0]["content"]["parts"][0]["text"])
+
+    def _stream(self, prompt: str):
+        # Sent on first iteration, like the SDK; closing the iterator drops the connection.
+        with urllib.request.urlopen(self._request("streamGenerateContent?alt=sse", prompt), timeout=self.timeout) as response:
+            for line in response:
+                if line.startswith(b"data:"):
+                    payload = json.loads(line[len(b"data:") :])
+                    yield _Response(payload["candidates"][0]["content"]["parts"][0]["text"])
+
+
+def use_fake_models(base_url: str) -> None:
+    """Make every agent built afterwards talk to the stand-in server at `base_url`."""
+    from agents.llm_utils import set_model_factory
+
+    set_model_factory(lambda model_name: HTTPModel(base_url, model_name))
+
+
+def synthetic_pairs(count: int, seed: int = 0) -> list[tuple[str, str]]:
+    """Distinct (resume, job posting) texts, so result caching cannot flatter the numbers."""
+    rng = random.Random(seed)
+    pairs = []
+    for i in range(count):
+        name = f"{rng.choice(_FIRST_NAMES)} {rng.choice(_LAST_NAMES)}"
+        skills = rng.sample(_SKILLS, 4)
+        title, company = rng.choice(_TITLES), rng.choice(_COMPANIES)
+        resume = (
+            f"{name}\n{name.split()[0].lower()}{i}@example.com\n"
+            f"Summary: {title} with {rng.randint(2, 12)} years of experience\n"
+            f"Skills: {', '.join(skills)}\n"
+            f"Experience: Built {skills[0]} services at {rng.choice(_COMPANIES)}; led {skills[1]} migration\n"
+            "Education: BS Computer Science\n"
+        )
+        jd = (
+            f"Job: {title}\nCompany: {company}\n"
+            f"Must have: {'; '.join(rng.sample(_SKILLS, 3))}\n"
+            f"Nice to have: {rng.choice(_SKILLS)}\nPosting {i}\n"
+        )
+        pairs.append((resume, jd))
+    return pairs
+
+
+def _multipart(resume: str, jd: str, tag: str) -> tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    parts = []
+    # Unique file names: the API writes uploads to /tmp under the given name.
+    for field_name, filename, content in (("resume_file", f"resume-{tag}.txt", resume), ("jd_file", f"jd-{tag}.txt", jd)):
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{field_name}"; filename="{filename}"\r\n'
+            f"Content-Type: text/plain\r\n\r\n{content}\r\n"
+        )
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="offline"\r\n\r\nfalse\r\n--{boundary}--\r\n')
+    return "".join(parts).encode(), f"multipart/form-data; boundary={boundary}"
+
+
+Sender = Callable[[bytes, dict], Awaitable[int]]
+
+
+def asgi_sender(app) -> Sender:
+    """Send requests straight to an ASGI app, without sockets or an HTTP client library."""
+
+    async def _send(body: bytes, headers: dict) -> int:
+        status = 0
+        done = asyncio.Event()
+        delivered = False
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": "/tailor",
+            "raw_path": b"/tailor",
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+            "client": ("127.0.0.1", 0),
+            "server": ("loadtest", 80),
+        }
+
+        async def receive():
+            nonlocal delivered
+            if not delivered:
+                delivered = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body" and not message.get("more_body"):
+                done.set()
+
+        await app(scope, receive, send)
+        return status
+
+    return _send
+
+
+def url_sender(base_url: str, max_workers: int = 256, timeout: float = 120.0) -> Sender:
+    """Send requests over HTTP with urllib on a thread pool sized for the peak concurrency."""
+    pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="loadtest")
+
+    def _post(body: bytes, headers: dict) -> int:
+        request = urllib.request.Request(f"{base_url}/tailor", data=body, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as err:
+            return err.code
+        except OSError:
+            return 0
+
+    async def _send(body: bytes, headers: dict) -> int:
+        return await asyncio.get_running_loop().run_in_executor(pool, _post, body, headers)
+
+    return _send
+
+
+@dataclass
+class StepResult:
+    mode: str
+    level: float  # offered requests/s (open loop) or concurrent users (closed loop)
+    sent: int
+    ok: int
+    errors: int
+    duration_s: float
+    throughput_rps: float
+    error_rate: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    max_ms: float
+    offered_rps: float = 0.0
+    # Median latency of the last third of requests over the first third; grows when a queue builds up.
+    backlog_growth: float = 1.0
+    model_calls: int = 0
+    model_errors: int = 0
+    latencies_ms: list[float] = field(default_factory=list, repr=False)
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of `values` (q in 0-100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+class LoadRunner:
+    def __init__(self, sender: Sender, pairs: list[tuple[str, str]], tenants: int = 1, seed: int = 0):
+        self.sender = sender
+        self.pairs = pairs
+        self.tenants = tenants
+        self._rng = random.Random(seed)
+        self._count = 0
+
+    async def _one(self, started: float, results: list) -> None:
+        resume, jd = self.pairs[self._count % len(self.pairs)]
+        tenant = f"loadtest-{self._count % self.tenants}"
+        self._count += 1
+        body, content_type = _multipart(resume, jd, uuid.uuid4().hex[:12])
+        try:
+            status = await self.sender(body, {"Content-Type": content_type, "X-Tenant-Id": tenant})
+        except Exception:
+            status = 0
+        results.append((status, (time.perf_counter() - started) * 1000, started))
+
+    async def open_loop(self, rps: float, duration: float) -> tuple[list, float]:
+        """Poisson arrivals at `rps` for `duration` seconds; waits for stragglers before returning."""
+        results: list = []
+        tasks = []
+        begin = time.perf_counter()
+        next_at = begin
+        while next_at - begin < duration:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(self._one(next_at, results)))
+            next_at += self._rng.expovariate(rps)
+        await asyncio.gather(*tasks)
+        return results, time.perf_counter() - begin
+
+    async def closed_loop(self, users: int, duration: float) -> tuple[list, float]:
+        """`users` clients each sending their next request as soon as the previous one returns."""
+        results: list = []
+        begin = time.perf_counter()
+
+        async def _user():
+            while time.perf_counter() - begin < duration:
+                await self._one(time.perf_counter(), results)
+
+        await asyncio.gather(*(_user() for _ in range(users)))
+        return results, time.perf_counter() - begin
+
+    def step(self, mode: str, level: float, duration: float) -> StepResult:
+        if mode == "open":
+            results, elapsed = asyncio.run(self.open_loop(level, duration))
+        else:
+            results, elapsed = asyncio.run(self.closed_loop(int(level), duration))
+        latencies = [ms for status, ms, _ in results if status == 200]
+        errors = len(results) - len(latencies)
+        ordered = [ms for status, ms, _ in sorted(results, key=lambda r: r[2]) if status == 200]
+        third = len(ordered) // 3
+        early, late = percentile(ordered[:third], 50), percentile(ordered[-third:] if third else [], 50)
+        return StepResult(
+            mode=mode,
+            level=level,
+            sent=len(results),
+            ok=len(latencies),
+            errors=errors,
+            duration_s=round(elapsed, 3),
+            throughput_rps=round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+            error_rate=round(errors / len(results), 4) if results else 0.0,
+            p50_ms=round(percentile(latencies, 50), 1),
+            p90_ms=round(percentile(latencies, 90), 1),
+            p99_ms=round(percentile(latencies, 99), 1),
+            max_ms=round(max(latencies, default=0.0), 1),
+            offered_rps=round(len(results) / duration, 3),
+            backlog_growth=round(late / early, 2) if early else 1.0,
+            latencies_ms=latencies,
+        )
+
+
+def saturation_point(
+    steps: list[StepResult],
+    max_error_rate: float = 0.01,
+    slo_ms: float | None = None,
+    min_gain: float = 0.1,
+) -> StepResult | None:
+    """
+    First step at which the deployment no longer keeps up, or None if every step held:
+    errors or p99 over their limits, throughput below 90% of the offered rate while latency
+    keeps climbing through the step (open loop), or less than `min_gain` throughput growth
+    over the previous step (closed loop). Steps should last well beyond the p99 latency.
+    """
+    previous = None
+    for step in steps:
+        if step.error_rate > max_error_rate or (slo_ms is not None and step.p99_ms > slo_ms):
+            return step
+        if step.mode == "open" and step.throughput_rps < 0.9 * step.offered_rps and step.backlog_growth > 2:
+            return step
+        if step.mode == "closed" and previous is not None and step.throughput_rps < previous.throughput_rps * (1 + min_gain):
+            return step
+        previous = step
+    return None
+
+
+def report(steps: list[StepResult], saturated: StepResult | None) -> str:
+    unit = "rps" if steps and steps[0].mode == "open" else "users"
+    lines = [
+        f"{unit:>7} {'sent':>6} {'ok':>6} {'tput/s':>8} {'err %':>6} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'model err':>10}"
+    ]
+    for s in steps:
+        lines.append(
+            f"{s.level:>7g} {s.sent:>6} {s.ok:>6} {s.throughput_rps:>8.2f} {s.error_rate * 100:>6.1f} "
+            f"{s.p50_ms:>9.1f} {s.p90_ms:>9.1f} {s.p99_ms:>9.1f} {s.model_errors:>4}/{s.model_calls:<5}"
+        )
+    lines.append("")
+    if saturated is None:
+        lines.append(f"No saturation up to {steps[-1].level:g} {unit}." if steps else "No steps run.")
+    else:
+        held = [s for s in steps if s.level < saturated.level]
+        best = max((s.throughput_rps for s in steps), default=0.0)
+        sustained = f"last healthy step {held[-1].level:g} {unit}" if held else "already at the first step"
+        lines.append(f"Saturation at {saturated.level:g} {unit} ({sustained}); peak throughput {best:.2f} req/s.")
+    return "\n".join(lines)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f"App did not start listening on port {port}")
+
+
+def _serve_app(port: int, model_url: str) -> None:
+    """Entry point of the uvicorn subprocess: the app with every agent on the stand-in model."""
+    import uvicorn
+
+    use_fake_models(model_url)
+    import api
+
+    uvicorn.run(api.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def _levels(spec: str) -> list[float]:
+    return [float(v) for v in spec.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test /tailor against a local stand-in model.")
+    parser.add_argument("--mode", choices=["open", "closed"], default="open", help="Arrival model.")
+    parser.add_argument("--rps", default="1,2,4,8", help="Open loop: comma-separated request rates to step through.")
+    parser.add_argument("--concurrency", default="1,2,4,8,16", help="Closed loop: comma-separated user counts.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per step.")
+    parser.add_argument("--target", default="inprocess", help="inprocess, uvicorn, or the base URL of a running app.")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Median stand-in model latency.")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Lognormal spread of the latency (0 = fixed).")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of model calls that fail.")
+    parser.add_argument("--error-codes", default="429,503", help="HTTP codes used for failed model calls.")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Error rate counted as saturation.")
+    parser.add_argument("--slo-ms", type=float, default=None, help="p99 latency counted as saturation.")
+    parser.add_argument("--tenants", type=int, default=1, help="Spread requests over this many X-Tenant-Id values.")
+    parser.add_argument("--pairs", type=int, default=200, help="Distinct synthetic resume/JD pairs.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-level", default="WARNING", help="Log level of the app under test.")
+    parser.add_argument("--json", default=None, help="Also write the step results to this file.")
+    parser.add_argument("--serve-app", type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--model-url", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_app is not None:
+        _serve_app(args.serve_app, args.model_url)
+        return
+
+    latency = LatencyModel(
+        median_ms=args.latency_ms,
+        sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        error_codes=tuple(int(c) for c in args.error_codes.split(",")),
+    )
+    levels = _levels(args.rps if args.mode == "open" else args.concurrency)
+    app_process = None
+    with FakeGeminiServer(latency, seed=args.seed) as model_server:
+        if args.target == "inprocess":
+            from logger import configure_logging
+
+            configure_logging(level=args.log_level)
+            use_fake_models(model_server.url)
+            import api
+
+            sender = asgi_sender(api.app)
+        elif args.target == "uvicorn":
+            port = _free_port()
+            app_process = subprocess.Popen(
+                [sys.executable, __file__, "--serve-app", str(port), "--model-url", model_server.url],
+                cwd=ROOT,
+                env={**os.environ, "SWIFT_LOG_LEVEL": args.log_level},
+            )
+            _wait_for_port(port)
+            sender = url_sender(f"http://127.0.0.1:{port}", max_workers=max(256, int(max(levels)) * 4))
+        else:
+            sender = url_sender(args.target.rstrip("/"), max_workers=max(256, int(max(levels)) * 4))
+
+        runner = LoadRunner(sender, synthetic_pairs(args.pairs, seed=args.seed), tenants=args.tenants, seed=args.seed)
+        steps = []
+        try:
+            for level in levels:
+                calls, errors = model_server.calls, model_server.errors
+                step = runner.step(args.mode, level, args.duration)
+                step.model_calls = model_server.calls - calls
+                step.model_errors = model_server.errors - errors
+                steps.append(step)
+                print(f"{args.mode} {level:g}: {step.throughput_rps:.2f} req/s, p99 {step.p99_ms:.0f} ms", file=sys.stderr)
+        finally:
+            if app_process is not None:
+                app_process.terminate()
+                app_process.wait()
+
+    saturated = saturation_point(steps, max_error_rate=args.max_error_rate, slo_ms=args.slo_ms)
+    print(report(steps, saturated))
+    if args.json:
+        rows = [{k: v for k, v in asdict(s).items() if k != "latencies_ms"} for s in steps]
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({"steps": rows, "saturation": saturated.level if saturated else None}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
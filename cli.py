@@ -1,25 +1,67 @@
 import argparse
+import json
 import os
 import sys
+from pathlib import Path
 
 try:
     from dotenv import load_dotenv
 except ImportError:
     load_dotenv = None
 
+from agents.fit_scorer import LowFitPosting
 from agents.orchestrator import SwiftOrchestratorAgent
-from config import ExportConfig
-from tools.file_export_tool import export_draft
+from config import ExportConfig, FitConfig
+from profiling import profile_run
+from store import ResultStore
+from tools.file_export_tool import ExportJob, export_draft, export_many, job_slug
+from tools.job_ingest import ingest_and_tailor
 
 
-def main():
+def _skip_low_fit(posting_id: str, jd_text: str, fit, deferred: bool, defer_path: str | None) -> None:
+    print(f"{'Deferred' if deferred else 'Rejected'} {posting_id}: {fit.reason}", file=sys.stderr)
+    if deferred and defer_path:
+        with open(defer_path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps({"id": posting_id, "text": jd_text, "fit": fit.score}) + "\n")
+
+
+def _parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Tailor resume to a job description.")
     parser.add_argument("--resume", required=True, help="Path to resume (txt/md/pdf).")
-    parser.add_argument("--jd", required=True, help="Path to job posting text.")
-    parser.add_argument("--out", default=None, help="Output file path.")
+    parser.add_argument("--jd", nargs="+", default=[], help="Path(s) to job posting text.")
+    parser.add_argument("--jobs", nargs="+", default=[], help="Job-board dump(s) to stream (jsonl/csv/html).")
+    parser.add_argument("--min-skill-overlap", type=int, default=1, help="Skip dumped postings naming fewer of your skills.")
+    parser.add_argument("--out", default=None, help="Output file path (single posting).")
+    parser.add_argument("--out-dir", default=None, help="Directory for one output file per posting.")
+    parser.add_argument("--archive", default=None, help="Zip archive collecting one output per posting.")
+    parser.add_argument("--workers", type=int, default=None, help="Export worker processes (default: CPU count).")
+    parser.add_argument("--min-fit", type=float, default=None, help="Skip postings whose fit score (0-1) is lower.")
+    parser.add_argument("--defer", default=None, help="With --min-fit: append low-fit postings to this JSONL instead of dropping them.")
+    parser.add_argument("--tailor-workers", type=int, default=4, help="Postings tailored concurrently with --jobs.")
     parser.add_argument("--format", default=ExportConfig().default_format, choices=["md", "txt", "pdf", "docx"], help="Export format.")
     parser.add_argument("--offline", action="store_true", help="Disable LLM calls; use heuristic fallbacks.")
-    args = parser.parse_args()
+    parser.add_argument("--store", default=None, help="SQLite file for stage results; unchanged stages are reused.")
+    parser.add_argument(
+        "--profile",
+        default=None,
+        metavar="PREFIX",
+        help="Profile the run: writes PREFIX.prof (cProfile of the main thread) and PREFIX.collapsed "
+        "(flame graph stacks of every thread, rooted at the thread name) and prints per-stage timings. "
+        "Export worker processes are not profiled.",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+    if args.profile:
+        with profile_run(args.profile):
+            _tailor(args)
+    else:
+        _tailor(args)
+
+
+def _tailor(args: argparse.Namespace) -> None:
 
     # Load .env if available
     if load_dotenv:
@@ -27,13 +69,20 @@ def main():
 
     if not os.path.exists(args.resume):
         sys.exit(f"Resume not found: {args.resume}")
-    if not os.path.exists(args.jd):
-        sys.exit(f"Job posting not found: {args.jd}")
-
-    with open(args.jd, "r", encoding="utf-8") as fh:
-        jd_text = fh.read()
+    if not args.jd and not args.jobs:
+        sys.exit("Pass --jd and/or --jobs.")
+    for jd_path in args.jd + args.jobs:
+        if not os.path.exists(jd_path):
+            sys.exit(f"Job posting not found: {jd_path}")
+    batch = len(args.jd) > 1 or args.jobs or args.out_dir or args.archive
+    if batch and args.out:
+        sys.exit("--out applies to a single posting; use --out-dir or --archive for batches.")
 
-    orchestrator = SwiftOrchestratorAgent()
+    fit_config = FitConfig(min_score=args.min_fit, action="defer" if args.defer else "reject")
+    orchestrator = SwiftOrchestratorAgent(
+        store=ResultStore(args.store) if args.store else None,
+        fit_config=fit_config,
+    )
     # Toggle LLMs off if requested
     if args.offline:
         orchestrator.jd_analyzer.use_llm = False
@@ -41,7 +90,56 @@ def main():
         orchestrator.writer.use_llm = False
         orchestrator.editor.use_llm = False
 
-    draft = orchestrator.run(args.resume, jd_text)
+    if batch:
+
+        def _jobs():
+            # Drafts are produced lazily so the exporter can stream them to disk as they arrive.
+            for jd_path in args.jd:
+                with open(jd_path, "r", encoding="utf-8") as fh:
+                    jd_text = fh.read()
+                try:
+                    draft = orchestrator.run(args.resume, jd_text)
+                except LowFitPosting as low:
+                    _skip_low_fit(Path(jd_path).stem, jd_text, low.fit, low.deferred, args.defer)
+                    continue
+                yield ExportJob(name=job_slug(Path(jd_path).stem), draft=draft)
+            if args.jobs:
+                profile = orchestrator.parse_profile(args.resume)
+                results = ingest_and_tailor(
+                    args.jobs,
+                    orchestrator,
+                    profile,
+                    min_skill_overlap=args.min_skill_overlap,
+                    max_workers=args.tailor_workers,
+                )
+                for result in results:
+                    if result.skipped:
+                        posting = result.posting
+                        _skip_low_fit(posting.posting_id, posting.text, result.fit, result.deferred, args.defer)
+                        continue
+                    if result.error:
+                        print(f"Skipped {result.posting.posting_id}: {result.error}", file=sys.stderr)
+                        continue
+                    yield ExportJob(name=job_slug(result.posting.posting_id), draft=result.state.final)
+
+        paths = export_many(
+            _jobs(),
+            fmt=args.format,
+            out_dir=None if args.archive else (args.out_dir or "."),
+            archive=args.archive,
+            workers=args.workers,
+        )
+        target = args.archive or args.out_dir or "."
+        print(f"Exported {len(paths)} drafts to {target}")
+        return
+
+    with open(args.jd[0], "r", encoding="utf-8") as fh:
+        jd_text = fh.read()
+    try:
+        draft = orchestrator.run(args.resume, jd_text)
+    except LowFitPosting as low:
+        _skip_low_fit(Path(args.jd[0]).stem, jd_text, low.fit, low.deferred, args.defer)
+        sys.exit(1)
     out_path = export_draft(
         draft,
         profile=None,  # Could pass parsed profile if desired
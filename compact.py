@@ -0,0 +1,199 @@
+"""
+Compact in-memory forms of CandidateProfile/JobRequirements for bulk processing.
+
+Batch paths (e.g. ranking thousands of profiles against one posting, or the skill prefilter
+of tools/job_ingest.py) convert the pydantic models once at the boundary into slotted
+dataclasses whose skill lists are arrays of ids into an interned SkillVocab. The caller owns
+the vocab, one per batch, so it is freed with the batch instead of growing for the life of
+the process. Matching works on integer ids, and JSON is rendered once per object
+(byte-identical to `model_dump_json()`) and cached.
+"""
+import heapq
+import json
+import sys
+import threading
+from array import array
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from schemas import CandidateProfile, JobRequirements
+
+
+class SkillVocab:
+    """Interns skill strings to dense integer ids; each id also maps to its case-folded form."""
+
+    def __init__(self):
+        self._ids: dict[str, int] = {}
+        self._strings: list[str] = []
+        self._folded = array("I")
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def id(self, text: str) -> int:
+        found = self._ids.get(text)
+        if found is not None:
+            return found
+        with self._lock:
+            found = self._ids.get(text)
+            if found is not None:
+                return found
+            key = " ".join(text.casefold().split())
+            folded = self._ids.get(key)
+            if folded is None and key != text:
+                folded = self._append(key, None)
+            return self._append(text, folded)
+
+    def _append(self, text: str, folded: int | None) -> int:
+        new_id = len(self._strings)
+        text = sys.intern(text)
+        self._strings.append(text)
+        self._ids[text] = new_id
+        self._folded.append(new_id if folded is None else folded)
+        return new_id
+
+    def ids(self, texts: Iterable[str]) -> array:
+        return array("I", (self.id(text) for text in texts))
+
+    def string(self, skill_id: int) -> str:
+        return self._strings[skill_id]
+
+    def strings(self, skill_ids: array) -> list[str]:
+        return [self._strings[i] for i in skill_ids]
+
+    def folded(self, skill_ids: array) -> frozenset[int]:
+        """Case/whitespace-insensitive ids, used for matching."""
+        return frozenset(self._folded[i] for i in skill_ids)
+
+
+def _dumps(payload: dict) -> str:
+    # Same shape as pydantic's model_dump_json: compact separators, raw UTF-8.
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+@dataclass(slots=True, eq=False)
+class CompactProfile:
+    name: str
+    contact: str
+    summary: str
+    skills: array
+    experience: tuple[str, ...]
+    education: tuple[str, ...]
+    extras: Optional[tuple[str, ...]] = None
+    _json: Optional[str] = field(default=None, repr=False)
+
+    @classmethod
+    def from_model(cls, profile: CandidateProfile, vocab: SkillVocab) -> "CompactProfile":
+        return cls(
+            name=profile.name,
+            contact=profile.contact,
+            summary=profile.summary,
+            skills=vocab.ids(profile.skills),
+            experience=tuple(profile.experience),
+            education=tuple(profile.education),
+            extras=None if profile.extras is None else tuple(profile.extras),
+        )
+
+    def to_model(self, vocab: SkillVocab) -> CandidateProfile:
+        return CandidateProfile.model_construct(
+            name=self.name,
+            contact=self.contact,
+            summary=self.summary,
+            skills=vocab.strings(self.skills),
+            experience=list(self.experience),
+            education=list(self.education),
+            extras=None if self.extras is None else list(self.extras),
+        )
+
+    def to_json(self, vocab: SkillVocab) -> str:
+        if self._json is None:
+            self._json = _dumps(
+                {
+                    "name": self.name,
+                    "contact": self.contact,
+                    "summary": self.summary,
+                    "skills": vocab.strings(self.skills),
+                    "experience": list(self.experience),
+                    "education": list(self.education),
+                    "extras": None if self.extras is None else list(self.extras),
+                }
+            )
+        return self._json
+
+
+@dataclass(slots=True, eq=False)
+class CompactRequirements:
+    title: str
+    company: str
+    must_haves: array
+    nice_to_haves: array
+    responsibilities: tuple[str, ...]
+    location: Optional[str] = None
+    _json: Optional[str] = field(default=None, repr=False)
+
+    @classmethod
+    def from_model(cls, jd: JobRequirements, vocab: SkillVocab) -> "CompactRequirements":
+        return cls(
+            title=jd.title,
+            company=jd.company,
+            must_haves=vocab.ids(jd.must_haves),
+            nice_to_haves=vocab.ids(jd.nice_to_haves),
+            responsibilities=tuple(jd.responsibilities),
+            location=jd.location,
+        )
+
+    def to_model(self, vocab: SkillVocab) -> JobRequirements:
+        return JobRequirements.model_construct(
+            title=self.title,
+            company=self.company,
+            must_haves=vocab.strings(self.must_haves),
+            nice_to_haves=vocab.strings(self.nice_to_haves),
+            responsibilities=list(self.responsibilities),
+            location=self.location,
+        )
+
+    def to_json(self, vocab: SkillVocab) -> str:
+        if self._json is None:
+            self._json = _dumps(
+                {
+                    "title": self.title,
+                    "company": self.company,
+                    "must_haves": vocab.strings(self.must_haves),
+                    "nice_to_haves": vocab.strings(self.nice_to_haves),
+                    "responsibilities": list(self.responsibilities),
+                    "location": self.location,
+                }
+            )
+        return self._json
+
+
+def _coverage(have: frozenset[int], must: frozenset[int], nice: frozenset[int], nice_weight: float) -> float:
+    score = len(must & have) / len(must) if must else 1.0
+    if not nice:
+        return score
+    return (score + nice_weight * len(nice & have) / len(nice)) / (1 + nice_weight)
+
+
+def skill_coverage(
+    profile: CompactProfile,
+    jd: CompactRequirements,
+    vocab: SkillVocab,
+    nice_weight: float = 0.25,
+) -> float:
+    """Share of must-have skills listed on the profile, with a smaller weight for nice-to-haves (0-1)."""
+    return _coverage(vocab.folded(profile.skills), vocab.folded(jd.must_haves), vocab.folded(jd.nice_to_haves), nice_weight)
+
+
+def rank_profiles(
+    profiles: Iterable[CompactProfile],
+    jd: CompactRequirements,
+    vocab: SkillVocab,
+    top_n: int = 50,
+    nice_weight: float = 0.25,
+) -> list[tuple[float, int]]:
+    """(score, position) of the best `top_n` profiles for a posting, highest score first; streams `profiles`."""
+    must = vocab.folded(jd.must_haves)
+    nice = vocab.folded(jd.nice_to_haves)
+    scored = ((_coverage(vocab.folded(p.skills), must, nice, nice_weight), i) for i, p in enumerate(profiles))
+    return heapq.nlargest(top_n, scored, key=lambda item: (item[0], -item[1]))
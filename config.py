@@ -8,6 +8,30 @@ class ModelConfig:
     writer_model: str = "gemini-1.5-flash"
     editor_model: str = "gemini-1.5-pro"
     max_retries: int = 2
+    # Per-stage time budgets (seconds) covering all retries of one LLM stage; None disables.
+    jd_timeout: float | None = 30.0
+    matcher_timeout: float | None = 30.0
+    writer_timeout: float | None = 60.0
+    editor_timeout: float | None = 45.0
+    # Overall budget for one orchestrator run, propagated to every stage as a deadline.
+    request_timeout: float | None = 180.0
+    # Hedging: fire a duplicate request once a call outlives the observed p95 latency
+    # (hedge_after_seconds is used until enough samples have been collected).
+    hedge_requests: bool = False
+    hedge_after_seconds: float = 8.0
+    # Cascade: run the JD, matcher and editor stages on fast_model first and escalate to
+    # the stage model only when the fast output fails its checks.
+    cascade: bool = False
+    fast_model: str = "gemini-1.5-flash"
+    # Writer prompt carries only the top-k profile bullets per must-have/responsibility; None sends the full profile.
+    retrieval_top_k: int | None = 3
+    # Writer issues the resume and cover letter as two concurrent calls, retrying only a failed part.
+    parallel_writer: bool = False
+    # Validate the single-call writer reply while it streams and re-prompt as soon as it cannot pass.
+    stream_validation: bool = True
+
+    def stage_timeout(self, stage: str) -> float | None:
+        return getattr(self, f"{stage}_timeout", None)
 
 
 @dataclass
@@ -15,7 +39,17 @@ class ValidationConfig:
     max_words: int = 1500
 
 
+@dataclass
+class FitConfig:
+    # Postings scoring below min_score skip the LLM stages; None scores without gating.
+    min_score: float | None = None
+    # "reject" drops low-fit postings; "defer" sets them aside to be tailored later.
+    action: str = "reject"
+    coverage_weight: float = 0.6
+    seniority_weight: float = 0.2
+    title_weight: float = 0.2
+
+
 @dataclass
 class ExportConfig:
     default_format: str = "md"
-
@@ -1,20 +1,220 @@
+"""
+Logging for the pipeline.
+
+Loggers from get_logger hand records to a queue and return immediately; a background
+listener thread formats them (plain text by default; the API and serve.py switch to JSON)
+and writes them out, so request threads
+never contend on the stream lock. Records carry the run/stage ids of the current context
+(see log_context). Per-level sampling drops hot-path records before they are queued, and
+PII is redacted by precompiled patterns once per record in the listener thread.
+
+Environment: SWIFT_LOG_FORMAT=text|json, SWIFT_LOG_LEVEL=INFO, SWIFT_LOG_SAMPLE="info=0.1,debug=0.01".
+"""
+import atexit
+import contextvars
+import itertools
+import json
 import logging
-from typing import Optional
+import os
+import queue
+import re
+import sys
+import threading
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+from typing import Iterator, Optional, TextIO
 
+_RUN_ID: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("swift_run_id", default=None)
+_STAGE: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("swift_stage", default=None)
+
+_REDACT_TABLE = str.maketrans({"@": "[at]", ".": "[dot]"})
+_PII_PATTERNS = (
+    (re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+"), "[email]"),
+    (re.compile(r"(?<![\w+])(?:\+\d{1,3}[\s.-]?)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}(?!\w)"), "[phone]"),
+)
+_TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s - %(message)s"
+
+_lock = threading.Lock()
+_listeners: dict[str, QueueListener] = {}
+# Arguments each logger was configured with, so forked children can build their own listener.
+_configs: dict[str, dict] = {}
+
+
+@contextmanager
+def log_context(run_id: str | None = None, stage: str | None = None) -> Iterator[None]:
+    """Tag records logged inside the block with a run id and/or stage name."""
+    tokens = []
+    if run_id is not None:
+        tokens.append((_RUN_ID, _RUN_ID.set(run_id)))
+    if stage is not None:
+        tokens.append((_STAGE, _STAGE.set(stage)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def redact_pii(text: str) -> str:
+    """Replace email addresses and phone numbers with placeholders."""
+    for pattern, placeholder in _PII_PATTERNS:
+        text = pattern.sub(placeholder, text)
+    return text
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps one in every 1/rate records per level (deterministic, no RNG on the hot path).
+    Levels without a rate, and WARNING and above, are always kept.
+    """
+
+    def __init__(self, rates: dict[int, float] | None = None):
+        super().__init__()
+        # 0 drops every record of the level; rates of 1 or more keep everything.
+        self.every = {level: 0 if rate <= 0 else round(1 / rate) for level, rate in (rates or {}).items() if rate < 1}
+        self.dropped = {level: 0 for level in self.every}
+        self._counters = {level: itertools.count() for level in self.every}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        every = self.every.get(record.levelno)
+        if every is None or record.levelno >= logging.WARNING:
+            return True
+        if every and next(self._counters[record.levelno]) % every == 0:
+            return True
+        self.dropped[record.levelno] += 1
+        return False
+
+
+class _ContextQueueHandler(QueueHandler):
+    """Captures the caller's context and renders the message once, leaving formatting to the listener."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.run_id = _RUN_ID.get()
+        record.stage = _STAGE.get()
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def __init__(self, redact: bool = True):
+        super().__init__()
+        self.redact = redact
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        payload = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": redact_pii(message) if self.redact else message,
+            "run_id": getattr(record, "run_id", None),
+            "stage": getattr(record, "stage", None),
+        }
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class _RedactingTextFormatter(logging.Formatter):
+    def __init__(self, redact: bool = True):
+        super().__init__(_TEXT_FORMAT)
+        self.redact = redact
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        return redact_pii(text) if self.redact else text
+
+
+def _parse_rates(spec: str) -> dict[int, float]:
+    rates = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, value = part.partition("=")
+        level = logging.getLevelName(name.strip().upper())
+        if isinstance(level, int) and value:
+            rates[level] = float(value)
+    return rates
+
+
+def configure_logging(
+    level: int | str | None = None,
+    fmt: str | None = None,
+    sample_rates: dict[int, float] | None = None,
+    stream: TextIO | None = None,
+    redact: bool = True,
+    name: str = "swift",
+) -> logging.Logger:
+    """(Re)configure the queue-backed handler of logger `name`; defaults come from the environment."""
+    level = level or os.environ.get("SWIFT_LOG_LEVEL", "INFO")
+    fmt = fmt or os.environ.get("SWIFT_LOG_FORMAT", "text")
+    if sample_rates is None:
+        sample_rates = _parse_rates(os.environ.get("SWIFT_LOG_SAMPLE", ""))
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter(redact) if fmt == "json" else _RedactingTextFormatter(redact))
+    # A joinable queue: the listener marks each record done, so flush_logs can wait for it.
+    records: queue.Queue = queue.Queue()
+    handler = _ContextQueueHandler(records)
+    handler.addFilter(SamplingFilter(sample_rates))
 
-def get_logger(name: str = "swift") -> logging.Logger:
     logger = logging.getLogger(name)
-    if not logger.handlers:
-        handler = logging.StreamHandler()
-        fmt = logging.Formatter("%(asctime)s %(levelname)s %(name)s - %(message)s")
-        handler.setFormatter(fmt)
+    with _lock:
+        previous = _listeners.pop(name, None)
+        if previous is not None:
+            previous.stop()
+        for old in [h for h in logger.handlers if isinstance(h, QueueHandler)]:
+            logger.removeHandler(old)
         logger.addHandler(handler)
-    logger.setLevel(logging.INFO)
+        logger.setLevel(level)
+        listener = QueueListener(records, output)
+        listener.start()
+        _listeners[name] = listener
+        _configs[name] = dict(level=level, fmt=fmt, sample_rates=sample_rates, stream=stream, redact=redact)
     return logger
 
 
+def flush_logs() -> None:
+    """Block until every record queued so far has been written out."""
+    with _lock:
+        listeners = list(_listeners.values())
+    for listener in listeners:
+        listener.queue.join()
+
+
+def _stop_listeners() -> None:
+    with _lock:
+        for listener in _listeners.values():
+            listener.stop()
+        _listeners.clear()
+
+
+def _reconfigure_after_fork() -> None:
+    # Listener threads do not survive fork(), and the inherited queues may hold the parent's
+    # unwritten records: each forked worker gets a fresh queue, handler and listener.
+    global _lock
+    _lock = threading.Lock()
+    _listeners.clear()
+    for name, config in list(_configs.items()):
+        configure_logging(name=name, **config)
+
+
+atexit.register(_stop_listeners)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reconfigure_after_fork)
+
+
+def get_logger(name: str = "swift") -> logging.Logger:
+    root = name.split(".", 1)[0]
+    if root not in _listeners:
+        configure_logging(name=root)
+    return logging.getLogger(name)
+
+
 def redact(text: str, enabled: bool = True) -> str:
     if not enabled:
         return text
-    # Very lightweight redaction: replace email-like patterns
-    return text.replace("@", "[at]").replace(".", "[dot]")
+    # Very lightweight redaction: replace email-like patterns (single pass)
+    return text.translate(_REDACT_TABLE)
@@ -0,0 +1,192 @@
+"""
+Profiling hooks.
+
+Stages of a run are wrapped in `timed(stage)`. Outside `collect_timings()` that is a single
+contextvar lookup; inside it, each stage's wall time and CPU time (of the thread running it)
+are added to a StageTimings, with LLM calls recorded as a `<stage>.llm` sub-stage so waits on
+the model can be told apart from local work (parsing, validation, rendering).
+
+`profile_run(prefix)` is the CLI's full profiler: cProfile (`<prefix>.prof`, readable with
+pstats/snakeviz) of the calling thread, plus a stack sampler of every thread writing
+`<prefix>.collapsed` in the collapsed-stack format of flamegraph.pl / speedscope.
+"""
+import contextvars
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, TextIO
+
+_TIMINGS: contextvars.ContextVar[Optional["StageTimings"]] = contextvars.ContextVar("swift_timings", default=None)
+_CURRENT: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("swift_timed_stage", default=None)
+
+
+class StageTimings:
+    """Wall/CPU seconds per stage for one run; safe to update from the threads of that run."""
+
+    def __init__(self):
+        self.stages: dict[str, list[float]] = {}  # name -> [wall, cpu, calls]
+        self._lock = threading.Lock()
+        self._wall = time.perf_counter()
+        self._cpu = time.thread_time()
+        self.wall = 0.0
+        self.cpu = 0.0
+
+    def add(self, name: str, wall: float, cpu: float = 0.0) -> None:
+        with self._lock:
+            entry = self.stages.setdefault(name, [0.0, 0.0, 0])
+            entry[0] += wall
+            entry[1] += cpu
+            entry[2] += 1
+
+    def stop(self) -> None:
+        self.wall = time.perf_counter() - self._wall
+        self.cpu = time.thread_time() - self._cpu
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            stages = {
+                name: {"wall_ms": round(wall * 1000, 2), "cpu_ms": round(cpu * 1000, 2), "calls": calls}
+                for name, (wall, cpu, calls) in self.stages.items()
+            }
+        return {
+            "total": {"wall_ms": round(self.wall * 1000, 2), "cpu_ms": round(self.cpu * 1000, 2)},
+            "stages": stages,
+        }
+
+    def summary(self) -> str:
+        data = self.as_dict()
+        lines = [f"{'stage':<24}{'wall ms':>12}{'cpu ms':>12}{'calls':>7}"]
+        for name, row in data["stages"].items():
+            lines.append(f"{name:<24}{row['wall_ms']:>12.1f}{row['cpu_ms']:>12.1f}{row['calls']:>7}")
+        total = data["total"]
+        lines.append(f"{'total':<24}{total['wall_ms']:>12.1f}{total['cpu_ms']:>12.1f}")
+        return "\n".join(lines)
+
+
+@contextmanager
+def collect_timings() -> Iterator[StageTimings]:
+    """Record the timed stages run inside the block (in this context and contexts copied from it)."""
+    timings = StageTimings()
+    token = _TIMINGS.set(timings)
+    try:
+        yield timings
+    finally:
+        _TIMINGS.reset(token)
+        timings.stop()
+
+
+def _qualified(name: str) -> str:
+    parent = _CURRENT.get()
+    return f"{parent}.{name}" if parent else name
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """Time the block as stage `name` (nested under the enclosing timed stage, if any)."""
+    timings = _TIMINGS.get()
+    if timings is None:
+        yield
+        return
+    qualified = _qualified(name)
+    token = _CURRENT.set(qualified)
+    wall, cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        timings.add(qualified, time.perf_counter() - wall, time.thread_time() - cpu)
+        _CURRENT.reset(token)
+
+
+def record(name: str, wall: float, cpu: float = 0.0) -> None:
+    """Add time measured by the caller, e.g. a streamed reply that cannot sit in a `with` block."""
+    timings = _TIMINGS.get()
+    if timings is not None:
+        timings.add(_qualified(name), wall, cpu)
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Samples thread stacks every `interval` seconds and counts the collapsed stacks, each rooted
+    at its thread's name. Every thread but the sampler's own is sampled (worker pools and LLM
+    call threads included), unless `thread_id` limits it to one.
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: int | None = None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.counts: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "StackSampler":
+        self._thread = threading.Thread(target=self._run, name="swift-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            if self.thread_id is not None:
+                frames = {self.thread_id: frames[self.thread_id]} if self.thread_id in frames else {}
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                if labels:
+                    labels.append(names.get(ident, f"thread-{ident}"))
+                    self.counts[";".join(reversed(labels))] += 1
+
+    def write_collapsed(self, path: str | Path) -> Path:
+        path = Path(path)
+        with path.open("w", encoding="utf-8") as fh:
+            for stack, count in self.counts.most_common():
+                fh.write(f"{stack} {count}\n")
+        return path
+
+
+@contextmanager
+def profile_run(prefix: str, interval: float = 0.005, top: int = 25, out: TextIO | None = None) -> Iterator[StageTimings]:
+    """
+    Profile the block with cProfile (calling thread only) and the stack sampler (all threads),
+    then write `<prefix>.prof` and `<prefix>.collapsed` and print the top functions and the
+    per-stage timings to `out`.
+    """
+    import cProfile
+    import pstats
+
+    out = out or sys.stderr
+    profiler = cProfile.Profile()
+    sampler = StackSampler(interval).start()
+    timings = StageTimings()
+    token = _TIMINGS.set(timings)
+    profiler.enable()
+    try:
+        yield timings
+    finally:
+        # Written even when the run fails or exits early, which is often when it is wanted.
+        profiler.disable()
+        sampler.stop()
+        _TIMINGS.reset(token)
+        timings.stop()
+        profiler.dump_stats(f"{prefix}.prof")
+        sampler.write_collapsed(f"{prefix}.collapsed")
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(top)
+        print(timings.summary(), file=out)
+        print(f"Profile written to {prefix}.prof and {prefix}.collapsed", file=out)
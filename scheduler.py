@@ -0,0 +1,184 @@
+"""
+Multi-tenant fair scheduling of LLM calls.
+
+Every LLM call acquires a slot from the installed FairScheduler before it is sent. Waiting
+calls are queued per tenant and per priority class: interactive calls are always served
+before batch calls, and tenants within a class share slots by deficit round-robin
+(weighted by tenant). Per-tenant caps stop one tenant's batch from holding every slot.
+The tenant and priority of the current request travel in contextvars, so agents need no
+extra arguments.
+"""
+import contextvars
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITIES = (INTERACTIVE, BATCH)  # served in this order
+
+_TENANT: contextvars.ContextVar[str] = contextvars.ContextVar("swift_tenant", default="default")
+_PRIORITY: contextvars.ContextVar[str] = contextvars.ContextVar("swift_priority", default=INTERACTIVE)
+
+_ACTIVE: Optional["FairScheduler"] = None
+
+
+def current_tenant() -> tuple[str, str]:
+    return _TENANT.get(), _PRIORITY.get()
+
+
+@contextmanager
+def tenant_context(tenant: str, priority: str = INTERACTIVE) -> Iterator[None]:
+    """Attribute LLM calls made inside the block (in this thread/context) to `tenant`."""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority class: {priority}")
+    tenant_token = _TENANT.set(tenant)
+    priority_token = _PRIORITY.set(priority)
+    try:
+        yield
+    finally:
+        _PRIORITY.reset(priority_token)
+        _TENANT.reset(tenant_token)
+
+
+def install(scheduler: Optional["FairScheduler"]) -> None:
+    """Route every LLMClientWrapper call through `scheduler` (None removes it)."""
+    global _ACTIVE
+    _ACTIVE = scheduler
+
+
+def active_scheduler() -> Optional["FairScheduler"]:
+    return _ACTIVE
+
+
+class _Waiter:
+    __slots__ = ("tenant", "cost", "granted")
+
+    def __init__(self, tenant: str, cost: float):
+        self.tenant = tenant
+        self.cost = cost
+        self.granted = False
+
+
+class FairScheduler:
+    """
+    Grants up to `capacity` concurrent LLM calls, at most `per_tenant_limit` per tenant.
+    `weights` scales a tenant's share within its priority class (default 1.0), and batch
+    calls never take the last `interactive_reserve` slots.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 8,
+        per_tenant_limit: int | None = 4,
+        weights: dict[str, float] | None = None,
+        quantum: float = 1.0,
+        interactive_reserve: int = 1,
+    ):
+        if any(weight <= 0 for weight in (weights or {}).values()):
+            raise ValueError("Tenant weights must be positive.")
+        if quantum <= 0:
+            # Deficits would never grow, so no waiting call could ever be granted.
+            raise ValueError("quantum must be positive.")
+        self.capacity = capacity
+        self.per_tenant_limit = per_tenant_limit
+        self.weights = dict(weights or {})
+        self.quantum = quantum
+        self.interactive_reserve = min(interactive_reserve, capacity - 1)
+        self._cond = threading.Condition()
+        self._active = 0
+        self._running: dict[str, int] = {}
+        self._deficit: dict[str, float] = {}
+        # Per priority class: tenants with waiting calls, in round-robin order.
+        self._queues: dict[str, OrderedDict[str, deque[_Waiter]]] = {p: OrderedDict() for p in PRIORITIES}
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "active": self._active,
+                "running": {t: n for t, n in self._running.items() if n},
+                "waiting": {p: {t: len(q) for t, q in queues.items()} for p, queues in self._queues.items()},
+            }
+
+    @contextmanager
+    def slot(self, timeout: float | None = None, cost: float = 1.0) -> Iterator[None]:
+        """Hold one call slot for the current tenant; raises TimeoutError if none frees up in time."""
+        tenant, priority = current_tenant()
+        self.acquire(tenant, priority, timeout=timeout, cost=cost)
+        try:
+            yield
+        finally:
+            self.release(tenant)
+
+    def acquire(self, tenant: str, priority: str = INTERACTIVE, timeout: float | None = None, cost: float = 1.0) -> None:
+        waiter = _Waiter(tenant, cost)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._queues[priority].setdefault(tenant, deque()).append(waiter)
+            self._dispatch()
+            while not waiter.granted:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._withdraw(priority, waiter)
+                    raise TimeoutError(f"No LLM slot for tenant {tenant} within {timeout:.1f}s")
+                self._cond.wait(remaining)
+
+    def release(self, tenant: str) -> None:
+        with self._cond:
+            self._active -= 1
+            self._running[tenant] -= 1
+            self._dispatch()
+
+    def _withdraw(self, priority: str, waiter: _Waiter) -> None:
+        queue = self._queues[priority].get(waiter.tenant)
+        if queue is None:
+            return
+        queue.remove(waiter)
+        if not queue:
+            del self._queues[priority][waiter.tenant]
+            self._deficit.pop(waiter.tenant, None)
+
+    def _capped(self, tenant: str) -> bool:
+        return self.per_tenant_limit is not None and self._running.get(tenant, 0) >= self.per_tenant_limit
+
+    def _next(self) -> _Waiter | None:
+        """Deficit round-robin over the first priority class that has an eligible tenant."""
+        for priority in PRIORITIES:
+            ring = self._queues[priority]
+            if priority == BATCH and self._active >= self.capacity - self.interactive_reserve:
+                continue
+            if not any(not self._capped(tenant) for tenant in ring):
+                continue
+            while True:
+                tenant, queue = next(iter(ring.items()))
+                if self._capped(tenant):
+                    ring.move_to_end(tenant)
+                    continue
+                head = queue[0]
+                deficit = self._deficit.get(tenant, 0.0)
+                if deficit < head.cost:
+                    self._deficit[tenant] = deficit + self.quantum * self.weights.get(tenant, 1.0)
+                    ring.move_to_end(tenant)
+                    continue
+                self._deficit[tenant] = deficit - head.cost
+                queue.popleft()
+                if not queue:
+                    del ring[tenant]
+                    self._deficit.pop(tenant, None)
+                return head
+        return None
+
+    def _dispatch(self) -> None:
+        granted = False
+        while self._active < self.capacity:
+            waiter = self._next()
+            if waiter is None:
+                break
+            waiter.granted = True
+            self._active += 1
+            self._running[waiter.tenant] = self._running.get(waiter.tenant, 0) + 1
+            granted = True
+        if granted:
+            self._cond.notify_all()
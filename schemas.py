@@ -18,6 +18,14 @@ class JobRequirements(BaseModel):
     responsibilities: List[str]
     location: Optional[str] = None
 
+class FitScore(BaseModel):
+    score: float
+    must_have_coverage: float
+    seniority: float
+    title_similarity: float
+    missing: List[str] = Field(default_factory=list)
+    reason: str = ""
+
 class StrategyPlan(BaseModel):
     gaps: List[str]
     positioning: List[str]
@@ -0,0 +1,139 @@
+"""
+Pre-fork production server for the FastAPI app.
+Run with: python serve.py --workers 4 --host 0.0.0.0 --port 8000
+
+The master process imports the app, agents and optional dependencies once, then forks
+workers that share those pages copy-on-write. Each worker builds its own model clients
+(they hold sockets and threads, so they must not cross a fork) before accepting traffic;
+building a client opens no connection, so `--warm-connect` also makes one cheap call per model.
+Crashed workers are restarted; SIGTERM/SIGINT shut all workers down.
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+from logger import configure_logging, get_logger
+
+logger = get_logger("swift.serve")
+
+
+def preload():
+    """Import everything workers need so forked children start with warm module state."""
+    import uvicorn  # noqa: F401
+
+    import api  # noqa: F401 - builds the FastAPI app and loads .env
+    from agents.llm_utils import load_genai
+    from tools.file_export_tool import _load_docx, _load_fpdf
+    from tools.resume_parsing_util import _load_pypdf2
+
+    load_genai()
+    _load_fpdf()
+    _load_docx()
+    _load_pypdf2()
+    # Move preloaded objects out of the collector's generations so GC in workers
+    # does not touch (and copy) the shared pages.
+    gc.freeze()
+
+
+def _bind(host: str, port: int, backlog: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(sock: socket.socket, args: argparse.Namespace) -> None:
+    import uvicorn
+
+    import api
+
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    warmed = api.warmup(connect=args.warm_connect)
+    logger.info("Worker %s warmed stages: %s", os.getpid(), ", ".join(warmed) or "none")
+    config = uvicorn.Config(
+        api.app,
+        log_level=args.log_level,
+        timeout_keep_alive=args.keep_alive,
+        limit_concurrency=args.limit_concurrency,
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _spawn(sock: socket.socket, args: argparse.Namespace) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            _run_worker(sock, args)
+        except BaseException:  # pragma: no cover - logged, then the master restarts us
+            logger.exception("Worker %s crashed", os.getpid())
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the Resume Tailor API with pre-forked workers.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--keep-alive", type=int, default=5, help="Keep-alive timeout (seconds).")
+    parser.add_argument("--limit-concurrency", type=int, default=None, help="Per-worker connection cap.")
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument(
+        "--warm-connect",
+        action="store_true",
+        help="Have each worker make one token-count call per model before taking traffic, "
+        "so the first request does not pay for connect/TLS.",
+    )
+    args = parser.parse_args()
+
+    if not hasattr(os, "fork"):
+        sys.exit("serve.py needs os.fork (POSIX). Use `uvicorn api:app --workers N` on this platform.")
+    configure_logging(fmt=os.environ.get("SWIFT_LOG_FORMAT") or "json")
+
+    sock = _bind(args.host, args.port, args.backlog)
+    preload()
+    workers = {_spawn(sock, args) for _ in range(max(1, args.workers))}
+    logger.info("Master %s serving on %s:%s with %s workers", os.getpid(), args.host, args.port, len(workers))
+
+    stopping = False
+
+    def _stop(signum, _frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:  # pragma: no cover - retried by PEP 475 on modern Pythons
+            continue
+        workers.discard(pid)
+        if not stopping:
+            logger.warning("Worker %s exited (status %s); restarting", pid, status)
+            time.sleep(1.0)  # avoid a tight fork loop when workers crash on startup
+            workers.add(_spawn(sock, args))
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Per-session memoization for chat front ends (adk_app.py).
+
+A chat session usually tries several postings against one CV, or asks for edits of the last
+draft. TailorSession keeps the parsed profile, the requirements analyzed per posting and
+the last RunState, so follow-up turns run only the stages their change needs:
+
+- same CV, new posting: resume parsing is skipped (and JD analysis, for a posting seen before)
+- edited CV: SwiftOrchestratorAgent.rerun re-runs only the stages the edit affects
+- same CV and posting: the last result is returned as is (no stages run)
+- "make it shorter": an editor pass over the last draft (SwiftOrchestratorAgent.shorten)
+
+Offline and online runs of one chat give different drafts, so SessionStore keeps a separate
+TailorSession per (session id, mode) and a follow-up turn only reuses results of its own mode.
+
+SessionStore bounds memory: sessions idle for longer than `ttl` are dropped, and the least
+recently used ones go once there are more than `max_sessions`.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Callable
+
+from agents.orchestrator import RunState, SwiftOrchestratorAgent
+from schemas import CandidateProfile, JobRequirements
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass
+class TailorSession:
+    session_id: str
+    max_jds: int = 16
+    mode: str = "online"
+    profile: CandidateProfile | None = None
+    resume_digest: str | None = None
+    last: RunState | None = None
+    # Analyzed requirements per posting text, most recently used last.
+    jds: OrderedDict[str, JobRequirements] = field(default_factory=OrderedDict)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def cached_jd(self, jd_text: str) -> JobRequirements | None:
+        jd = self.jds.get(jd_text)
+        if jd is not None:
+            self.jds.move_to_end(jd_text)
+        return jd
+
+    def remember(self, state: RunState, resume_digest: str) -> None:
+        self.profile = state.profile
+        self.resume_digest = resume_digest
+        self.last = state
+        self.jds[state.jd_text] = state.jd
+        self.jds.move_to_end(state.jd_text)
+        while len(self.jds) > self.max_jds:
+            self.jds.popitem(last=False)
+
+    def tailor(self, orchestrator: SwiftOrchestratorAgent, resume_path: str | None, jd_text: str) -> RunState:
+        """
+        Tailor `resume_path` to `jd_text`, reusing whatever this session already computed.
+        With no `resume_path`, the session's resume is used (LookupError if there is none).
+        """
+        with self.lock:
+            if resume_path is None:
+                if self.profile is None:
+                    raise LookupError("No resume in this session yet")
+                digest = self.resume_digest
+            else:
+                digest = _file_digest(resume_path)
+            if self.last is not None and digest == self.resume_digest and jd_text == self.last.jd_text:
+                state = replace(self.last, stages_run=[])
+            elif self.last is not None and digest != self.resume_digest:
+                state = orchestrator.rerun(resume_path, jd_text, self.last)
+            elif self.profile is not None:
+                state = orchestrator.run_state(None, jd_text, profile=self.profile, jd=self.cached_jd(jd_text))
+            else:
+                state = orchestrator.run_state(resume_path, jd_text)
+            self.remember(state, digest)
+            return state
+
+    def shorten(self, orchestrator: SwiftOrchestratorAgent, max_words: int | None = None) -> RunState:
+        """Shorten the last draft of this session; raises LookupError when nothing was tailored yet."""
+        with self.lock:
+            if self.last is None:
+                raise LookupError("Nothing tailored in this session yet")
+            self.last = orchestrator.shorten(self.last, max_words=max_words)
+            return self.last
+
+
+class SessionStore:
+    """Bounded map of (session id, mode) -> TailorSession with idle expiry and LRU eviction."""
+
+    def __init__(
+        self,
+        max_sessions: int = 256,
+        ttl: float | None = 3600.0,
+        max_jds: int = 16,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_jds = max_jds
+        self._clock = clock
+        self._sessions: OrderedDict[tuple[str, str], tuple[TailorSession, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str, mode: str = "online") -> TailorSession:
+        now = self._clock()
+        key = (session_id, mode)
+        with self._lock:
+            self._expire(now)
+            entry = self._sessions.pop(key, None)
+            session = entry[0] if entry is not None else TailorSession(session_id, max_jds=self.max_jds, mode=mode)
+            self._sessions[key] = (session, now)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return session
+
+    def drop(self, session_id: str) -> None:
+        """Forget every mode of `session_id`."""
+        with self._lock:
+            for key in [key for key in self._sessions if key[0] == session_id]:
+                del self._sessions[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def _expire(self, now: float) -> None:
+        if self.ttl is None:
+            return
+        # Entries are kept in order of last use, so expired ones are at the front.
+        while self._sessions:
+            _, (_, touched) = next(iter(self._sessions.items()))
+            if now - touched <= self.ttl:
+                break
+            self._sessions.popitem(last=False)
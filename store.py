@@ -0,0 +1,199 @@
+"""
+Local SQLite store for pipeline artifacts.
+
+Every stage result (profile, JD analysis, strategy, drafts) is saved under a hash of the
+stage's inputs, so the orchestrator can skip stages whose inputs have not changed. Each
+run is also recorded with indexed columns for analytics across past runs, and the text of
+each analyzed posting is kept so JD dedupe indexes can be rebuilt from the store.
+"""
+import hashlib
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    stage TEXT NOT NULL,
+    input_hash TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    run_id TEXT,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (stage, input_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_artifacts_run ON artifacts(run_id);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    resume_hash TEXT,
+    jd_hash TEXT,
+    title TEXT,
+    company TEXT,
+    passes INTEGER,
+    duration REAL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_created ON runs(created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_company ON runs(company, created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_title ON runs(title, created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_resume ON runs(resume_hash);
+CREATE TABLE IF NOT EXISTS postings (
+    input_hash TEXT PRIMARY KEY,
+    text TEXT NOT NULL
+);
+"""
+
+
+def input_hash(*parts: Any) -> str:
+    """Stable hash of stage inputs; pydantic models hash by their JSON form."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, BaseModel):
+            part = part.model_dump_json()
+        elif isinstance(part, bytes):
+            digest.update(part)
+            digest.update(b"\0")
+            continue
+        digest.update(repr(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ResultStore:
+    """SQLite (WAL mode) artifact store with a small pool of shared connections."""
+
+    def __init__(self, path: str = "swift_results.db", pool_size: int = 4, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._pool: queue.Queue[sqlite3.Connection] = queue.Queue(maxsize=pool_size)
+        self._created = 0
+        self._pool_size = pool_size
+        self._lock = threading.Lock()
+        with self.connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self._pool_size
+                if can_create:
+                    self._created += 1
+            conn = self._connect() if can_create else self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def get(self, stage: str, key: str, model: Type[ModelT]) -> Optional[ModelT]:
+        with self.connection() as conn:
+            row = conn.execute(
+                "SELECT payload FROM artifacts WHERE stage = ? AND input_hash = ?", (stage, key)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return model.model_validate_json(row["payload"])
+        except ValueError:
+            return None
+
+    def put(self, stage: str, key: str, artifact: BaseModel, run_id: str | None = None) -> None:
+        with self.connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO artifacts (stage, input_hash, payload, run_id, created_at) VALUES (?, ?, ?, ?, ?)",
+                (stage, key, artifact.model_dump_json(), run_id, time.time()),
+            )
+
+    def put_posting(self, key: str, text: str) -> None:
+        """Keep the text of the posting whose "jd" artifact is stored under `key`."""
+        with self.connection() as conn:
+            conn.execute("INSERT OR IGNORE INTO postings (input_hash, text) VALUES (?, ?)", (key, text))
+
+    def postings(self, model: Type[ModelT], limit: int | None = None) -> list[tuple[str, str, ModelT]]:
+        """(key, posting text, stored "jd" artifact) of the newest `limit` analyzed postings, oldest first."""
+        with self.connection() as conn:
+            rows = conn.execute(
+                "SELECT * FROM ("
+                " SELECT a.input_hash AS key, p.text AS text, a.payload AS payload, a.created_at AS created_at"
+                " FROM artifacts a JOIN postings p ON p.input_hash = a.input_hash"
+                " WHERE a.stage = 'jd' ORDER BY a.created_at DESC LIMIT ?"
+                ") ORDER BY created_at",
+                (-1 if limit is None else limit,),
+            ).fetchall()
+        postings = []
+        for row in rows:
+            try:
+                postings.append((row["key"], row["text"], model.model_validate_json(row["payload"])))
+            except ValueError:
+                continue
+        return postings
+
+    def record_run(
+        self,
+        run_id: str,
+        resume_hash: str,
+        jd_hash: str,
+        title: str | None = None,
+        company: str | None = None,
+        passes: bool | None = None,
+        duration: float | None = None,
+    ) -> None:
+        with self.connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO runs (run_id, created_at, resume_hash, jd_hash, title, company, passes, duration) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, time.time(), resume_hash, jd_hash, title, company, None if passes is None else int(passes), duration),
+            )
+
+    def query_runs(
+        self,
+        company: str | None = None,
+        title: str | None = None,
+        resume_hash: str | None = None,
+        since: float | None = None,
+        limit: int = 100,
+    ) -> list[dict]:
+        """Past runs, newest first, filtered on the indexed columns."""
+        clauses, params = [], []
+        for column, value in (("company", company), ("title", title), ("resume_hash", resume_hash)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self.connection() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM runs {where} ORDER BY created_at DESC LIMIT ?", (*params, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def pass_rate_by_company(self, since: float | None = None) -> dict[str, float]:
+        where, params = ("WHERE created_at >= ?", (since,)) if since is not None else ("", ())
+        with self.connection() as conn:
+            rows = conn.execute(
+                f"SELECT company, AVG(passes) AS rate FROM runs {where} GROUP BY company", params
+            ).fetchall()
+        return {row["company"]: row["rate"] for row in rows}
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
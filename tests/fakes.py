@@ -0,0 +1,35 @@
+"""Fake model clients shared by the test modules."""
+import threading
+import time
+
+
+class StubResponse:
+    """The part of a Gemini response (or streamed chunk) the agents read."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class StubLLM:
+    """
+    Answers every prompt with `text` after `delay` seconds, counting the calls and keeping the
+    prompts. With `fail_empty`, an empty `text` raises instead, like an unavailable model.
+    """
+
+    def __init__(self, text: str = "", delay: float = 0.0, fail_empty: bool = False):
+        self.text = text
+        self.delay = delay
+        self.fail_empty = fail_empty
+        self.calls = 0
+        self.prompts: list[str] = []
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt: str):
+        with self._lock:
+            self.calls += 1
+            self.prompts.append(prompt)
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail_empty and not self.text:
+            raise RuntimeError("model unavailable")
+        return StubResponse(self.text)
@@ -0,0 +1,91 @@
+import tracemalloc
+import unittest
+
+from compact import CompactProfile, CompactRequirements, SkillVocab, rank_profiles, skill_coverage
+from schemas import CandidateProfile, JobRequirements
+
+PROFILE = CandidateProfile(
+    name="Zoë Doe",
+    contact="zoe@example.com",
+    summary="ML engineer",
+    skills=["Python", "PyTorch", "SQL"],
+    experience=["ML Engineer at Initech"],
+    education=["BS CS"],
+)
+JD = JobRequirements(
+    title="ML Engineer",
+    company="Acme",
+    must_haves=["python", "NLP"],
+    nice_to_haves=["sql"],
+    responsibilities=["Build models"],
+    location="Remote",
+)
+
+
+def _profile(i: int, skills: list[str]) -> CandidateProfile:
+    return CandidateProfile(
+        name=f"Candidate {i}",
+        contact=f"c{i}@example.com",
+        summary="Engineer",
+        skills=skills,
+        experience=["Engineer at Initech"],
+        education=["BS CS"],
+    )
+
+
+class CompactModelTests(unittest.TestCase):
+    def test_round_trip_and_json_match_pydantic(self):
+        vocab = SkillVocab()
+        profile = CompactProfile.from_model(PROFILE, vocab)
+        jd = CompactRequirements.from_model(JD, vocab)
+        self.assertEqual(profile.to_model(vocab), PROFILE)
+        self.assertEqual(jd.to_model(vocab), JD)
+        self.assertEqual(profile.to_json(vocab), PROFILE.model_dump_json())
+        self.assertEqual(jd.to_json(vocab), JD.model_dump_json())
+        self.assertIs(profile.to_json(vocab), profile.to_json(vocab))
+
+    def test_skills_are_interned_and_matched_case_insensitively(self):
+        vocab = SkillVocab()
+        first = CompactProfile.from_model(PROFILE, vocab)
+        second = CompactProfile.from_model(PROFILE, vocab)
+        self.assertEqual(list(first.skills), list(second.skills))
+        jd = CompactRequirements.from_model(JD, vocab)
+        # "python" matches "Python"; "NLP" is missing; "sql" nice-to-have matches "SQL".
+        self.assertAlmostEqual(skill_coverage(first, jd, vocab), (0.5 + 0.25) / 1.25)
+
+    def test_rank_profiles_keeps_best_first(self):
+        vocab = SkillVocab()
+        jd = CompactRequirements.from_model(JD, vocab)
+        profiles = [
+            CompactProfile.from_model(_profile(0, ["Go"]), vocab),
+            CompactProfile.from_model(_profile(1, ["Python", "NLP", "SQL"]), vocab),
+            CompactProfile.from_model(_profile(2, ["Python"]), vocab),
+        ]
+        ranked = rank_profiles(profiles, jd, top_n=2, vocab=vocab)
+        self.assertEqual([i for _, i in ranked], [1, 2])
+        self.assertEqual(ranked[0][0], 1.0)
+
+    def test_bulk_profiles_use_less_memory_than_models(self):
+        skills = [f"Skill {i}" for i in range(200)]
+
+        def _models():
+            return [_profile(i, skills[i % 190 : i % 190 + 10]) for i in range(2000)]
+
+        vocab = SkillVocab()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            models = _models()
+            model_bytes = tracemalloc.get_traced_memory()[0] - before
+            del models
+            before = tracemalloc.get_traced_memory()[0]
+            compact = [CompactProfile.from_model(m, vocab) for m in _models()]
+            compact_bytes = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(len(compact), 2000)
+        self.assertLess(compact_bytes, model_bytes * 0.6)
+
+
+if __name__ == "__main__":
+    unittest.main()
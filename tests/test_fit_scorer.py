@@ -0,0 +1,93 @@
+import json
+import os
+import tempfile
+import unittest
+
+from agents.fit_scorer import FitScorerAgent, LowFitPosting
+from agents.jd_analyzer import JDAnalyzerAgent
+from agents.orchestrator import SwiftOrchestratorAgent
+from agents.resume_jd_matcher import ResumeJDMatcherAgent
+from agents.swift_editor import SwiftEditorAgent
+from agents.swift_writer import SwiftWriterAgent
+from config import FitConfig
+from fakes import StubLLM
+from schemas import CandidateProfile, JobRequirements
+from tools.job_ingest import ingest_and_tailor
+
+PROFILE = CandidateProfile(
+    name="Jane Doe",
+    contact="jane@example.com",
+    summary="ML engineer with 4 years of experience in NLP",
+    skills=["Python", "PyTorch", "SQL", "NLP"],
+    experience=["Machine Learning Engineer at Initech", "Data Analyst at Globex"],
+    education=["BS CS"],
+)
+
+
+def _jd(title: str, must_haves: list[str]) -> JobRequirements:
+    return JobRequirements(title=title, company="Acme", must_haves=must_haves, nice_to_haves=[], responsibilities=[])
+
+
+class FitScorerTests(unittest.TestCase):
+    def test_good_fit_scores_high(self):
+        fit = FitScorerAgent().run(PROFILE, _jd("Machine Learning Engineer", ["Python", "PyTorch", "SQL"]))
+        self.assertEqual(fit.must_have_coverage, 1.0)
+        self.assertEqual(fit.title_similarity, 1.0)
+        self.assertGreater(fit.score, 0.9)
+
+    def test_poor_fit_scores_low_with_reason(self):
+        fit = FitScorerAgent().run(PROFILE, _jd("Director of Pastry", ["French pastry", "10+ years kitchen management"]))
+        self.assertEqual(fit.must_have_coverage, 0.0)
+        self.assertEqual(fit.seniority, 0.0)
+        self.assertLess(fit.score, 0.2)
+        self.assertIn("missing 2/2 must-haves", fit.reason)
+
+    def test_unknown_signals_do_not_penalize(self):
+        fit = FitScorerAgent().run(PROFILE, _jd("TBD", []))
+        self.assertEqual(fit.score, 1.0)
+
+    def test_orchestrator_rejects_before_llm_stages(self):
+        jd_llm = StubLLM(
+            '{"title":"Pastry Chef","company":"Bakery","must_haves":["French pastry"],"nice_to_haves":[],"responsibilities":[]}'
+        )
+        matcher_llm = StubLLM('{"gaps":[],"positioning":["x"],"rewriting_focus":["y"]}')
+        orchestrator = SwiftOrchestratorAgent(
+            jd_analyzer=JDAnalyzerAgent(llm_client=jd_llm, use_llm=True),
+            matcher=ResumeJDMatcherAgent(llm_client=matcher_llm, use_llm=True),
+            writer=SwiftWriterAgent(use_llm=False),
+            editor=SwiftEditorAgent(use_llm=False),
+            fit_config=FitConfig(min_score=0.5),
+        )
+        with self.assertRaises(LowFitPosting) as ctx:
+            orchestrator.run_state(None, "Pastry chef wanted", profile=PROFILE)
+        self.assertFalse(ctx.exception.deferred)
+        self.assertEqual(matcher_llm.calls, 0)
+
+        state = orchestrator.run_state(None, "Pastry chef wanted", profile=PROFILE, enforce_fit=False)
+        self.assertLess(state.fit.score, 0.5)
+        self.assertEqual(matcher_llm.calls, 1)
+
+    def test_ingest_reports_deferred_postings(self):
+        orchestrator = SwiftOrchestratorAgent(
+            jd_analyzer=JDAnalyzerAgent(use_llm=False),
+            matcher=ResumeJDMatcherAgent(use_llm=False),
+            writer=SwiftWriterAgent(use_llm=False),
+            editor=SwiftEditorAgent(use_llm=False),
+            fit_config=FitConfig(min_score=0.99, action="defer"),
+        )
+        fd, path = tempfile.mkstemp(suffix=".jsonl")
+        os.close(fd)
+        try:
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(json.dumps({"id": "p1", "text": "Senior Staff Engineer. Must have: Python, Rust, Go, Haskell"}) + "\n")
+            results = list(ingest_and_tailor([path], orchestrator, PROFILE))
+        finally:
+            os.remove(path)
+        self.assertEqual(len(results), 1)
+        self.assertTrue(results[0].skipped)
+        self.assertTrue(results[0].deferred)
+        self.assertIsNone(results[0].state)
+
+
+if __name__ == "__main__":
+    unittest.main()
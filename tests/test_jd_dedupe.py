@@ -0,0 +1,126 @@
+import os
+import tempfile
+import time
+import unittest
+
+from agents.jd_analyzer import JDAnalyzerAgent
+from agents.orchestrator import SwiftOrchestratorAgent
+from agents.resume_jd_matcher import ResumeJDMatcherAgent
+from agents.resume_parser import ResumeParserAgent
+from agents.swift_editor import SwiftEditorAgent
+from agents.swift_writer import SwiftWriterAgent
+from fakes import StubLLM
+from store import ResultStore
+from tools.jd_dedupe import JDDedupeIndex
+
+POSTING = (
+    "Senior Machine Learning Engineer at Acme Corp. You will design, train and deploy NLP models "
+    "for search ranking, own feature pipelines in Python and SQL, partner with product managers, "
+    "mentor junior engineers and run experiments at scale. Must have: Python, PyTorch, SQL, 5+ years "
+    "of production ML experience. Nice to have: Kubernetes, Spark. Location: Remote (US)."
+)
+REPOST = POSTING.replace("Acme Corp.", "Acme Corp!").replace("Remote (US)", "Remote (US/Canada)")
+OTHER = (
+    "Pastry chef wanted for a busy downtown bakery. Prepare croissants, tarts and seasonal desserts, "
+    "manage inventory, and train apprentices. Early morning shifts. Must have: 3 years of pastry experience."
+)
+
+
+ANALYSIS = '{"title": "Senior ML Engineer", "company": "Acme", "must_haves": ["Python"]}'
+
+
+class JDDedupeIndexTests(unittest.TestCase):
+    def test_reworded_repost_matches_and_unrelated_does_not(self):
+        index = JDDedupeIndex(threshold=0.7)
+        index.add("a", POSTING, "analysis-a")
+        match = index.find(REPOST)
+        self.assertIsNotNone(match)
+        self.assertEqual(match.value, "analysis-a")
+        self.assertIsNone(index.find(OTHER))
+
+    def test_threshold_is_tunable(self):
+        strict = JDDedupeIndex(threshold=0.99)
+        strict.add("a", POSTING, "analysis-a")
+        self.assertIsNone(strict.find(REPOST))
+        self.assertIsNotNone(strict.find(POSTING))
+
+    def test_eviction_keeps_index_bounded(self):
+        index = JDDedupeIndex(max_entries=2)
+        for key, text in enumerate([POSTING, OTHER, "Data analyst role with dashboards in Tableau"]):
+            index.add(key, text, key)
+        self.assertEqual(len(index), 2)
+        self.assertIsNone(index.find(POSTING))
+
+    def test_lookup_is_fast_with_precomputed_signature(self):
+        index = JDDedupeIndex()
+        for i in range(2000):
+            index.add(i, f"{OTHER} variant {i} " + " ".join(str(i * j) for j in range(20)), i)
+        signature = index.signature(REPOST)
+        started = time.perf_counter()
+        for _ in range(100):
+            index.query(REPOST, signature=signature)
+        self.assertLess((time.perf_counter() - started) / 100, 0.001)
+
+    def test_analyzer_reuses_requirements_for_near_duplicates(self):
+        llm = StubLLM(ANALYSIS)
+        agent = JDAnalyzerAgent(llm_client=llm, use_llm=True, dedupe_index=JDDedupeIndex(threshold=0.7))
+        first = agent.run(POSTING)
+        second = agent.run(REPOST)
+        self.assertEqual(first, second)
+        self.assertEqual(llm.calls, 1)
+
+    def test_orchestrator_seeds_the_index_from_its_store(self):
+        self.assertIsNotNone(SwiftOrchestratorAgent().jd_analyzer.dedupe_index)
+        with tempfile.TemporaryDirectory() as tmp:
+            resume_path = os.path.join(tmp, "resume.txt")
+            with open(resume_path, "w", encoding="utf-8") as handle:
+                handle.write("Jane Doe\njane@example.com\nSkills: Python, SQL\nExperience: ML Engineer\n")
+            store = ResultStore(os.path.join(tmp, "results.db"))
+            self.addCleanup(store.close)
+
+            def orchestrator(llm):
+                return SwiftOrchestratorAgent(
+                    resume_parser=ResumeParserAgent(use_llm=False),
+                    jd_analyzer=JDAnalyzerAgent(llm_client=llm, use_llm=True, dedupe_index=JDDedupeIndex(threshold=0.7)),
+                    matcher=ResumeJDMatcherAgent(use_llm=False),
+                    writer=SwiftWriterAgent(use_llm=False),
+                    editor=SwiftEditorAgent(use_llm=False),
+                    store=store,
+                )
+
+            first_llm, restarted_llm = StubLLM(ANALYSIS), StubLLM(ANALYSIS)
+            first = orchestrator(first_llm).run_state(resume_path, POSTING, enforce_fit=False)
+            # A fresh orchestrator (e.g. after a restart) recognizes the repost from the store alone.
+            repost = orchestrator(restarted_llm).run_state(resume_path, REPOST, enforce_fit=False)
+        self.assertEqual(first_llm.calls, 1)
+        self.assertEqual(restarted_llm.calls, 0)
+        self.assertEqual(repost.jd, first.jd)
+
+    def test_rejected_analyses_are_not_remembered(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            resume_path = os.path.join(tmp, "resume.txt")
+            with open(resume_path, "w", encoding="utf-8") as handle:
+                handle.write("Jane Doe\njane@example.com\nSkills: Python, SQL\nExperience: ML Engineer\n")
+            store = ResultStore(os.path.join(tmp, "results.db"))
+            self.addCleanup(store.close)
+            llm = StubLLM('{"title": "TBD", "company": "Acme"}')
+            orchestrator = SwiftOrchestratorAgent(
+                resume_parser=ResumeParserAgent(use_llm=False),
+                jd_analyzer=JDAnalyzerAgent(llm_client=llm, use_llm=True, dedupe_index=JDDedupeIndex(threshold=0.7)),
+                matcher=ResumeJDMatcherAgent(use_llm=False),
+                writer=SwiftWriterAgent(use_llm=False),
+                editor=SwiftEditorAgent(use_llm=False),
+                store=store,
+            )
+            orchestrator.run_state(resume_path, POSTING, enforce_fit=False)
+            calls = llm.calls
+            orchestrator.run_state(resume_path, REPOST, enforce_fit=False)
+            # The repost is analyzed again instead of inheriting the rejected result.
+            self.assertGreater(llm.calls, calls)
+            self.assertEqual(len(orchestrator.jd_analyzer.dedupe_index), 0)
+            with store.connection() as conn:
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
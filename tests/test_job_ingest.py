@@ -0,0 +1,123 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+
+from agents.jd_analyzer import JDAnalyzerAgent
+from agents.orchestrator import SwiftOrchestratorAgent
+from agents.resume_jd_matcher import ResumeJDMatcherAgent
+from agents.swift_editor import SwiftEditorAgent
+from agents.swift_writer import SwiftWriterAgent
+from compact import SkillVocab
+from scheduler import BATCH, INTERACTIVE, current_tenant, tenant_context
+from schemas import CandidateProfile
+from tools.jd_dedupe import JDDedupeIndex
+from tools.job_ingest import (
+    JobPosting,
+    dedupe_postings,
+    ingest_and_tailor,
+    prefilter_postings,
+    read_postings,
+    tailor_postings,
+)
+
+ML_POSTING = (
+    "ML Engineer at Acme. Build NLP models for search ranking, own feature pipelines and deploy "
+    "services. Must have: Python, NLP, SQL. Nice to have: Kubernetes."
+)
+CHEF_POSTING = "Pastry chef for a downtown bakery. Must have: 3 years of pastry experience."
+
+
+def _offline_orchestrator() -> SwiftOrchestratorAgent:
+    return SwiftOrchestratorAgent(
+        jd_analyzer=JDAnalyzerAgent(use_llm=False),
+        matcher=ResumeJDMatcherAgent(use_llm=False),
+        writer=SwiftWriterAgent(use_llm=False),
+        editor=SwiftEditorAgent(use_llm=False),
+    )
+
+
+class JobIngestTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.profile = CandidateProfile(
+            name="Jane Doe",
+            contact="jane@example.com",
+            summary="ML engineer",
+            skills=["Python", "NLP"],
+            experience=["ML Engineer at Initech"],
+            education=["BS CS"],
+        )
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.tmp.name, name)
+
+    def test_readers_stream_jsonl_csv_and_html(self):
+        with open(self._path("board.jsonl"), "w", encoding="utf-8") as fh:
+            fh.write(json.dumps({"id": "j1", "title": "Senior ML Engineer", "description": ML_POSTING}) + "\n")
+            fh.write("not json\n")
+            fh.write(json.dumps({"id": "j2", "description": ""}) + "\n")
+        with open(self._path("board.csv"), "w", encoding="utf-8", newline="") as fh:
+            writer = csv.DictWriter(fh, fieldnames=["Job_ID", "Description"])
+            writer.writeheader()
+            writer.writerow({"Job_ID": "c1", "Description": CHEF_POSTING})
+        with open(self._path("board.html"), "w", encoding="utf-8") as fh:
+            fh.write(f"<html><script>var x = 1;</script><article><h2>ML</h2><p>{ML_POSTING}</p></article>")
+            fh.write(f"<article><p>{CHEF_POSTING}</p></article></html>")
+
+        postings = list(read_postings([self._path(n) for n in ("board.jsonl", "board.csv", "board.html")]))
+        self.assertEqual([p.posting_id for p in postings], ["j1", "c1", "board-1", "board-2"])
+        self.assertTrue(postings[0].text.startswith("Senior ML Engineer\n"))
+        self.assertNotIn("var x", postings[2].text)
+        self.assertIn("Must have: Python", postings[2].text)
+
+    def test_dedupe_drops_exact_and_near_duplicates(self):
+        postings = [
+            JobPosting("a", ML_POSTING, "t"),
+            JobPosting("b", "  " + ML_POSTING.upper(), "t"),
+            JobPosting("c", ML_POSTING.replace("Acme.", "Acme!"), "t"),
+            JobPosting("d", CHEF_POSTING, "t"),
+        ]
+        kept = list(dedupe_postings(postings, index=JDDedupeIndex(threshold=0.7)))
+        self.assertEqual([p.posting_id for p in kept], ["a", "d"])
+
+    def test_prefilter_requires_skill_overlap(self):
+        postings = [JobPosting("ml", ML_POSTING, "t"), JobPosting("chef", CHEF_POSTING, "t")]
+        kept = list(prefilter_postings(postings, self.profile, min_overlap=2))
+        self.assertEqual([p.posting_id for p in kept], ["ml"])
+
+    def test_prefilter_counts_skills_by_folded_id_in_the_callers_vocab(self):
+        vocab = SkillVocab()
+        postings = [JobPosting("py", "Python and python and PYTHON services", "t"), JobPosting("ml", ML_POSTING, "t")]
+        kept = list(prefilter_postings(postings, self.profile, min_overlap=2, vocab=vocab))
+        self.assertEqual([p.posting_id for p in kept], ["ml"])
+        # Only the profile's skills and the spellings found for them were interned.
+        self.assertEqual(sorted(vocab.strings(range(len(vocab)))), ["NLP", "PYTHON", "Python", "nlp", "python"])
+
+    def test_pipeline_tailors_surviving_postings(self):
+        with open(self._path("board.jsonl"), "w", encoding="utf-8") as fh:
+            for i, text in enumerate([ML_POSTING, ML_POSTING, CHEF_POSTING]):
+                fh.write(json.dumps({"id": f"p{i}", "text": text}) + "\n")
+        results = list(ingest_and_tailor([self._path("board.jsonl")], _offline_orchestrator(), self.profile, max_workers=2))
+        self.assertEqual(len(results), 1)
+        self.assertIsNone(results[0].error)
+        self.assertEqual(results[0].posting.posting_id, "p0")
+        self.assertIn("Python", results[0].state.final.tailored_resume)
+
+    def test_bulk_runs_queue_as_batch_for_the_callers_tenant(self):
+        seen = []
+
+        class _Recorder:
+            def run_state(self, resume_path, jd_text, profile=None):
+                seen.append(current_tenant())
+
+        postings = [JobPosting(f"p{i}", ML_POSTING, "board") for i in range(3)]
+        with tenant_context("acme", INTERACTIVE):
+            list(tailor_postings(postings, _Recorder(), self.profile, max_workers=2))
+        self.assertEqual(seen, [("acme", BATCH)] * 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+import threading
+import time
+import unittest
+
+from agents.jd_analyzer import JDAnalyzerAgent
+from agents.llm_utils import LLMClientWrapper, track_fallbacks
+from agents.resume_jd_matcher import ResumeJDMatcherAgent
+from agents.swift_editor import SwiftEditorAgent
+from config import ModelConfig
+from fakes import StubLLM, StubResponse
+from schemas import CandidateProfile, DraftContent, JobRequirements
+
+
+class _SlowLLM:
+    """Sleeps for the given per-call delays (last value repeats) before answering."""
+
+    def __init__(self, delays, text: str = "ok"):
+        self.delays = list(delays)
+        self.text = text
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt: str):
+        with self._lock:
+            idx = self.calls
+            self.calls += 1
+        time.sleep(self.delays[min(idx, len(self.delays) - 1)])
+        return StubResponse(f"{self.text}-{idx}")
+
+
+class LLMClientWrapperTests(unittest.TestCase):
+    def test_timeout_bounds_hung_call(self):
+        llm = LLMClientWrapper(_SlowLLM([2.0]), max_retries=2, backoff_seconds=0.01, timeout=0.2)
+        started = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            llm.generate_text("prompt")
+        self.assertLess(time.monotonic() - started, 1.0)
+
+    def test_deadline_in_past_fails_fast(self):
+        client = _SlowLLM([0.0])
+        llm = LLMClientWrapper(client)
+        with self.assertRaises(TimeoutError):
+            llm.generate_text("prompt", deadline=time.monotonic() - 1)
+        self.assertEqual(client.calls, 0)
+
+    def test_hedged_request_returns_faster_duplicate(self):
+        client = _SlowLLM([1.5, 0.0])
+        llm = LLMClientWrapper(client, timeout=1.0, hedge_after=0.05)
+        self.assertEqual(llm.generate_text("prompt"), "ok-1")
+        self.assertEqual(client.calls, 2)
+
+    def test_for_stage_uses_config(self):
+        config = ModelConfig(jd_timeout=5.0, hedge_requests=True, hedge_after_seconds=1.5)
+        llm = LLMClientWrapper.for_stage(object(), config, "jd")
+        self.assertEqual(llm.timeout, 5.0)
+        self.assertEqual(llm.hedge_after, 1.5)
+
+    def test_jd_analyzer_falls_back_on_stage_timeout(self):
+        config = ModelConfig(jd_timeout=0.1, max_retries=0)
+        agent = JDAnalyzerAgent(config=config, llm_client=_SlowLLM([2.0]), use_llm=True)
+        jd = agent.run("Job: ML Engineer")
+        self.assertEqual(jd.title, "TBD")
+
+
+    def test_stream_text_is_bounded_by_deadline(self):
+        class _HangingStream:
+            def generate_content(self, prompt: str, stream: bool = False):
+                def _chunks():
+                    yield StubResponse("[RESUME]\n")
+                    time.sleep(2.0)
+                    yield StubResponse("late")
+
+                return _chunks()
+
+        llm = LLMClientWrapper(_HangingStream(), timeout=0.2)
+        self.assertTrue(llm.supports_streaming)
+        chunks = []
+        started = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            for chunk in llm.stream_text("prompt"):
+                chunks.append(chunk)
+        self.assertEqual(chunks, ["[RESUME]\n"])
+        self.assertLess(time.monotonic() - started, 1.0)
+
+    def test_stream_text_retries_only_before_the_first_chunk(self):
+        class _FlakyStream:
+            def __init__(self, script):
+                self.script = list(script)
+                self.calls = 0
+
+            def generate_content(self, prompt: str, stream: bool = False):
+                self.calls += 1
+                outcome = self.script.pop(0)
+
+                def _chunks():
+                    if outcome == "fail-early":
+                        raise RuntimeError("503")
+                    yield StubResponse("partial ")
+                    if outcome == "fail-late":
+                        raise RuntimeError("connection reset")
+                    yield StubResponse("done")
+
+                return _chunks()
+
+        early = _FlakyStream(["fail-early", "ok"])
+        self.assertEqual(list(LLMClientWrapper(early, backoff_seconds=0.0).stream_text("p")), ["partial ", "done"])
+        self.assertEqual(early.calls, 2)
+
+        late = _FlakyStream(["fail-late", "ok"])
+        with self.assertRaises(RuntimeError):
+            list(LLMClientWrapper(late, backoff_seconds=0.0).stream_text("p"))
+        self.assertEqual(late.calls, 1)
+
+    def test_stream_text_falls_back_without_streaming_support(self):
+        llm = LLMClientWrapper(_SlowLLM([0.0]), max_retries=0)
+        self.assertFalse(llm.supports_streaming)
+        self.assertEqual(list(llm.stream_text("prompt")), ["ok-0"])
+
+class CascadeTests(unittest.TestCase):
+    JD_JSON = '{"title":"ML Engineer","company":"Acme","must_haves":["Python"],"nice_to_haves":[],"responsibilities":[]}'
+
+    def test_fast_model_result_kept_when_valid(self):
+        fast, strong = StubLLM(self.JD_JSON), StubLLM(self.JD_JSON)
+        agent = JDAnalyzerAgent(config=ModelConfig(cascade=True), llm_client=strong, fast_llm_client=fast)
+        jd = agent.run("Job: ML Engineer")
+        self.assertEqual(jd.title, "ML Engineer")
+        self.assertEqual((fast.calls, strong.calls), (1, 0))
+        self.assertEqual(agent.cascade_stats.escalation_rate, 0.0)
+
+    def test_escalates_when_fast_output_fails_checks(self):
+        fast = StubLLM('{"title":"ML Engineer","must_haves":["SQL"]}')
+        strong = StubLLM(self.JD_JSON)
+        agent = JDAnalyzerAgent(config=ModelConfig(cascade=True), llm_client=strong, fast_llm_client=fast)
+        jd = agent.run("Job: ML Engineer")
+        self.assertEqual(jd.must_haves, ["Python"])
+        self.assertEqual(strong.calls, 1)
+        self.assertEqual(agent.cascade_stats.escalation_rate, 1.0)
+
+    def test_posting_without_must_haves_is_not_a_failure(self):
+        fast = StubLLM('{"title":"ML Engineer","company":"Acme","must_haves":[],"nice_to_haves":["Go"]}')
+        strong = StubLLM(self.JD_JSON)
+        agent = JDAnalyzerAgent(config=ModelConfig(cascade=True), llm_client=strong, fast_llm_client=fast)
+        with track_fallbacks() as fallbacks:
+            jd = agent.run("Job: ML Engineer")
+        self.assertEqual((jd.must_haves, jd.nice_to_haves), ([], ["Go"]))
+        self.assertEqual((fast.calls, strong.calls), (1, 0))
+        self.assertEqual(fallbacks, [])
+
+    def test_matcher_escalates_on_unparseable_output(self):
+        strong = StubLLM('{"gaps":[],"positioning":["Lead with NLP"],"rewriting_focus":["NLP"]}')
+        agent = ResumeJDMatcherAgent(config=ModelConfig(cascade=True), llm_client=strong, fast_llm_client=StubLLM("no json"))
+        profile = CandidateProfile(name="Jane", contact="", summary="", skills=["NLP"], experience=[], education=[])
+        jd = JobRequirements(title="ML", company="Acme", must_haves=["NLP"], nice_to_haves=[], responsibilities=[])
+        self.assertEqual(agent.run(profile, jd).positioning, ["Lead with NLP"])
+        self.assertEqual(agent.cascade_stats.escalations, 1)
+
+    def test_editor_escalates_when_revision_fails_validation(self):
+        fast = StubLLM('```resume\nshort\n```\n```validation\n{"passes": true, "reasons": []}\n```')
+        strong = StubLLM('```resume\nPython resume\n```\n```validation\n{"passes": true, "reasons": []}\n```')
+        agent = SwiftEditorAgent(config=ModelConfig(cascade=True), llm_client=strong, fast_llm_client=fast)
+        draft, _ = agent.run(DraftContent(tailored_resume="resume", tailored_cover="Hi"), required_keywords=["Python"])
+        self.assertEqual(draft.tailored_resume, "Python resume")
+        self.assertEqual(strong.calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
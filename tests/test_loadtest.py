@@ -0,0 +1,88 @@
+import unittest
+import urllib.error
+
+from agents.llm_utils import set_model_factory
+from bench.loadtest import (
+    FakeGeminiServer,
+    HTTPModel,
+    LatencyModel,
+    LoadRunner,
+    StepResult,
+    asgi_sender,
+    percentile,
+    saturation_point,
+    synthetic_pairs,
+    use_fake_models,
+)
+
+
+def _step(mode: str, level: float, throughput: float, offered: float = 0.0, growth: float = 1.0, errors: float = 0.0):
+    return StepResult(
+        mode=mode,
+        level=level,
+        sent=10,
+        ok=10,
+        errors=0,
+        duration_s=1.0,
+        throughput_rps=throughput,
+        error_rate=errors,
+        p50_ms=10.0,
+        p90_ms=20.0,
+        p99_ms=30.0,
+        max_ms=40.0,
+        offered_rps=offered or level,
+        backlog_growth=growth,
+    )
+
+
+class LoadTestTests(unittest.TestCase):
+    def test_percentile_is_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([], 99), 0.0)
+
+    def test_saturation_point(self):
+        open_steps = [_step("open", 5, 5.0), _step("open", 20, 19.5), _step("open", 80, 17.0, growth=8.0)]
+        self.assertEqual(saturation_point(open_steps).level, 80)
+        closed_steps = [_step("closed", 1, 4.0), _step("closed", 4, 16.0), _step("closed", 16, 16.5)]
+        self.assertEqual(saturation_point(closed_steps).level, 16)
+        self.assertEqual(saturation_point([_step("open", 5, 5.0, errors=0.2)]).level, 5)
+        self.assertIsNone(saturation_point(open_steps[:2]))
+
+    def test_fake_server_injects_errors(self):
+        with FakeGeminiServer(LatencyModel(median_ms=1, sigma=0, error_rate=1.0, error_codes=(503,))) as server:
+            with self.assertRaises(urllib.error.HTTPError) as ctx:
+                HTTPModel(server.url, "gemini-test").generate_content("hello")
+        self.assertEqual(ctx.exception.code, 503)
+        self.assertEqual((server.calls, server.errors), (1, 1))
+
+    def test_http_model_streams_like_the_sdk(self):
+        with FakeGeminiServer(LatencyModel(median_ms=1, sigma=0)) as server:
+            chunks = [c.text for c in HTTPModel(server.url, "gemini-test").generate_content("resume+cover specialist", stream=True)]
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue("".join(chunks).startswith("[RESUME]\n- Built NLP models"))
+        self.assertEqual(server.streamed, 1)
+
+    def test_closed_loop_against_in_process_app(self):
+        import api
+
+        self.addCleanup(api.get_orchestrator.cache_clear)
+        self.addCleanup(set_model_factory, None)
+        api.get_orchestrator.cache_clear()
+        with FakeGeminiServer(LatencyModel(median_ms=5, sigma=0.2)) as server:
+            use_fake_models(server.url)
+            runner = LoadRunner(asgi_sender(api.app), synthetic_pairs(5), tenants=2)
+            step = runner.step("closed", 2, duration=0.5)
+        self.assertGreater(step.ok, 0)
+        self.assertEqual(step.errors, 0)
+        self.assertGreater(step.throughput_rps, 0)
+        # Every request reached the stand-in model for the matcher, writer and editor stages; JD
+        # analysis is skipped for postings the orchestrator's dedupe index has seen before.
+        self.assertGreaterEqual(server.calls, 3 * step.ok)
+        # The writer streamed its replies, as it does against Gemini.
+        self.assertGreaterEqual(server.streamed, step.ok)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from logger import SamplingFilter, _reconfigure_after_fork, configure_logging, flush_logs, get_logger, log_context, redact, redact_pii
+
+
+class _SlowStream(io.StringIO):
+    def write(self, text):
+        time.sleep(0.05)
+        return super().write(text)
+
+
+class LoggerTests(unittest.TestCase):
+    def setUp(self):
+        self.stream = io.StringIO()
+        configure_logging(level="DEBUG", fmt="json", sample_rates={}, stream=self.stream, name="swifttest")
+        self.addCleanup(flush_logs)
+        self.logger = get_logger("swifttest.unit")
+
+    def _records(self) -> list[dict]:
+        flush_logs()
+        return [json.loads(line) for line in self.stream.getvalue().splitlines()]
+
+    def test_redact_keeps_previous_output(self):
+        self.assertEqual(redact("jane.doe@example.com"), "jane[dot]doe[at]example[dot]com")
+        self.assertEqual(redact("a@b.c", enabled=False), "a@b.c")
+
+    def test_pii_is_redacted_but_date_ranges_are_not(self):
+        text = redact_pii("Mail jane@example.com or call +1 (415) 555-0100, 2019-2022")
+        self.assertEqual(text, "Mail [email] or call [phone], 2019-2022")
+
+    def test_records_carry_run_and_stage(self):
+        with log_context(run_id="run-1"):
+            with log_context(stage="draft"):
+                self.logger.info("Writing %s", "draft")
+            self.logger.info("Done")
+        self.logger.info("Outside")
+        records = self._records()
+        self.assertEqual([r["msg"] for r in records], ["Writing draft", "Done", "Outside"])
+        self.assertEqual([(r["run_id"], r["stage"]) for r in records], [("run-1", "draft"), ("run-1", None), (None, None)])
+
+    def test_context_is_per_thread(self):
+        def _other():
+            self.logger.info("From thread")
+
+        with log_context(run_id="run-1"):
+            thread = threading.Thread(target=_other)
+            thread.start()
+            thread.join()
+        self.assertIsNone(self._records()[0]["run_id"])
+
+    def test_sampling_keeps_one_in_n_and_all_warnings(self):
+        self.stream = io.StringIO()
+        configure_logging(level="DEBUG", fmt="json", sample_rates={logging.INFO: 0.1}, stream=self.stream, name="swifttest")
+        sampling = logging.getLogger("swifttest").handlers[0].filters[0]
+        self.assertIsInstance(sampling, SamplingFilter)
+        for i in range(100):
+            self.logger.info("hot path %d", i)
+        self.logger.warning("kept")
+        records = self._records()
+        self.assertEqual(len(records), 11)
+        self.assertEqual(sampling.dropped[logging.INFO], 90)
+        self.assertEqual(records[-1]["level"], "WARNING")
+
+    def test_logging_does_not_wait_on_the_stream(self):
+        stream = _SlowStream()
+        configure_logging(level="INFO", fmt="text", sample_rates={}, stream=stream, name="swifttest")
+        started = time.monotonic()
+        for i in range(10):
+            self.logger.info("record %d", i)
+        self.assertLess(time.monotonic() - started, 0.2)
+        flush_logs()
+        self.assertEqual(len(stream.getvalue().splitlines()), 10)
+
+    def test_text_is_the_default_format(self):
+        previous = os.environ.pop("SWIFT_LOG_FORMAT", None)
+        if previous is not None:
+            self.addCleanup(os.environ.__setitem__, "SWIFT_LOG_FORMAT", previous)
+        stream = io.StringIO()
+        configure_logging(level="INFO", sample_rates={}, stream=stream, name="swifttest")
+        self.logger.info("plain")
+        flush_logs()
+        self.assertRegex(stream.getvalue(), r"INFO swifttest.unit - plain\n$")
+
+    def test_child_after_fork_gets_a_fresh_listener(self):
+        with tempfile.TemporaryFile("w+", encoding="utf-8") as out:
+            configure_logging(level="INFO", fmt="text", sample_rates={}, stream=out, name="swifttest")
+            before = logging.getLogger("swifttest").handlers[0]
+            _reconfigure_after_fork()
+            after = logging.getLogger("swifttest").handlers
+            self.assertEqual(len(after), 1)
+            self.assertIsNot(after[0], before)
+            self.logger.info("from the new listener")
+            flush_logs()
+            out.seek(0)
+            self.assertIn("from the new listener", out.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
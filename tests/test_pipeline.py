@@ -1,6 +1,7 @@
 import os
 import tempfile
 import unittest
+import zipfile
 
 try:
     import PyPDF2  # noqa: F401
@@ -17,25 +18,15 @@ from agents.resume_jd_matcher import ResumeJDMatcherAgent
 from agents.resume_parser import ResumeParserAgent
 from agents.swift_editor import SwiftEditorAgent
 from agents.swift_writer import SwiftWriterAgent
-from agents.orchestrator import SwiftOrchestratorAgent
-from schemas import DraftContent
-from tools.file_export_tool import export_content, export_draft, render_markdown
+from agents.orchestrator import SwiftOrchestratorAgent, _patch_draft
+from fakes import StubLLM, StubResponse
+from schemas import CandidateProfile, DraftContent, JobRequirements, StrategyPlan
+from tools.file_export_tool import ExportJob, export_content, export_draft, export_many, render_markdown
+from tools.jd_dedupe import JDDedupeIndex
+from tools.render_templates import get_layout
 from tools.resume_parsing_util import parse_resume
 
 
-class _StubResponse:
-    def __init__(self, text: str):
-        self.text = text
-
-
-class _StubLLM:
-    def __init__(self, text: str):
-        self._text = text
-
-    def generate_content(self, prompt: str):
-        return _StubResponse(self._text)
-
-
 class PipelineTests(unittest.TestCase):
     def test_orchestrator_fallback_pipeline(self):
         fd, resume_path = tempfile.mkstemp(suffix=".txt")
@@ -51,15 +42,15 @@ class PipelineTests(unittest.TestCase):
                 )
 
             jd_text = "Job: ML Engineer\nMust have: Python; NLP"
-            jd_llm = _StubLLM(
+            jd_llm = StubLLM(
                 '{"title":"ML Engineer","company":"Acme","must_haves":["Python","NLP"],"nice_to_haves":["Leadership"],"responsibilities":["Build models"]}'
             )
-            matcher_llm = _StubLLM(
+            matcher_llm = StubLLM(
                 '{"gaps":["Leadership"],"positioning":["Impact-driven"],"rewriting_focus":["Highlight NLP results"]}'
             )
 
             orchestrator = SwiftOrchestratorAgent(
-                resume_parser=ResumeParserAgent(llm_client=_StubLLM(""), use_llm=False),
+                resume_parser=ResumeParserAgent(llm_client=StubLLM(""), use_llm=False),
                 jd_analyzer=JDAnalyzerAgent(llm_client=jd_llm, use_llm=True),
                 matcher=ResumeJDMatcherAgent(llm_client=matcher_llm, use_llm=True),
                 writer=SwiftWriterAgent(use_llm=False),
@@ -168,6 +159,199 @@ class PipelineTests(unittest.TestCase):
         finally:
             os.remove(tmp)
 
+    def test_jd_batch_packs_postings_and_retries_failures(self):
+        class BatchLLM:
+            def __init__(self):
+                self.prompts = []
+
+            def generate_content(self, prompt: str):
+                self.prompts.append(prompt)
+                if "JSON array" in prompt:
+                    return StubResponse(
+                        '```json\n[{"index": 0, "title": "A", "company": "X", "must_haves": ["Python"]},'
+                        ' {"index": 2, "title": "C", "company": "Z", "must_haves": "SQL"}]\n```'
+                    )
+                return StubResponse('{"title": "B", "company": "Y", "must_haves": ["Go"]}')
+
+        llm = BatchLLM()
+        agent = JDAnalyzerAgent(llm_client=llm, use_llm=True)
+        results = agent.run_batch(["Posting A", "Posting B", "Posting C"])
+        self.assertEqual([jd.title for jd in results], ["A", "B", "C"])
+        self.assertEqual(results[2].must_haves, ["SQL"])
+        # One packed call plus a single retry for the posting missing from the array.
+        self.assertEqual(len(llm.prompts), 2)
+        self.assertIn("Posting B", llm.prompts[1])
+        self.assertNotIn("Posting A", llm.prompts[1])
+
+    def test_jd_batch_retries_bad_indices_and_invalid_elements(self):
+        class BatchLLM:
+            def __init__(self):
+                self.prompts = []
+
+            def generate_content(self, prompt: str):
+                self.prompts.append(prompt)
+                if "JSON array" in prompt:
+                    return StubResponse(
+                        '[{"index": 0.0, "title": "A", "company": "X"}, {"index": true, "title": "TBD", "company": "Y"},'
+                        ' {"index": 2, "title": "C", "company": "Z"}]'
+                    )
+                posting = prompt.rsplit("Job posting:\n", 1)[-1].strip()
+                return StubResponse(f'{{"title": "{posting}", "company": "Acme"}}')
+
+        llm = BatchLLM()
+        agent = JDAnalyzerAgent(llm_client=llm, use_llm=True, dedupe_index=JDDedupeIndex())
+        postings = ["Data engineer in Berlin", "Frontend developer, remote", "Night shift nurse"]
+        results = agent.run_batch(postings)
+        self.assertEqual([jd.title for jd in results], postings[:2] + ["C"])
+        # The float and bool indices and the "TBD" element were retried one by one, not stored.
+        self.assertEqual(len(llm.prompts), 3)
+        self.assertEqual(len(agent.dedupe_index), 3)
+
+    def test_jd_batch_respects_token_budget(self):
+        agent = JDAnalyzerAgent(llm_client=StubLLM(""), use_llm=True)
+        batches = agent._pack(["x" * 400, "y" * 400, "z" * 400], max_prompt_tokens=250)
+        self.assertEqual(batches, [[0, 1], [2]])
+
+    def test_orchestrator_warm_builds_online_clients_only(self):
+        orchestrator = SwiftOrchestratorAgent(
+            resume_parser=ResumeParserAgent(use_llm=False),
+            jd_analyzer=JDAnalyzerAgent(llm_client=StubLLM(""), use_llm=True),
+            matcher=ResumeJDMatcherAgent(use_llm=False),
+            writer=SwiftWriterAgent(llm_client=StubLLM(""), use_llm=True),
+            editor=SwiftEditorAgent(use_llm=False),
+        )
+        self.assertEqual(orchestrator.warm(), ["jd", "writer"])
+
+    def test_orchestrator_warm_connect_pings_each_client_once(self):
+        class _DownLLM:
+            def generate_content(self, prompt: str):
+                raise ConnectionError("unreachable")
+
+        shared = StubLLM("")
+        orchestrator = SwiftOrchestratorAgent(
+            resume_parser=ResumeParserAgent(use_llm=False),
+            jd_analyzer=JDAnalyzerAgent(llm_client=shared, use_llm=True),
+            matcher=ResumeJDMatcherAgent(llm_client=shared, use_llm=True),
+            writer=SwiftWriterAgent(llm_client=_DownLLM(), use_llm=True),
+            editor=SwiftEditorAgent(use_llm=False),
+        )
+        self.assertEqual(orchestrator.warm(connect=True), ["jd", "matcher"])
+        self.assertEqual(shared.calls, 1)
+
+    def test_export_many_writes_one_file_per_job(self):
+        jobs = [ExportJob(name="acme", draft=DraftContent(tailored_resume=f"Body {i}", tailored_cover=None)) for i in range(3)]
+        with tempfile.TemporaryDirectory() as out_dir:
+            paths = export_many(iter(jobs), fmt="md", out_dir=out_dir, workers=1)
+            self.assertEqual([os.path.basename(p) for p in paths], ["acme.md", "acme_2.md", "acme_3.md"])
+            with open(paths[2], encoding="utf-8") as fh:
+                self.assertIn("Body 2", fh.read())
+
+    def test_export_many_never_reuses_a_name(self):
+        names = ["acme", "acme", "acme_2", "acme_2", "acme"]
+        jobs = [ExportJob(name=n, draft=DraftContent(tailored_resume=f"Body {i}", tailored_cover=None)) for i, n in enumerate(names)]
+        with tempfile.TemporaryDirectory() as out_dir:
+            paths = export_many(iter(jobs), fmt="md", out_dir=out_dir, workers=1)
+            self.assertEqual(
+                [os.path.basename(p) for p in paths], ["acme.md", "acme_2.md", "acme_2_2.md", "acme_2_3.md", "acme_3.md"]
+            )
+
+    def test_export_many_streams_into_archive_with_worker_pool(self):
+        fmt = "pdf" if FPDF is not None else "txt"
+        jobs = (ExportJob(name=f"job_{i}", draft=DraftContent(tailored_resume="Body", tailored_cover="Hi")) for i in range(5))
+        with tempfile.TemporaryDirectory() as out_dir:
+            archive = os.path.join(out_dir, "drafts.zip")
+            names = export_many(jobs, fmt=fmt, archive=archive, workers=2, max_in_flight=2)
+            self.assertEqual(names, [f"job_{i}.{fmt}" for i in range(5)])
+            with zipfile.ZipFile(archive) as zf:
+                self.assertEqual(sorted(zf.namelist()), sorted(names))
+
+    def test_render_markdown_is_memoized_per_content(self):
+        draft = DraftContent(tailored_resume="Resume body", tailored_cover="Cover body")
+        first = render_markdown(draft)
+        same_content = DraftContent(tailored_resume="Resume body", tailored_cover="Cover body")
+        self.assertIs(render_markdown(same_content), first)
+        self.assertEqual("\n".join(get_layout().iter_lines(draft)), first)
+        self.assertNotEqual(render_markdown(DraftContent(tailored_resume="Other", tailored_cover=None)), first)
+
+    def test_export_draft_renders_docx_from_layout_lines(self):
+        try:
+            import docx
+        except Exception:
+            self.skipTest("python-docx not installed")
+        draft = DraftContent(tailored_resume="Line one\n- Line two", tailored_cover=None)
+        with tempfile.TemporaryDirectory() as out_dir:
+            path = export_draft(draft, fmt="docx", out_path=os.path.join(out_dir, "draft.docx"))
+            texts = [p.text for p in docx.Document(path).paragraphs]
+        self.assertIn("- Line one", texts)
+        self.assertIn("- Line two", texts)
+
+    def test_incremental_rerun_patches_identity_edits_and_regenerates_on_content(self):
+        class CountingWriter(SwiftWriterAgent):
+            calls = 0
+
+            def run(self, *args, **kwargs):
+                CountingWriter.calls += 1
+                return super().run(*args, **kwargs)
+
+        orchestrator = SwiftOrchestratorAgent(
+            resume_parser=ResumeParserAgent(use_llm=False),
+            jd_analyzer=JDAnalyzerAgent(use_llm=False),
+            matcher=ResumeJDMatcherAgent(use_llm=False),
+            writer=CountingWriter(use_llm=False),
+            editor=SwiftEditorAgent(use_llm=False),
+        )
+        jd_text = "ML Engineer\nCompany: Acme\nMust have: Python"
+        with tempfile.TemporaryDirectory() as tmp:
+            resume_path = os.path.join(tmp, "resume.txt")
+            with open(resume_path, "w", encoding="utf-8") as handle:
+                handle.write("Jane Deo\njane@example.com\nSkills: Python, NLP\nExperience: ML Engineer\n")
+            first = orchestrator.run_state(resume_path, jd_text)
+
+            with open(resume_path, "w", encoding="utf-8") as handle:
+                handle.write("Jane Doe\njane@example.com\nSkills: Python, NLP\nExperience: ML Engineer\n")
+            patched = orchestrator.rerun(resume_path, jd_text, first)
+            self.assertEqual(patched.stages_run, ["profile"])
+            self.assertIn("Jane Doe", patched.final.tailored_resume)
+            self.assertNotIn("Jane Deo", patched.final.tailored_cover)
+            self.assertEqual(CountingWriter.calls, 1)
+
+            with open(resume_path, "w", encoding="utf-8") as handle:
+                handle.write("Jane Doe\njane@example.com\nSkills: Python, NLP, SQL\nExperience: ML Engineer\n")
+            regenerated = orchestrator.rerun(resume_path, jd_text, patched)
+            self.assertIn("draft", regenerated.stages_run)
+            self.assertIn("SQL", regenerated.final.tailored_resume)
+            self.assertEqual(CountingWriter.calls, 2)
+
+            # A reworded item that the draft quotes is patched in without the matcher or writer.
+            with open(resume_path, "w", encoding="utf-8") as handle:
+                handle.write("Jane Doe\njane@example.com\nSkills: Python, Natural Language Processing, SQL\nExperience: ML Engineer\n")
+            reworded = orchestrator.rerun(resume_path, jd_text, regenerated)
+            self.assertEqual(reworded.stages_run, ["profile"])
+            self.assertIn("Python, Natural Language Processing, SQL", reworded.final.tailored_resume)
+            self.assertIn("Highlight Natural Language Processing", reworded.strategy.positioning)
+            self.assertEqual(CountingWriter.calls, 2)
+
+    def test_patch_draft_replaces_whole_words_only(self):
+        draft = DraftContent(tailored_resume="Al\nAlgorithms, Al's models", tailored_cover="Dear team, Al")
+        patched = _patch_draft(draft, [("Al", "Alan")])
+        self.assertEqual(patched.tailored_resume, "Alan\nAlgorithms, Alan's models")
+        self.assertEqual(patched.tailored_cover, "Dear team, Alan")
+
+    def test_writer_revise_sends_only_the_draft_and_changes(self):
+        llm = StubLLM("[RESUME]\nJane Doe\n- Python, SQL\n[/RESUME]\n[COVER]\nDear team\n[/COVER]")
+        writer = SwiftWriterAgent(llm_client=llm, use_llm=True)
+        profile = CandidateProfile(
+            name="Jane Doe", contact="jane@example.com", summary="", skills=["Python", "SQL"], experience=[], education=[]
+        )
+        jd = JobRequirements(title="ML Engineer", company="Acme", must_haves=["SQL"], nice_to_haves=[], responsibilities=[])
+        strategy = StrategyPlan(gaps=[], positioning=["Highlight SQL"], rewriting_focus=["SQL"])
+        previous = DraftContent(tailored_resume="Jane Doe\n- Python", tailored_cover="Dear team")
+        revised = writer.revise(previous, profile, jd, strategy, ["skills: added 'SQL'"])
+        self.assertEqual(revised.tailored_resume, "Jane Doe\n- Python, SQL")
+        self.assertIn("skills: added 'SQL'", llm.prompts[0])
+        self.assertIn("Jane Doe\n- Python\n[/RESUME]", llm.prompts[0])
+        self.assertNotIn("jane@example.com", llm.prompts[0])
+
 
 if __name__ == "__main__":
     unittest.main()
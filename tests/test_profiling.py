@@ -0,0 +1,117 @@
+import io
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from agents.jd_analyzer import JDAnalyzerAgent
+from agents.orchestrator import SwiftOrchestratorAgent
+from agents.resume_jd_matcher import ResumeJDMatcherAgent
+from agents.resume_parser import ResumeParserAgent
+from agents.swift_editor import SwiftEditorAgent
+from agents.swift_writer import SwiftWriterAgent
+from fakes import StubLLM
+from profiling import StackSampler, collect_timings, profile_run, timed
+
+try:
+    from fastapi.testclient import TestClient
+except Exception:
+    TestClient = None
+
+
+def _busy(seconds: float) -> None:
+    until = time.perf_counter() + seconds
+    while time.perf_counter() < until:
+        pass
+
+
+class ProfilingTests(unittest.TestCase):
+    def setUp(self):
+        fd, self.resume_path = tempfile.mkstemp(suffix=".txt")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            fh.write("Jane Doe\njane@example.com\nSkills: Python, NLP\nExperience: ML Engineer\nEducation: BS CS\n")
+        self.addCleanup(os.remove, self.resume_path)
+
+    def test_timed_is_a_no_op_without_collector(self):
+        with timed("profile"):
+            pass
+        with collect_timings() as timings:
+            pass
+        self.assertEqual(timings.stages, {})
+
+    def test_stages_and_llm_waits_are_recorded(self):
+        jd_llm = StubLLM(
+            '{"title":"ML Engineer","company":"Acme","must_haves":["Python"],"nice_to_haves":[],"responsibilities":[]}',
+            delay=0.05,
+        )
+        orchestrator = SwiftOrchestratorAgent(
+            resume_parser=ResumeParserAgent(use_llm=False),
+            jd_analyzer=JDAnalyzerAgent(llm_client=jd_llm, use_llm=True),
+            matcher=ResumeJDMatcherAgent(use_llm=False),
+            writer=SwiftWriterAgent(use_llm=False),
+            editor=SwiftEditorAgent(use_llm=False),
+        )
+        with collect_timings() as timings:
+            orchestrator.run(self.resume_path, "Job: ML Engineer\nMust have: Python")
+        report = timings.as_dict()
+        self.assertEqual(
+            set(report["stages"]), {"profile", "jd", "jd.llm", "fit", "strategy", "draft", "final"}
+        )
+        llm = report["stages"]["jd.llm"]
+        self.assertGreaterEqual(llm["wall_ms"], 50)
+        # Waiting on the model costs wall time but almost no CPU.
+        self.assertLess(llm["cpu_ms"], llm["wall_ms"] / 2)
+        self.assertGreaterEqual(report["total"]["wall_ms"], report["stages"]["jd"]["wall_ms"])
+
+    def test_profile_run_writes_cprofile_and_collapsed_stacks(self):
+        prefix = os.path.join(tempfile.mkdtemp(), "run")
+        out = io.StringIO()
+        with profile_run(prefix, interval=0.001, out=out):
+            with timed("render"):
+                _busy(0.1)
+        self.assertTrue(os.path.getsize(f"{prefix}.prof") > 0)
+        with open(f"{prefix}.collapsed", encoding="utf-8") as fh:
+            lines = fh.read().splitlines()
+        self.assertTrue(any("_busy (test_profiling.py" in line for line in lines))
+        stack, count = lines[0].rsplit(" ", 1)
+        self.assertGreater(int(count), 0)
+        self.assertIn("render", out.getvalue())
+
+    def test_sampler_counts_samples(self):
+        sampler = StackSampler(interval=0.001).start()
+        _busy(0.05)
+        sampler.stop()
+        self.assertGreater(sum(sampler.counts.values()), 5)
+
+    def test_sampler_covers_worker_threads(self):
+        sampler = StackSampler(interval=0.001).start()
+        worker = threading.Thread(target=_busy, args=(0.05,), name="swift-test-worker")
+        worker.start()
+        worker.join()
+        sampler.stop()
+        stacks = [stack for stack in sampler.counts if stack.startswith("swift-test-worker;")]
+        self.assertTrue(any("_busy (test_profiling.py" in stack for stack in stacks))
+        self.assertFalse(any(stack.startswith("swift-sampler;") for stack in sampler.counts))
+
+    @unittest.skipIf(TestClient is None, "fastapi test client not available")
+    def test_api_attaches_timings_on_request(self):
+        import api
+
+        client = TestClient(api.app)
+        with open(self.resume_path, "rb") as fh:
+            resume = fh.read()
+        files = {
+            "resume_file": ("resume.txt", resume),
+            "jd_file": ("jd.txt", b"Job: ML Engineer\nMust have: Python"),
+        }
+        plain = client.post("/tailor", files=files, data={"offline": "true"})
+        self.assertNotIn("timings", plain.json())
+        profiled = client.post("/tailor", files=files, data={"offline": "true"}, headers={"X-Profile": "1"})
+        timings = profiled.json()["timings"]
+        self.assertIn("draft", timings["stages"])
+        self.assertIn("cpu_ms", timings["total"])
+
+
+if __name__ == "__main__":
+    unittest.main()
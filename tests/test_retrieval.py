@@ -0,0 +1,69 @@
+import unittest
+
+from agents.retrieval import BulletIndex, index_for_profile, profile_bullets, relevant_bullets
+from agents.swift_writer import SwiftWriterAgent
+from config import ModelConfig
+from fakes import StubLLM
+from schemas import CandidateProfile, JobRequirements, StrategyPlan
+
+PROFILE = CandidateProfile(
+    name="Jane Doe",
+    contact="jane@example.com",
+    summary="ML engineer",
+    skills=["Python", "PyTorch", "Kubernetes", "Figma"],
+    experience=[
+        "Built NLP ranking models for product search\nDeployed model serving on Kubernetes clusters",
+        "Designed marketing landing pages; Ran weekly team lunches",
+    ],
+    education=["BS CS"],
+)
+JD = JobRequirements(
+    title="ML Engineer",
+    company="Acme",
+    must_haves=["Python", "NLP models"],
+    nice_to_haves=[],
+    responsibilities=["Deploy models to Kubernetes"],
+)
+
+
+DRAFT_REPLY = "[RESUME]\n- Built NLP models\n[/RESUME]\n[COVER]\nHello\n[/COVER]"
+
+
+class RetrievalTests(unittest.TestCase):
+    def test_bullets_are_split_per_line_and_clause(self):
+        bullets = profile_bullets(PROFILE)
+        self.assertIn("Deployed model serving on Kubernetes clusters", bullets)
+        self.assertIn("Ran weekly team lunches", bullets)
+        self.assertEqual(bullets.count("Kubernetes"), 1)
+
+    def test_search_ranks_related_bullet_first(self):
+        index = BulletIndex(profile_bullets(PROFILE))
+        best, score = index.search("natural language ranking models for search", k=1)[0]
+        self.assertEqual(best, "Built NLP ranking models for product search")
+        self.assertGreater(score, 0.2)
+
+    def test_relevant_bullets_drop_unrelated_content(self):
+        relevant = relevant_bullets(PROFILE, JD, k=2)
+        self.assertIn("Python", relevant)
+        self.assertIn("Deployed model serving on Kubernetes clusters", relevant)
+        self.assertNotIn("Ran weekly team lunches", relevant)
+        self.assertNotIn("Figma", relevant)
+
+    def test_index_is_cached_per_profile(self):
+        self.assertIs(index_for_profile(PROFILE), index_for_profile(PROFILE.model_copy()))
+
+    def test_writer_prompt_carries_only_retrieved_bullets(self):
+        llm = StubLLM(DRAFT_REPLY)
+        strategy = StrategyPlan(gaps=[], positioning=[], rewriting_focus=[])
+        SwiftWriterAgent(llm_client=llm).run(PROFILE, JD, strategy)
+        self.assertIn("Deployed model serving", llm.prompts[0])
+        self.assertNotIn("team lunches", llm.prompts[0])
+
+        full = StubLLM(DRAFT_REPLY)
+        SwiftWriterAgent(config=ModelConfig(retrieval_top_k=None), llm_client=full).run(PROFILE, JD, strategy)
+        self.assertIn("team lunches", full.prompts[0])
+        self.assertLess(len(llm.prompts[0]), len(full.prompts[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
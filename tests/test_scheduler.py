@@ -0,0 +1,148 @@
+import threading
+import time
+import unittest
+
+from agents.llm_utils import LLMClientWrapper
+from fakes import StubResponse
+from scheduler import BATCH, INTERACTIVE, FairScheduler, install, tenant_context
+
+
+def _waiting(scheduler: FairScheduler) -> int:
+    return sum(sum(q.values()) for q in scheduler.stats()["waiting"].values())
+
+
+class _Recorder:
+    """Queues calls behind a held slot, then records the order in which they are granted."""
+
+    def __init__(self, scheduler: FairScheduler):
+        self.scheduler = scheduler
+        self.order: list[str] = []
+        self.threads: list[threading.Thread] = []
+
+    def enqueue(self, tenant: str, priority: str = INTERACTIVE):
+        def _worker():
+            self.scheduler.acquire(tenant, priority)
+            self.order.append(tenant)
+            self.scheduler.release(tenant)
+
+        queued = _waiting(self.scheduler)
+        thread = threading.Thread(target=_worker)
+        thread.start()
+        self.threads.append(thread)
+        while _waiting(self.scheduler) == queued:
+            time.sleep(0.001)
+
+    def join(self):
+        for thread in self.threads:
+            thread.join(timeout=5)
+
+
+class _SlowLLM:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt: str):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self._lock:
+            self.active -= 1
+        return StubResponse("ok")
+
+
+class FairSchedulerTests(unittest.TestCase):
+    def test_tenants_alternate_within_a_class(self):
+        scheduler = FairScheduler(capacity=1, per_tenant_limit=None)
+        scheduler.acquire("holder")
+        recorder = _Recorder(scheduler)
+        for tenant in ["bulk", "bulk", "bulk", "alice"]:
+            recorder.enqueue(tenant)
+        scheduler.release("holder")
+        recorder.join()
+        self.assertEqual(recorder.order, ["bulk", "alice", "bulk", "bulk"])
+
+    def test_weights_give_larger_share(self):
+        scheduler = FairScheduler(capacity=1, per_tenant_limit=None, weights={"paid": 2.0})
+        scheduler.acquire("holder")
+        recorder = _Recorder(scheduler)
+        for tenant in ["free", "free", "paid", "paid", "paid", "paid"]:
+            recorder.enqueue(tenant)
+        scheduler.release("holder")
+        recorder.join()
+        self.assertEqual(recorder.order[:3].count("paid"), 2)
+
+    def test_interactive_calls_overtake_batch(self):
+        scheduler = FairScheduler(capacity=1, per_tenant_limit=None)
+        scheduler.acquire("holder")
+        recorder = _Recorder(scheduler)
+        recorder.enqueue("bulk", BATCH)
+        recorder.enqueue("bulk", BATCH)
+        recorder.enqueue("alice", INTERACTIVE)
+        scheduler.release("holder")
+        recorder.join()
+        self.assertEqual(recorder.order, ["alice", "bulk", "bulk"])
+
+    def test_per_tenant_cap_and_interactive_reserve(self):
+        scheduler = FairScheduler(capacity=4, per_tenant_limit=2, interactive_reserve=1)
+        scheduler.acquire("bulk", BATCH)
+        scheduler.acquire("bulk", BATCH)
+        with self.assertRaises(TimeoutError):
+            scheduler.acquire("bulk", BATCH, timeout=0.05)
+        scheduler.acquire("other", BATCH)
+        # The last slot is kept for interactive traffic.
+        with self.assertRaises(TimeoutError):
+            scheduler.acquire("third", BATCH, timeout=0.05)
+        scheduler.acquire("alice", INTERACTIVE, timeout=0.05)
+        self.assertEqual(scheduler.stats()["active"], 4)
+        self.assertEqual(_waiting(scheduler), 0)
+
+    def test_wrapper_calls_go_through_installed_scheduler(self):
+        scheduler = FairScheduler(capacity=1, per_tenant_limit=None)
+        install(scheduler)
+        self.addCleanup(install, None)
+        llm = _SlowLLM()
+        wrapper = LLMClientWrapper(llm, max_retries=0)
+
+        def _call(tenant):
+            with tenant_context(tenant):
+                wrapper.generate_text("prompt")
+
+        threads = [threading.Thread(target=_call, args=(f"t{i}",)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+        self.assertEqual(llm.peak, 1)
+        self.assertEqual(scheduler.stats()["active"], 0)
+
+    def test_slot_is_held_until_a_timed_out_request_finishes(self):
+        scheduler = FairScheduler(capacity=2, per_tenant_limit=None)
+        install(scheduler)
+        self.addCleanup(install, None)
+        finished = threading.Event()
+
+        class _HungLLM:
+            def generate_content(self, prompt: str):
+                finished.wait(5)
+
+        with self.assertRaises(TimeoutError):
+            LLMClientWrapper(_HungLLM(), max_retries=0, timeout=0.05).generate_text("prompt")
+        # The caller gave up, but the request still occupies the model.
+        self.assertEqual(scheduler.stats()["active"], 1)
+        finished.set()
+        for _ in range(500):
+            if scheduler.stats()["active"] == 0:
+                break
+            time.sleep(0.01)
+        self.assertEqual(scheduler.stats()["active"], 0)
+
+    def test_quantum_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            FairScheduler(quantum=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
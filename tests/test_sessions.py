@@ -0,0 +1,140 @@
+import os
+import tempfile
+import unittest
+
+from agents.jd_analyzer import JDAnalyzerAgent
+from agents.orchestrator import SwiftOrchestratorAgent
+from agents.resume_jd_matcher import ResumeJDMatcherAgent
+from agents.resume_parser import ResumeParserAgent
+from agents.swift_editor import SwiftEditorAgent, _trim_lines
+from agents.swift_writer import SwiftWriterAgent
+from fakes import StubLLM
+from sessions import SessionStore, TailorSession
+
+RESUME = "Jane Doe\njane@example.com\nSkills: Python, NLP\nExperience: ML Engineer\nEducation: BS CS\n"
+JD_A = "Job: ML Engineer\nCompany: Acme\nMust have: Python; NLP"
+JD_B = "Job: Data Scientist\nCompany: Globex\nMust have: Python; SQL"
+
+
+class TailorSessionTests(unittest.TestCase):
+    def setUp(self):
+        self.jd_llm = StubLLM(
+            '{"title":"ML Engineer","company":"Acme","must_haves":["Python"],"nice_to_haves":[],"responsibilities":[]}'
+        )
+        self.orchestrator = SwiftOrchestratorAgent(
+            resume_parser=ResumeParserAgent(use_llm=False),
+            jd_analyzer=JDAnalyzerAgent(llm_client=self.jd_llm, use_llm=True),
+            matcher=ResumeJDMatcherAgent(use_llm=False),
+            writer=SwiftWriterAgent(use_llm=False),
+            editor=SwiftEditorAgent(use_llm=False),
+        )
+        self.resume_path = self._write(RESUME)
+
+    def _write(self, text: str) -> str:
+        fd, path = tempfile.mkstemp(suffix=".txt")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            fh.write(text)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_follow_up_turns_reuse_earlier_stages(self):
+        session = TailorSession("chat-1")
+        first = session.tailor(self.orchestrator, self.resume_path, JD_A)
+        self.assertEqual(first.stages_run[:2], ["profile", "jd"])
+
+        other_job = session.tailor(self.orchestrator, None, JD_B)
+        self.assertNotIn("profile", other_job.stages_run)
+        self.assertIn("jd", other_job.stages_run)
+        calls = self.jd_llm.calls
+
+        back = session.tailor(self.orchestrator, self.resume_path, JD_A)
+        self.assertEqual(back.stages_run, ["fit", "strategy", "draft", "final"])
+        self.assertEqual(self.jd_llm.calls, calls)
+
+        again = session.tailor(self.orchestrator, self.resume_path, JD_A)
+        self.assertEqual(again.stages_run, [])
+        self.assertEqual(again.final, back.final)
+
+    def test_edited_resume_reruns_incrementally(self):
+        session = TailorSession("chat-1")
+        session.tailor(self.orchestrator, self.resume_path, JD_A)
+        edited = self._write(RESUME.replace("jane@example.com", "jane@newmail.com"))
+        state = session.tailor(self.orchestrator, edited, JD_A)
+        self.assertEqual(state.stages_run, ["profile"])
+        self.assertIn("jane@newmail.com", state.final.tailored_resume)
+
+    def test_shorten_edits_only_the_last_draft(self):
+        session = TailorSession("chat-1")
+        with self.assertRaises(LookupError):
+            session.shorten(self.orchestrator)
+        with self.assertRaises(LookupError):
+            session.tailor(self.orchestrator, None, JD_A)
+        before = session.tailor(self.orchestrator, self.resume_path, JD_A)
+        words = len(before.final.tailored_resume.split()) + len(before.final.tailored_cover.split())
+        shorter = session.shorten(self.orchestrator, max_words=words // 2)
+        self.assertEqual(shorter.stages_run, ["final"])
+        self.assertLessEqual(
+            len(shorter.final.tailored_resume.split()) + len(shorter.final.tailored_cover.split()), words // 2
+        )
+        self.assertEqual(shorter.strategy, before.strategy)
+
+    def test_trim_stays_within_budget_and_keeps_the_closing(self):
+        cover = (
+            "Dear Hiring Manager,\n\n"
+            "I am excited to apply for the ML Engineer role at Acme.\n"
+            "At my last job I built NLP pipelines in Python for search.\n"
+            "I also enjoy hiking and photography on weekends.\n\n"
+            "Sincerely,\nJane Doe"
+        )
+        trimmed = _trim_lines(cover, 20, ["Python"], closing=2)
+        self.assertLessEqual(len(trimmed.split()), 20)
+        self.assertTrue(trimmed.startswith("Dear Hiring Manager,"))
+        self.assertTrue(trimmed.endswith("Sincerely,\nJane Doe"))
+        self.assertIn("NLP pipelines in Python", trimmed)
+        self.assertNotIn("hiking", trimmed)
+        # The budget holds even when the opening and closing alone do not fit.
+        self.assertLessEqual(len(_trim_lines(cover, 3, closing=2).split()), 3)
+
+    def test_trim_drops_headings_left_without_lines(self):
+        resume = "Jane Doe\njane@example.com\nSkills:\nPython, NLP\nHobbies:\nHiking, photography and long walks"
+        self.assertEqual(_trim_lines(resume, 7, ["Python"]), "Jane Doe\njane@example.com\nSkills:\nPython, NLP")
+
+    def test_jd_cache_is_bounded(self):
+        session = TailorSession("chat-1", max_jds=2)
+        for jd_text in (JD_A, JD_B, JD_A + "\nRemote"):
+            session.tailor(self.orchestrator, self.resume_path, jd_text)
+        self.assertEqual(list(session.jds), [JD_B, JD_A + "\nRemote"])
+
+
+class SessionStoreTests(unittest.TestCase):
+    def test_least_recently_used_session_is_evicted(self):
+        store = SessionStore(max_sessions=2, ttl=None)
+        a, b = store.get("a"), store.get("b")
+        self.assertIs(store.get("a"), a)
+        store.get("c")  # evicts b, the least recently used
+        self.assertEqual(len(store), 2)
+        self.assertIs(store.get("a"), a)
+        self.assertIsNot(store.get("b"), b)
+
+    def test_modes_keep_separate_state(self):
+        store = SessionStore(ttl=None)
+        online, offline = store.get("a"), store.get("a", mode="offline")
+        self.assertIsNot(online, offline)
+        self.assertEqual(offline.mode, "offline")
+        self.assertIs(store.get("a", mode="offline"), offline)
+        store.drop("a")
+        self.assertEqual(len(store), 0)
+
+    def test_idle_sessions_expire(self):
+        now = [0.0]
+        store = SessionStore(ttl=60, clock=lambda: now[0])
+        a = store.get("a")
+        now[0] = 30
+        store.get("b")
+        now[0] = 75
+        self.assertIsNot(store.get("a"), a)  # idle for 75s: expired and recreated
+        self.assertEqual(len(store), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
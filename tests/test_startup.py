@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from bench.importtime import DEFAULT_BUDGET_MS, HEAVY_MODULES, ROOT, measure, total_ms
+
+
+class StartupTests(unittest.TestCase):
+    def test_cli_import_within_budget_and_lazy(self):
+        timings = measure("cli")
+        self.assertLess(total_ms(timings, "cli"), DEFAULT_BUDGET_MS)
+        eager = [t.module for t in timings if t.module.startswith(HEAVY_MODULES)]
+        self.assertEqual(eager, [])
+
+    def test_offline_markdown_export_skips_heavy_imports(self):
+        fd, out_path = tempfile.mkstemp(suffix=".md")
+        os.close(fd)
+        script = (
+            "import sys, cli\n"
+            f"sys.argv = ['cli.py', '--offline', '--resume', 'sample_resume.txt', '--jd', 'job_posting.txt', '--out', {out_path!r}]\n"
+            "cli.main()\n"
+            f"print(sorted(m for m in sys.modules if m.startswith({HEAVY_MODULES!r})))\n"
+        )
+        try:
+            proc = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True)
+            self.assertTrue(proc.stdout.strip().endswith("[]"), proc.stdout)
+            self.assertGreater(os.path.getsize(out_path), 0)
+        finally:
+            os.remove(out_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
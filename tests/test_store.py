@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+
+from agents.jd_analyzer import JDAnalyzerAgent
+from agents.orchestrator import SwiftOrchestratorAgent
+from agents.resume_jd_matcher import ResumeJDMatcherAgent
+from agents.resume_parser import ResumeParserAgent
+from agents.swift_editor import SwiftEditorAgent
+from agents.swift_writer import SwiftWriterAgent
+from config import ModelConfig
+from fakes import StubLLM
+from schemas import JobRequirements
+from store import ResultStore, input_hash
+
+
+class _CountingWriter(SwiftWriterAgent):
+    def __init__(self):
+        super().__init__(use_llm=False)
+        self.calls = 0
+
+    def run(self, profile, jd, strategy, deadline=None):
+        self.calls += 1
+        return super().run(profile, jd, strategy, deadline=deadline)
+
+
+class ResultStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ResultStore(os.path.join(self.tmp.name, "results.db"))
+        self.resume_path = os.path.join(self.tmp.name, "resume.txt")
+        with open(self.resume_path, "w", encoding="utf-8") as handle:
+            handle.write("Jane Doe\njane@example.com\nSkills: Python, NLP\nExperience: ML Engineer\nEducation: BS CS\n")
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def _orchestrator(self, writer):
+        return SwiftOrchestratorAgent(
+            resume_parser=ResumeParserAgent(use_llm=False),
+            jd_analyzer=JDAnalyzerAgent(use_llm=False),
+            matcher=ResumeJDMatcherAgent(use_llm=False),
+            writer=writer,
+            editor=SwiftEditorAgent(use_llm=False),
+            store=self.store,
+        )
+
+    def test_round_trip_and_wal(self):
+        jd = JobRequirements(title="ML", company="Acme", must_haves=["Python"], nice_to_haves=[], responsibilities=[])
+        key = input_hash("jd", "posting text")
+        self.store.put("jd", key, jd)
+        self.assertEqual(self.store.get("jd", key, JobRequirements), jd)
+        self.assertIsNone(self.store.get("jd", input_hash("jd", "other"), JobRequirements))
+        with self.store.connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+    def test_unchanged_inputs_skip_stages_and_runs_are_queryable(self):
+        writer = _CountingWriter()
+        orchestrator = self._orchestrator(writer)
+        jd_text = "ML Engineer\nCompany: Acme\nMust have: Python"
+        first = orchestrator.run(self.resume_path, jd_text)
+        second = orchestrator.run(self.resume_path, jd_text)
+        self.assertEqual(first, second)
+        self.assertEqual(writer.calls, 1)
+
+        # A prompt change in the writer invalidates only the writer (and downstream) results.
+        writer.prompt_version += 1
+        orchestrator.run(self.resume_path, jd_text)
+        self.assertEqual(writer.calls, 2)
+
+        runs = self.store.query_runs(company="Acme")
+        self.assertEqual(len(runs), 3)
+        self.assertEqual(runs[0]["title"], "ML Engineer")
+        self.assertIn("Acme", self.store.pass_rate_by_company())
+
+    def test_fallback_results_are_not_stored(self):
+        jd_llm, writer_llm = StubLLM("no json here"), StubLLM("", fail_empty=True)
+        orchestrator = SwiftOrchestratorAgent(
+            resume_parser=ResumeParserAgent(use_llm=False),
+            jd_analyzer=JDAnalyzerAgent(llm_client=jd_llm, use_llm=True),
+            matcher=ResumeJDMatcherAgent(use_llm=False),
+            writer=SwiftWriterAgent(config=ModelConfig(max_retries=0), llm_client=writer_llm, use_llm=True),
+            editor=SwiftEditorAgent(use_llm=False),
+            store=self.store,
+        )
+        jd_text = "ML Engineer\nCompany: Acme\nMust have: Python"
+        orchestrator.run_state(self.resume_path, jd_text, enforce_fit=False)
+        jd_calls, writer_calls = jd_llm.calls, writer_llm.calls
+        state = orchestrator.run_state(self.resume_path, jd_text, enforce_fit=False)
+        # Neither the "TBD" requirements nor the template draft were served from the store.
+        self.assertEqual(state.jd.title, "TBD")
+        self.assertGreater(jd_llm.calls, jd_calls)
+        self.assertGreater(writer_llm.calls, writer_calls)
+        with self.store.connection() as conn:
+            stages = {row[0] for row in conn.execute("SELECT DISTINCT stage FROM artifacts")}
+        self.assertEqual(stages & {"jd", "draft"}, set())
+        self.assertIn("profile", stages)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+import threading
+import time
+import unittest
+
+from agents.stream_check import DraftStreamCheck
+from agents.swift_writer import SwiftWriterAgent
+from config import ModelConfig
+from fakes import StubResponse
+from schemas import CandidateProfile, JobRequirements, StrategyPlan
+
+PROFILE = CandidateProfile(
+    name="Jane Doe",
+    contact="jane@example.com",
+    summary="ML engineer",
+    skills=["Python", "NLP"],
+    experience=["Built NLP models"],
+    education=["BS CS"],
+)
+JD = JobRequirements(title="ML Engineer", company="Acme", must_haves=["Python"], nice_to_haves=[], responsibilities=[])
+STRATEGY = StrategyPlan(gaps=[], positioning=["Highlight NLP"], rewriting_focus=["NLP impact"])
+
+
+class _PartLLM:
+    """Answers resume/cover prompts after a delay; `replies` overrides answers per part in call order."""
+
+    def __init__(self, delay: float = 0.0, replies: dict | None = None):
+        self.delay = delay
+        self.replies = {part: list(answers) for part, answers in (replies or {}).items()}
+        self.calls = {"resume": 0, "cover": 0}
+        self.prompts: list[str] = []
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt: str):
+        part = "resume" if "only the tailored resume" in prompt else "cover"
+        with self._lock:
+            self.calls[part] += 1
+            self.prompts.append(prompt)
+            queued = self.replies.get(part)
+            text = queued.pop(0) if queued else f"[{part.upper()}]\n{part} body\n[/{part.upper()}]"
+        time.sleep(self.delay)
+        return StubResponse(text)
+
+
+class ParallelWriterTests(unittest.TestCase):
+    def test_parts_run_concurrently(self):
+        llm = _PartLLM(delay=0.3)
+        writer = SwiftWriterAgent(config=ModelConfig(parallel_writer=True), llm_client=llm)
+        started = time.monotonic()
+        draft = writer.run(PROFILE, JD, STRATEGY)
+        elapsed = time.monotonic() - started
+        self.assertEqual(draft.tailored_resume, "resume body")
+        self.assertEqual(draft.tailored_cover, "cover body")
+        self.assertLess(elapsed, 0.5)
+
+    def test_only_failed_part_is_retried(self):
+        llm = _PartLLM(replies={"cover": ["[RESUME]wrong section[/RESUME]"]})
+        draft = SwiftWriterAgent(llm_client=llm, parallel=True).run(PROFILE, JD, STRATEGY)
+        self.assertEqual(llm.calls, {"resume": 1, "cover": 2})
+        self.assertEqual(draft.tailored_cover, "cover body")
+
+    def test_persistently_failing_part_falls_back_for_the_whole_draft(self):
+        llm = _PartLLM(replies={"cover": ["", ""]})
+        draft = SwiftWriterAgent(llm_client=llm, parallel=True).run(PROFILE, JD, STRATEGY)
+        # No template cover letter next to an LLM resume.
+        self.assertIn("Dear Hiring Manager", draft.tailored_cover)
+        self.assertIn("Contact: jane@example.com", draft.tailored_resume)
+
+    def test_reply_without_markers_is_retried(self):
+        llm = _PartLLM(replies={"resume": ["- Built NLP models in Python"]})
+        draft = SwiftWriterAgent(llm_client=llm, parallel=True).run(PROFILE, JD, STRATEGY)
+        self.assertEqual(draft.tailored_resume, "resume body")
+        self.assertEqual(llm.calls["resume"], 2)
+
+    def test_part_over_its_word_share_is_retried_with_guidance(self):
+        long_cover = "[COVER]\n" + "word " * 30 + "\n[/COVER]"
+        llm = _PartLLM(replies={"cover": [long_cover]})
+        writer = SwiftWriterAgent(llm_client=llm, parallel=True)
+        writer.validation_config.max_words = 100  # the cover letter gets 20 words
+        draft = writer.run(PROFILE, JD, STRATEGY)
+        self.assertEqual(draft.tailored_cover, "cover body")
+        self.assertEqual(llm.calls, {"resume": 1, "cover": 2})
+        self.assertIn("Keep the cover letter under 20 words", [p for p in llm.prompts if "cover letter in" in p][-1])
+
+
+GOOD_DRAFT = "[RESUME]\n- Built NLP models in Python\n[/RESUME]\n[COVER]\nDear Acme team,\n[/COVER]\n"
+
+
+class _StreamingLLM:
+    """Streams each queued reply line by line and counts how many chunks were produced."""
+
+    def __init__(self, replies: list[str]):
+        self.replies = list(replies)
+        self.prompts: list[str] = []
+        self.consumed = 0
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        self.prompts.append(prompt)
+        reply = self.replies.pop(0) if len(self.replies) > 1 else self.replies[0]
+
+        def _chunks():
+            for line in reply.splitlines(keepends=True):
+                self.consumed += 1
+                time.sleep(0.002)  # paced like a network stream
+                yield StubResponse(line)
+
+        return _chunks()
+
+
+class StreamValidationTests(unittest.TestCase):
+    def test_check_flags_tables_length_and_structure(self):
+        check = DraftStreamCheck(max_words=1000)
+        self.assertIsNone(check.feed("[RESUME]\n- Python\n"))
+        self.assertEqual(check.feed("| Skill | Years |\n"), "table")
+
+        check = DraftStreamCheck(max_words=5)
+        self.assertEqual(check.feed("[RESUME]\none two three four five six\n"), "too_long")
+
+        check = DraftStreamCheck(max_words=1000)
+        self.assertEqual(check.feed("[RESUME]\nx\n[COVER]\n"), "bad_structure")
+
+        check = DraftStreamCheck(max_words=1000)
+        self.assertEqual(check.feed("Here is your tailored resume. " * 10 + "\n"), "missing_marker")
+
+        check = DraftStreamCheck(max_words=1000)
+        check.feed(GOOD_DRAFT)
+        self.assertIsNone(check.finish())
+        self.assertEqual(check.words, 9)
+
+    def test_failing_stream_is_cancelled_and_reprompted(self):
+        bad = "[RESUME]\n| Skill | Years |\n" + "".join(f"- filler line {i}\n" for i in range(500))
+        llm = _StreamingLLM([bad, GOOD_DRAFT])
+        draft = SwiftWriterAgent(llm_client=llm).run(PROFILE, JD, STRATEGY)
+        self.assertEqual(draft.tailored_resume, "- Built NLP models in Python")
+        self.assertEqual(len(llm.prompts), 2)
+        self.assertIn("Do not use tables", llm.prompts[1])
+        # Only the first lines of the bad reply were read before it was cancelled.
+        self.assertLess(llm.consumed, 20)
+
+    def test_last_attempt_runs_to_completion(self):
+        long_reply = "[RESUME]\n" + "word " * 40 + "\n[/RESUME]\n[COVER]\nHi\n[/COVER]\n"
+        llm = _StreamingLLM([long_reply])
+        writer = SwiftWriterAgent(llm_client=llm)
+        writer.validation_config.max_words = 10
+        draft = writer.run(PROFILE, JD, STRATEGY)
+        self.assertEqual(len(llm.prompts), 2)
+        self.assertIn("under 10 words", llm.prompts[1])
+        self.assertEqual(len(draft.tailored_resume.split()), 40)
+
+    def test_stream_cut_off_mid_reply_finishes_unstreamed(self):
+        class _BrokenStream:
+            def __init__(self):
+                self.streamed = 0
+                self.plain = 0
+
+            def generate_content(self, prompt: str, stream: bool = False):
+                if not stream:
+                    self.plain += 1
+                    return StubResponse(GOOD_DRAFT)
+                self.streamed += 1
+
+                def _chunks():
+                    yield StubResponse("[RESUME]\n")
+                    raise ConnectionError("stream reset")
+
+                return _chunks()
+
+        llm = _BrokenStream()
+        draft = SwiftWriterAgent(llm_client=llm).run(PROFILE, JD, STRATEGY)
+        self.assertEqual(draft.tailored_resume, "- Built NLP models in Python")
+        self.assertEqual((llm.streamed, llm.plain), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
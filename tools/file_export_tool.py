@@ -1,51 +1,35 @@
+import io
+import os
+import re
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, as_completed, wait
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
-
-try:  # Optional PDF export dependency
-    from fpdf import FPDF
-except Exception:  # pragma: no cover - optional import
-    FPDF = None
-
-try:  # Optional DOCX export dependency
-    from docx import Document
-except Exception:  # pragma: no cover - optional import
-    Document = None
+from typing import Iterable, Optional
 
 from schemas import CandidateProfile, DraftContent, JobRequirements
+from tools.render_templates import get_layout
 
 
-def _looks_like_heading(line: str) -> bool:
-    stripped = line.strip()
-    if not stripped:
-        return False
-    if stripped.startswith("#"):
-        return True
-    if stripped.endswith(":"):
-        return True
-    if len(stripped.split()) == 1 and stripped.isupper():
-        return True
-    return False
+@lru_cache(maxsize=None)
+def _load_fpdf():
+    """Optional PDF export dependency, imported on first PDF export."""
+    try:
+        from fpdf import FPDF
+    except Exception:  # pragma: no cover - optional import
+        return None
+    return FPDF
 
 
-def _normalize_bullets(text: str) -> str:
-    """
-    Ensure bullet-friendly formatting: prefix non-heading, non-empty lines with "- ".
-    Leaves existing bullets intact.
-    """
-    normalized = []
-    for line in text.splitlines():
-        stripped = line.strip()
-        if not stripped:
-            normalized.append("")
-            continue
-        if _looks_like_heading(stripped):
-            normalized.append(stripped)
-            continue
-        if stripped[0] in {"-", "*", "•"}:
-            normalized.append(f"- {stripped.lstrip('-*•').strip()}")
-            continue
-        normalized.append(f"- {stripped}")
-    return "\n".join(normalized)
+@lru_cache(maxsize=None)
+def _load_docx():
+    """Optional DOCX export dependency, imported on first DOCX export."""
+    try:
+        from docx import Document
+    except Exception:  # pragma: no cover - optional import
+        return None
+    return Document
 
 
 def render_markdown(
@@ -55,37 +39,9 @@ def render_markdown(
 ) -> str:
     """
     Render a simple, consistent Markdown template for resume + cover letter.
-    Keeps formatting ATS-friendly (plain headings/bullets).
+    Keeps formatting ATS-friendly (plain headings/bullets). Memoized per draft content.
     """
-    lines: list[str] = []
-    if profile:
-        lines.extend(
-            [
-                f"# {profile.name or 'Candidate'}",
-                profile.contact if profile.contact else "",
-                "",
-            ]
-        )
-    lines.append("## Tailored Resume")
-    lines.append("")
-    lines.append(_normalize_bullets(draft.tailored_resume.strip()))
-    lines.append("")
-    if draft.tailored_cover:
-        lines.append("## Cover Letter")
-        lines.append("")
-        lines.append(_normalize_bullets(draft.tailored_cover.strip()))
-        lines.append("")
-    if jd:
-        lines.append("## Target Role")
-        lines.append("")
-        lines.append(f"- **Title:** {jd.title or 'TBD'}")
-        lines.append(f"- **Company:** {jd.company or 'TBD'}")
-        if jd.must_haves:
-            lines.append(f"- **Must-haves:** {', '.join(jd.must_haves)}")
-        if jd.nice_to_haves:
-            lines.append(f"- **Nice-to-haves:** {', '.join(jd.nice_to_haves)}")
-        lines.append("")
-    return "\n".join(lines)
+    return get_layout("markdown").render(draft, profile=profile, jd=jd)
 
 
 def _ensure_out_path(out_path: str | None, suffix: str) -> Path:
@@ -103,43 +59,205 @@ def export_draft(
 ) -> str:
     """
     Convenience helper: render markdown template then export in chosen format.
+    PDF/DOCX are built straight from the layout's lines, without the joined Markdown string.
     """
-    md = render_markdown(draft, profile=profile, jd=jd)
-    return export_content(md, fmt=fmt, out_path=out_path)
+    suffix = _format_suffix(fmt)
+    if suffix in {"md", "txt"}:
+        return export_content(render_markdown(draft, profile=profile, jd=jd), fmt=fmt, out_path=out_path)
+    path = _ensure_out_path(out_path, suffix)
+    _write_document(get_layout("markdown").iter_lines(draft, profile, jd), suffix, path)
+    return str(path)
+
+
+_FORMAT_SUFFIXES = {
+    "md": "md",
+    "markdown": "md",
+    "txt": "txt",
+    "text": "txt",
+    "pdf": "pdf",
+    "docx": "docx",
+    "doc": "docx",
+}
+
+
+def _format_suffix(fmt: str) -> str:
+    suffix = _FORMAT_SUFFIXES.get(fmt.lower())
+    if suffix is None:
+        raise ValueError("Unsupported export format. Use md, txt, pdf, or docx.")
+    return suffix
+
+
+@lru_cache(maxsize=None)
+def _docx_template() -> bytes:
+    """Serialized blank DOCX, loaded once per process and reused for every document."""
+    Document = _load_docx()
+    if Document is None:
+        raise ImportError("python-docx not installed; install with `pip install python-docx` to export DOCX.")
+    buffer = io.BytesIO()
+    Document().save(buffer)
+    return buffer.getvalue()
+
+
+def _build_pdf(lines: Iterable[str]):
+    FPDF = _load_fpdf()
+    if FPDF is None:
+        raise ImportError("fpdf not installed; install with `pip install fpdf` to export PDF.")
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.set_font("Arial", size=12)
+    for line in lines:
+        pdf.multi_cell(0, 8, line)
+    return pdf
+
+
+def _build_docx(lines: Iterable[str]):
+    doc = _load_docx()(io.BytesIO(_docx_template()))
+    for line in lines:
+        doc.add_paragraph(line)
+    return doc
+
+
+def _write_document(lines: Iterable[str], suffix: str, path: Path) -> None:
+    if suffix in {"md", "txt"}:
+        path.write_text("\n".join(lines), encoding="utf-8")
+    elif suffix == "pdf":
+        _build_pdf(lines).output(str(path))
+    else:
+        _build_docx(lines).save(str(path))
+
+
+def _document_bytes(lines: Iterable[str], suffix: str) -> bytes:
+    if suffix in {"md", "txt"}:
+        return "\n".join(lines).encode("utf-8")
+    if suffix == "pdf":
+        data = _build_pdf(lines).output(dest="S")
+        return data.encode("latin-1") if isinstance(data, str) else bytes(data)
+    buffer = io.BytesIO()
+    _build_docx(lines).save(buffer)
+    return buffer.getvalue()
+
+
+def render_document(draft_text: str, fmt: str = "md") -> bytes:
+    """Render draft text to the bytes of an md/txt/pdf/docx document without touching disk."""
+    suffix = _format_suffix(fmt)
+    if suffix in {"md", "txt"}:
+        return draft_text.encode("utf-8")
+    return _document_bytes(draft_text.splitlines(), suffix)
 
 
 def export_content(draft_text: str, fmt: str = "md", out_path: str | None = None) -> str:
     """
     Export draft text to md/txt (always) or pdf/docx (if dependencies installed).
     """
-    fmt = fmt.lower()
-    if fmt in {"md", "markdown"}:
-        path = _ensure_out_path(out_path, "md")
+    suffix = _format_suffix(fmt)
+    path = _ensure_out_path(out_path, suffix)
+    if suffix in {"md", "txt"}:
         path.write_text(draft_text, encoding="utf-8")
-        return str(path)
-    if fmt in {"txt", "text"}:
-        path = _ensure_out_path(out_path, "txt")
-        path.write_text(draft_text, encoding="utf-8")
-        return str(path)
-    if fmt == "pdf":
-        if FPDF is None:
-            raise ImportError("fpdf not installed; install with `pip install fpdf` to export PDF.")
-        path = _ensure_out_path(out_path, "pdf")
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_auto_page_break(auto=True, margin=15)
-        pdf.set_font("Arial", size=12)
-        for line in draft_text.splitlines():
-            pdf.multi_cell(0, 8, line)
-        pdf.output(str(path))
-        return str(path)
-    if fmt in {"docx", "doc"}:
-        if Document is None:
-            raise ImportError("python-docx not installed; install with `pip install python-docx` to export DOCX.")
-        path = _ensure_out_path(out_path, "docx")
-        doc = Document()
-        for line in draft_text.splitlines():
-            doc.add_paragraph(line)
-        doc.save(str(path))
-        return str(path)
-    raise ValueError("Unsupported export format. Use md, txt, pdf, or docx.")
+    else:
+        _write_document(draft_text.splitlines(), suffix, path)
+    return str(path)
+
+
+@dataclass
+class ExportJob:
+    """One draft to export in a batch; `name` becomes the file name (without suffix)."""
+
+    name: str
+    draft: DraftContent
+    profile: Optional[CandidateProfile] = None
+    jd: Optional[JobRequirements] = None
+
+
+def job_slug(text: str, fallback: str = "draft") -> str:
+    slug = re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_")
+    return slug[:80] or fallback
+
+
+def _init_export_worker(fmt: str) -> None:
+    """Process-pool initializer: load export dependencies and templates once per worker."""
+    suffix = _format_suffix(fmt)
+    if suffix == "pdf":
+        _load_fpdf()
+    elif suffix == "docx":
+        _docx_template()
+
+
+def _export_job(job: ExportJob, fmt: str, out_dir: str | None) -> tuple[str, bytes | None]:
+    suffix = _format_suffix(fmt)
+    filename = f"{job.name}.{suffix}"
+    if out_dir is not None:
+        return export_draft(job.draft, job.profile, job.jd, fmt=fmt, out_path=str(Path(out_dir) / filename)), None
+    if suffix in {"md", "txt"}:
+        return filename, render_markdown(job.draft, profile=job.profile, jd=job.jd).encode("utf-8")
+    return filename, _document_bytes(get_layout("markdown").iter_lines(job.draft, job.profile, job.jd), suffix)
+
+
+def export_many(
+    jobs: Iterable[ExportJob],
+    fmt: str = "md",
+    out_dir: str | None = None,
+    archive: str | None = None,
+    workers: int | None = None,
+    max_in_flight: int | None = None,
+) -> list[str]:
+    """
+    Export many drafts, one file per job in `out_dir` or all of them streamed into a zip `archive`.
+    Jobs are consumed lazily and rendered on a process pool (workers=0/1 renders inline); at most
+    `max_in_flight` documents are pending at once and each is written as soon as it is ready,
+    so memory stays bounded however many drafts are exported.
+    Returns the written paths (or archive member names) in job order.
+    """
+    if (out_dir is None) == (archive is None):
+        raise ValueError("Pass exactly one of out_dir or archive.")
+    suffix = _format_suffix(fmt)
+    if out_dir is not None:
+        Path(out_dir).mkdir(parents=True, exist_ok=True)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    max_in_flight = max_in_flight or max(1, workers) * 2
+
+    used: set[str] = set()
+    next_suffix: dict[str, int] = {}
+
+    def _unique(job: ExportJob) -> ExportJob:
+        # Check candidates against every name handed out, so "acme", "acme", "acme_2" cannot collide.
+        name, count = job.name, next_suffix.get(job.name, 1)
+        while name in used:
+            count += 1
+            name = f"{job.name}_{count}"
+        next_suffix[job.name] = count
+        used.add(name)
+        if name == job.name:
+            return job
+        return ExportJob(name=name, draft=job.draft, profile=job.profile, jd=job.jd)
+
+    written: dict[int, str] = {}
+    zip_file = zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_DEFLATED) if archive else None
+
+    def _collect(index: int, result: tuple[str, bytes | None]) -> None:
+        name, data = result
+        if zip_file is not None:
+            zip_file.writestr(name, data)
+        written[index] = name
+
+    try:
+        if workers <= 1:
+            _init_export_worker(suffix)
+            for index, job in enumerate(jobs):
+                _collect(index, _export_job(_unique(job), suffix, out_dir))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_export_worker, initargs=(suffix,)) as pool:
+                in_flight: dict[Future, int] = {}
+                for index, job in enumerate(jobs):
+                    if len(in_flight) >= max_in_flight:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            _collect(in_flight.pop(future), future.result())
+                    in_flight[pool.submit(_export_job, _unique(job), suffix, out_dir)] = index
+                for future in as_completed(in_flight):
+                    _collect(in_flight[future], future.result())
+    finally:
+        if zip_file is not None:
+            zip_file.close()
+    return [written[index] for index in sorted(written)]
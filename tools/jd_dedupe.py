@@ -0,0 +1,137 @@
+"""
+Near-duplicate detection for job postings using MinHash signatures and LSH banding.
+
+Postings are reduced to word shingles, summarized by a MinHash signature, and the
+signature is split into bands that are hashed into buckets. A query only compares
+signatures that share at least one band bucket, so lookups stay fast as the index grows.
+"""
+import random
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Generic, Hashable, Optional, TypeVar
+
+ValueT = TypeVar("ValueT")
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+
+
+def shingles(text: str, size: int = 5) -> set[int]:
+    """32-bit hashes of the overlapping `size`-word windows of a normalized posting."""
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) <= size:
+        return {zlib.crc32(" ".join(tokens).encode("utf-8"))} if tokens else set()
+    return {zlib.crc32(" ".join(tokens[i : i + size]).encode("utf-8")) for i in range(len(tokens) - size + 1)}
+
+
+def _choose_bands(num_perm: int, threshold: float) -> tuple[int, int]:
+    """Pick bands x rows whose LSH S-curve midpoint, (1/b)^(1/r), is closest to the threshold."""
+    best = (num_perm, 1)
+    best_err = float("inf")
+    for bands in range(1, num_perm + 1):
+        if num_perm % bands:
+            continue
+        rows = num_perm // bands
+        err = abs((1 / bands) ** (1 / rows) - threshold)
+        if err < best_err:
+            best, best_err = (bands, rows), err
+    return best
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._params = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+    def signature(self, shingle_set: set[int]) -> tuple[int, ...]:
+        if not shingle_set:
+            return (_MAX_HASH,) * self.num_perm
+        return tuple(min(((a * x + b) % _PRIME) & _MAX_HASH for x in shingle_set) for a, b in self._params)
+
+
+@dataclass
+class DedupeMatch(Generic[ValueT]):
+    key: Hashable
+    similarity: float
+    value: ValueT
+
+
+class JDDedupeIndex(Generic[ValueT]):
+    """
+    LSH index of posting signatures mapping near-duplicate postings to a stored value
+    (typically their JobRequirements). `threshold` is the estimated Jaccard similarity
+    above which two postings count as duplicates; the oldest entries are evicted past
+    `max_entries`.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 64,
+        shingle_size: int = 5,
+        max_entries: int = 50_000,
+        seed: int = 1,
+    ):
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.max_entries = max_entries
+        self.hasher = MinHasher(num_perm=num_perm, seed=seed)
+        self.bands, self.rows = _choose_bands(num_perm, threshold)
+        self._buckets: list[dict[tuple[int, ...], set[Hashable]]] = [{} for _ in range(self.bands)]
+        self._entries: OrderedDict[Hashable, tuple[tuple[int, ...], ValueT]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def signature(self, text: str) -> tuple[int, ...]:
+        return self.hasher.signature(shingles(text, self.shingle_size))
+
+    def _band_keys(self, signature: tuple[int, ...]):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows : (band + 1) * self.rows]
+
+    def add(self, key: Hashable, text: str, value: ValueT, signature: tuple[int, ...] | None = None) -> None:
+        signature = signature or self.signature(text)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (signature, value)
+            for band, band_key in self._band_keys(signature):
+                self._buckets[band].setdefault(band_key, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: Hashable) -> None:
+        signature, _ = self._entries.pop(key)
+        for band, band_key in self._band_keys(signature):
+            bucket = self._buckets[band].get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band][band_key]
+
+    def query(self, text: str, signature: tuple[int, ...] | None = None) -> list[DedupeMatch[ValueT]]:
+        """Near-duplicates of `text` at or above the threshold, most similar first."""
+        signature = signature or self.signature(text)
+        with self._lock:
+            candidates: set[Hashable] = set()
+            for band, band_key in self._band_keys(signature):
+                candidates.update(self._buckets[band].get(band_key, ()))
+            matches = []
+            for key in candidates:
+                stored, value = self._entries[key]
+                similarity = sum(x == y for x, y in zip(signature, stored)) / len(signature)
+                if similarity >= self.threshold:
+                    matches.append(DedupeMatch(key, similarity, value))
+        matches.sort(key=lambda match: match.similarity, reverse=True)
+        return matches
+
+    def find(self, text: str, signature: tuple[int, ...] | None = None) -> Optional[DedupeMatch[ValueT]]:
+        matches = self.query(text, signature=signature)
+        return matches[0] if matches else None
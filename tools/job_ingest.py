@@ -0,0 +1,294 @@
+"""
+Streaming ingestion of job-board dumps into batch tailoring.
+
+Postings are read lazily from JSONL/CSV/HTML/text dumps, de-duplicated (exact and near
+duplicates), cheaply pre-filtered by skill overlap with the candidate profile, and fed
+into a bounded pool of concurrent orchestrator runs. Every stage is a generator holding
+at most a bounded window of postings, so memory stays flat regardless of dump size.
+"""
+import contextvars
+import csv
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+from agents.fit_scorer import LowFitPosting
+from compact import CompactProfile, SkillVocab
+from scheduler import BATCH, current_tenant, tenant_context
+from schemas import CandidateProfile, FitScore
+from tools.jd_dedupe import JDDedupeIndex
+
+_TEXT_FIELDS = ("text", "description", "body", "jd", "posting", "content")
+_TITLE_FIELDS = ("title", "job_title", "position")
+_ID_FIELDS = ("id", "posting_id", "job_id", "request_id", "url")
+
+
+@dataclass
+class JobPosting:
+    posting_id: str
+    text: str
+    source: str
+
+
+@dataclass
+class TailoringResult:
+    posting: JobPosting
+    state: Any = None  # agents.orchestrator.RunState on success
+    error: Optional[str] = None
+    # Set when the fit prefilter stopped the posting before the LLM stages.
+    fit: Optional[FitScore] = None
+    deferred: bool = False
+
+    @property
+    def skipped(self) -> bool:
+        return self.state is None and self.fit is not None
+
+
+def _posting_from_record(record: dict, source: str, fallback_id: str) -> Optional[JobPosting]:
+    text = next((str(record[f]) for f in _TEXT_FIELDS if record.get(f)), "")
+    title = next((str(record[f]) for f in _TITLE_FIELDS if record.get(f)), "")
+    if title and not text.startswith(title):
+        text = f"{title}\n{text}" if text else title
+    if not text.strip():
+        return None
+    posting_id = next((str(record[f]) for f in _ID_FIELDS if record.get(f)), fallback_id)
+    return JobPosting(posting_id=posting_id, text=text, source=source)
+
+
+def read_jsonl(path: str) -> Iterator[JobPosting]:
+    with open(path, "r", encoding="utf-8", errors="ignore") as fh:
+        for lineno, line in enumerate(fh, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict):
+                posting = _posting_from_record(record, path, f"{Path(path).stem}-{lineno}")
+                if posting:
+                    yield posting
+
+
+def read_csv(path: str) -> Iterator[JobPosting]:
+    with open(path, "r", encoding="utf-8", errors="ignore", newline="") as fh:
+        for rowno, row in enumerate(csv.DictReader(fh), start=1):
+            record = {(key or "").strip().lower(): value for key, value in row.items()}
+            posting = _posting_from_record(record, path, f"{Path(path).stem}-{rowno}")
+            if posting:
+                yield posting
+
+
+class _PostingHTMLParser(HTMLParser):
+    """Collects the text of each <article> (or the whole page when there are none)."""
+
+    _SKIP = {"script", "style", "noscript"}
+    _BLOCK = {"p", "li", "br", "div", "h1", "h2", "h3", "h4", "tr", "section"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.articles: list[str] = []
+        self.saw_article = False
+        self._article_depth = 0
+        self._skip_depth = 0
+        self._current: list[str] = []
+        self._page: list[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIP:
+            self._skip_depth += 1
+        elif tag == "article":
+            self.saw_article = True
+            self._article_depth += 1
+            if self._article_depth == 1:
+                self._current = []
+        elif tag in self._BLOCK:
+            self._append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIP and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag == "article" and self._article_depth:
+            self._article_depth -= 1
+            if self._article_depth == 0:
+                self.articles.append(_clean_text("".join(self._current)))
+                self._current = []
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._append(data)
+
+    def _append(self, text: str):
+        if self._article_depth:
+            self._current.append(text)
+        elif not self.saw_article:
+            self._page.append(text)
+
+    def page_text(self) -> str:
+        return _clean_text("".join(self._page))
+
+
+def _clean_text(text: str) -> str:
+    lines = (re.sub(r"[ \t]+", " ", line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def read_html(path: str, chunk_size: int = 64 * 1024) -> Iterator[JobPosting]:
+    parser = _PostingHTMLParser()
+    count = 0
+    with open(path, "r", encoding="utf-8", errors="ignore") as fh:
+        while True:
+            chunk = fh.read(chunk_size)
+            if not chunk:
+                break
+            parser.feed(chunk)
+            # Hand finished articles downstream as soon as they close.
+            for text in parser.articles:
+                count += 1
+                if text:
+                    yield JobPosting(posting_id=f"{Path(path).stem}-{count}", text=text, source=path)
+            parser.articles.clear()
+    parser.close()
+    for text in parser.articles:
+        count += 1
+        if text:
+            yield JobPosting(posting_id=f"{Path(path).stem}-{count}", text=text, source=path)
+    if not parser.saw_article:
+        text = parser.page_text()
+        if text:
+            yield JobPosting(posting_id=Path(path).stem, text=text, source=path)
+
+
+def read_postings(paths: Iterable[str]) -> Iterator[JobPosting]:
+    """Stream postings from dumps, choosing the reader by file suffix (.jsonl/.csv/.html/other text)."""
+    for path in paths:
+        suffix = Path(path).suffix.lower()
+        if suffix in {".jsonl", ".ndjson"}:
+            yield from read_jsonl(path)
+        elif suffix == ".csv":
+            yield from read_csv(path)
+        elif suffix in {".html", ".htm"}:
+            yield from read_html(path)
+        else:
+            text = Path(path).read_text(encoding="utf-8", errors="ignore")
+            if text.strip():
+                yield JobPosting(posting_id=Path(path).stem, text=text, source=path)
+
+
+def dedupe_postings(
+    postings: Iterable[JobPosting],
+    index: Optional[JDDedupeIndex] = None,
+    max_exact: int = 100_000,
+) -> Iterator[JobPosting]:
+    """Drop exact repeats (bounded LRU of content hashes) and, with an index, near-duplicates."""
+    seen: OrderedDict[str, None] = OrderedDict()
+    for posting in postings:
+        digest = hashlib.sha1(" ".join(posting.text.split()).lower().encode("utf-8")).hexdigest()
+        if digest in seen:
+            seen.move_to_end(digest)
+            continue
+        seen[digest] = None
+        if len(seen) > max_exact:
+            seen.popitem(last=False)
+        if index is not None:
+            signature = index.signature(posting.text)
+            if index.find(posting.text, signature=signature) is not None:
+                continue
+            index.add(digest, posting.text, posting.posting_id, signature=signature)
+        yield posting
+
+
+def skill_matcher(profile: CandidateProfile) -> "re.Pattern[str] | None":
+    """One precompiled, case-insensitive alternation of the candidate's skills."""
+    skills = sorted({s.strip() for s in profile.skills if s.strip()}, key=len, reverse=True)
+    if not skills:
+        return None
+    return re.compile(r"(?<!\w)(" + "|".join(re.escape(s) for s in skills) + r")(?!\w)", re.IGNORECASE)
+
+
+def prefilter_postings(
+    postings: Iterable[JobPosting],
+    profile: CandidateProfile,
+    min_overlap: int = 1,
+    vocab: SkillVocab | None = None,
+) -> Iterator[JobPosting]:
+    """
+    Keep postings mentioning at least `min_overlap` distinct candidate skills.
+    Mentions are interned in `vocab` (one per batch) and counted by case-folded skill id,
+    the same matching compact.skill_coverage uses.
+    """
+    pattern = skill_matcher(profile)
+    vocab = vocab if vocab is not None else SkillVocab()
+    skills = vocab.folded(CompactProfile.from_model(profile, vocab).skills)
+    for posting in postings:
+        if pattern is None or min_overlap <= 0:
+            yield posting
+            continue
+        found = vocab.folded(vocab.ids(pattern.findall(posting.text))) & skills
+        if len(found) >= min_overlap:
+            yield posting
+
+
+def tailor_postings(
+    postings: Iterable[JobPosting],
+    orchestrator,
+    profile: CandidateProfile,
+    max_workers: int = 4,
+    max_in_flight: int | None = None,
+    priority: str = BATCH,
+) -> Iterator[TailoringResult]:
+    """
+    Tailor postings concurrently with at most `max_in_flight` runs pending at once.
+    Results are yielded in completion order; failures and low-fit skips are reported, not raised.
+    LLM calls stay attributed to the caller's tenant but queue in the `priority` class (batch by
+    default), so bulk runs do not hold back interactive requests.
+    """
+    max_in_flight = max_in_flight or max_workers * 2
+    tenant, _ = current_tenant()
+
+    def _run(posting: JobPosting) -> TailoringResult:
+        try:
+            with tenant_context(tenant, priority):
+                state = orchestrator.run_state(None, posting.text, profile=profile)
+            return TailoringResult(posting, state=state)
+        except LowFitPosting as low:
+            return TailoringResult(posting, fit=low.fit, deferred=low.deferred)
+        except Exception as err:
+            return TailoringResult(posting, error=f"{type(err).__name__}: {err}")
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="swift-ingest") as pool:
+        in_flight: set[Future] = set()
+        for posting in postings:
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            # Each run keeps the caller's context (e.g. the scheduler tenant and priority).
+            in_flight.add(pool.submit(contextvars.copy_context().run, _run, posting))
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def ingest_and_tailor(
+    paths: Iterable[str],
+    orchestrator,
+    profile: CandidateProfile,
+    dedupe_threshold: float | None = 0.8,
+    min_skill_overlap: int = 1,
+    max_workers: int = 4,
+) -> Iterator[TailoringResult]:
+    """Full streaming pipeline: read -> dedupe -> skill prefilter -> concurrent tailoring."""
+    index = JDDedupeIndex(threshold=dedupe_threshold) if dedupe_threshold else None
+    postings = read_postings(paths)
+    postings = dedupe_postings(postings, index=index)
+    postings = prefilter_postings(postings, profile, min_overlap=min_skill_overlap, vocab=SkillVocab())
+    yield from tailor_postings(postings, orchestrator, profile, max_workers=max_workers)
@@ -0,0 +1,162 @@
+"""
+Compiled render layouts for tailored drafts.
+
+A layout is compiled once into a fixed sequence of section renderers. Rendering yields
+lines lazily, so PDF/DOCX exporters can consume them without building a Markdown string,
+and both normalized section text and full renders are memoized by content hash.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, Optional
+
+from schemas import CandidateProfile, DraftContent, JobRequirements
+
+_BULLET_CHARS = frozenset("-*•")
+
+
+def _looks_like_heading(line: str) -> bool:
+    stripped = line.strip()
+    if not stripped:
+        return False
+    if stripped.startswith("#"):
+        return True
+    if stripped.endswith(":"):
+        return True
+    if len(stripped.split()) == 1 and stripped.isupper():
+        return True
+    return False
+
+
+@lru_cache(maxsize=1024)
+def normalize_bullet_lines(text: str) -> tuple[str, ...]:
+    """
+    Ensure bullet-friendly formatting: prefix non-heading, non-empty lines with "- ".
+    Leaves existing bullets intact. Memoized per distinct section text.
+    """
+    normalized = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            normalized.append("")
+            continue
+        if _looks_like_heading(stripped):
+            normalized.append(stripped)
+            continue
+        if stripped[0] in _BULLET_CHARS:
+            normalized.append(f"- {stripped.lstrip('-*•').strip()}")
+            continue
+        normalized.append(f"- {stripped}")
+    return tuple(normalized) or ("",)
+
+
+Section = Callable[[DraftContent, Optional[CandidateProfile], Optional[JobRequirements]], Iterable[str]]
+
+
+def _profile_header(draft, profile, jd) -> Iterable[str]:
+    if not profile:
+        return ()
+    return (f"# {profile.name or 'Candidate'}", profile.contact if profile.contact else "", "")
+
+
+def _resume_section(draft, profile, jd) -> Iterator[str]:
+    yield "## Tailored Resume"
+    yield ""
+    yield from normalize_bullet_lines(draft.tailored_resume.strip())
+    yield ""
+
+
+def _cover_section(draft, profile, jd) -> Iterator[str]:
+    if not draft.tailored_cover:
+        return
+    yield "## Cover Letter"
+    yield ""
+    yield from normalize_bullet_lines(draft.tailored_cover.strip())
+    yield ""
+
+
+def _target_role_section(draft, profile, jd) -> Iterator[str]:
+    if not jd:
+        return
+    yield "## Target Role"
+    yield ""
+    yield f"- **Title:** {jd.title or 'TBD'}"
+    yield f"- **Company:** {jd.company or 'TBD'}"
+    if jd.must_haves:
+        yield f"- **Must-haves:** {', '.join(jd.must_haves)}"
+    if jd.nice_to_haves:
+        yield f"- **Nice-to-haves:** {', '.join(jd.nice_to_haves)}"
+    yield ""
+
+
+LAYOUTS: dict[str, tuple[Section, ...]] = {
+    "markdown": (_profile_header, _resume_section, _cover_section, _target_role_section),
+}
+
+
+def content_key(
+    draft: DraftContent,
+    profile: Optional[CandidateProfile] = None,
+    jd: Optional[JobRequirements] = None,
+) -> str:
+    """Hash of everything a layout reads, used as the render memoization key."""
+    digest = hashlib.blake2b(digest_size=16)
+    parts = [draft.tailored_resume, draft.tailored_cover or ""]
+    if profile:
+        parts += ["profile", profile.name, profile.contact]
+    if jd:
+        parts += ["jd", jd.title, jd.company, *jd.must_haves, "|", *jd.nice_to_haves]
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class RenderLayout:
+    """A compiled layout: renders lines lazily and memoizes joined output per content hash."""
+
+    cache_size = 256
+
+    def __init__(self, name: str, sections: tuple[Section, ...]):
+        self.name = name
+        self.sections = sections
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def iter_lines(
+        self,
+        draft: DraftContent,
+        profile: Optional[CandidateProfile] = None,
+        jd: Optional[JobRequirements] = None,
+    ) -> Iterator[str]:
+        for section in self.sections:
+            yield from section(draft, profile, jd)
+
+    def render(
+        self,
+        draft: DraftContent,
+        profile: Optional[CandidateProfile] = None,
+        jd: Optional[JobRequirements] = None,
+    ) -> str:
+        key = content_key(draft, profile, jd)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+        text = "\n".join(self.iter_lines(draft, profile, jd))
+        with self._lock:
+            self._cache[key] = text
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return text
+
+
+@lru_cache(maxsize=None)
+def get_layout(name: str = "markdown") -> RenderLayout:
+    """Compile a named layout once per process."""
+    try:
+        return RenderLayout(name, LAYOUTS[name])
+    except KeyError:
+        raise ValueError(f"Unknown render layout: {name}") from None
@@ -1,14 +1,20 @@
+from functools import lru_cache
 from pathlib import Path
 from typing import List
 
-try:  # Optional dependency for PDF parsing
-    import PyPDF2
-except Exception:  # pragma: no cover - optional import
-    PyPDF2 = None
-
 from schemas import CandidateProfile
 
 
+@lru_cache(maxsize=None)
+def _load_pypdf2():
+    """Optional dependency for PDF parsing, imported on first PDF resume."""
+    try:
+        import PyPDF2
+    except Exception:  # pragma: no cover - optional import
+        return None
+    return PyPDF2
+
+
 def _read_text(file_path: str) -> str:
     path = Path(file_path)
     if not path.exists():
@@ -22,6 +28,7 @@ def _read_text(file_path: str) -> str:
 
 
 def _read_pdf_text(file_path: str) -> str:
+    PyPDF2 = _load_pypdf2()
     if PyPDF2 is None:
         raise ImportError("PyPDF2 not installed; install it or provide text/markdown resumes.")
     text_chunks: List[str] = []